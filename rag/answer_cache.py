@@ -0,0 +1,224 @@
+"""
+Answer Cache for Module 3: Question-Answering Engine
+
+This module provides a persistent answer cache backed by SQLite. Entries are
+keyed by normalized query, model, prompt template and request options, and
+are only valid for the corpus version they were computed against. The corpus
+version counter is stored in the same database so it survives restarts and
+is shared by all workers using the file.
+"""
+
+import json
+import time
+import hashlib
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+class AnswerCache:
+    """
+    Persistent answer cache with TTL and size-bounded LRU eviction.
+
+    Features:
+    - SQLite storage, safe to share between threads and processes
+    - Corpus version counter; bumping it invalidates all entries
+    - TTL expiry and LRU eviction by last access
+    - Hit/miss/eviction statistics
+    """
+
+    def __init__(self, db_path: str = 'ragbot_fastapi/answer_cache.sqlite3',
+                 ttl_seconds: float = 86400.0, max_entries: int = 10000):
+        """
+        Initialize the answer cache.
+
+        Args:
+            db_path: Path to the SQLite database file
+            ttl_seconds: Time-to-live for entries (0 disables expiry)
+            max_entries: Maximum number of entries kept
+        """
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0, 'stores': 0}
+        self._initialize_database()
+
+    def _initialize_database(self):
+        """Create the database file and tables."""
+        try:
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=5.0)
+            with self._conn:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS answers ("
+                    " key TEXT PRIMARY KEY,"
+                    " corpus_version INTEGER NOT NULL,"
+                    " payload TEXT NOT NULL,"
+                    " created_at REAL NOT NULL,"
+                    " last_access REAL NOT NULL,"
+                    " hits INTEGER NOT NULL DEFAULT 0)"
+                )
+                self._conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_answers_last_access ON answers (last_access)"
+                )
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)"
+                )
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO meta (name, value) VALUES ('corpus_version', '0')"
+                )
+        except Exception as e:
+            self.logger.error(f"Failed to initialize answer cache: {e}")
+            raise
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """
+        Build a cache key from its parts.
+
+        Args:
+            parts: JSON-serializable key components
+
+        Returns:
+            Hex digest key
+        """
+        raw = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get_corpus_version(self) -> int:
+        """Get the current corpus version."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM meta WHERE name = 'corpus_version'"
+            ).fetchone()
+        return int(row[0]) if row else 0
+
+    def bump_corpus_version(self) -> int:
+        """
+        Increment the corpus version and drop entries from older versions.
+
+        Returns:
+            New corpus version
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE name = 'corpus_version'"
+            )
+            version = int(self._conn.execute(
+                "SELECT value FROM meta WHERE name = 'corpus_version'"
+            ).fetchone()[0])
+            self._conn.execute("DELETE FROM answers WHERE corpus_version < ?", (version,))
+        self.logger.info(f"Corpus version bumped to {version}")
+        return version
+
+    def get(self, key: str, corpus_version: int) -> Optional[Dict]:
+        """
+        Look up an entry.
+
+        Args:
+            key: Cache key
+            corpus_version: Corpus version the entry must belong to
+
+        Returns:
+            Dictionary with ``payload``, ``age_seconds`` and ``hits``, or None
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT payload, created_at, hits FROM answers WHERE key = ? AND corpus_version = ?",
+                (key, corpus_version)
+            ).fetchone()
+            if row is None:
+                self._stats['misses'] += 1
+                return None
+            payload, created_at, hits = row
+            if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM answers WHERE key = ?", (key,))
+                self._stats['misses'] += 1
+                self._stats['expired'] += 1
+                return None
+            self._conn.execute(
+                "UPDATE answers SET last_access = ?, hits = hits + 1 WHERE key = ?", (now, key)
+            )
+            self._stats['hits'] += 1
+
+        return {
+            'payload': json.loads(payload),
+            'age_seconds': now - created_at,
+            'hits': hits + 1
+        }
+
+    def put(self, key: str, corpus_version: int, payload: Dict):
+        """
+        Store an entry, evicting least recently used entries over the limit.
+
+        Args:
+            key: Cache key
+            corpus_version: Corpus version the answer was computed against
+            payload: JSON-serializable answer payload
+        """
+        now = time.time()
+        try:
+            serialized = json.dumps(payload, default=str)
+        except (TypeError, ValueError) as e:
+            self.logger.warning(f"Answer not cacheable: {e}")
+            return
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO answers (key, corpus_version, payload, created_at, last_access, hits)"
+                " VALUES (?, ?, ?, ?, ?, 0)",
+                (key, corpus_version, serialized, now, now)
+            )
+            self._stats['stores'] += 1
+            count = self._conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM answers WHERE key IN"
+                    " (SELECT key FROM answers ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,)
+                )
+                self._stats['evictions'] += overflow
+
+    def purge(self) -> int:
+        """
+        Remove all entries.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock, self._conn:
+            removed = self._conn.execute("DELETE FROM answers").rowcount
+        self.logger.info(f"Purged {removed} cached answers")
+        return removed
+
+    def get_stats(self) -> Dict:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with counters, entry count, size and hit ratio
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+            page_count = self._conn.execute("PRAGMA page_count").fetchone()[0]
+            page_size = self._conn.execute("PRAGMA page_size").fetchone()[0]
+            stats = dict(self._stats)
+        lookups = stats['hits'] + stats['misses']
+        stats.update({
+            'entries': entries,
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds,
+            'size_bytes': page_count * page_size,
+            'hit_ratio': stats['hits'] / lookups if lookups else 0.0,
+            'corpus_version': self.get_corpus_version(),
+            'database_path': self.db_path
+        })
+        return stats
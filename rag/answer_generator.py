@@ -7,14 +7,26 @@ It implements prompt engineering and response quality assessment.
 
 import json
 import re
-from typing import Dict, List, Tuple, Optional
+import asyncio
+import hashlib
+from concurrent.futures import Executor
+from functools import partial
+from typing import Callable, Dict, Iterator, List, Tuple, Optional, Union
 from dataclasses import dataclass
 import logging
-import requests
 import time
 
+import numpy as np
+
 # Use relative import for QueryProcessor
-from .query_processor import QueryProcessor
+from .query_processor import QueryProcessor, ProcessedQuery
+from .context_packer import estimate_tokens
+from .ollama_client import OllamaClient, OllamaClientConfig, AsyncOllamaClient
+from .ollama_pool import OllamaPool
+
+# Sentences with their trailing punctuation; lines are never joined
+SENTENCE_PATTERN = re.compile(r"[^\s.!?][^.!?\n]*(?:[.!?]+|$)", re.MULTILINE)
+WORD_PATTERN = re.compile(r"\w+")
 
 
 @dataclass
@@ -24,6 +36,11 @@ class GeneratedAnswer:
     sources_used: List[str]
     reasoning: str
     answer_type: str  # 'direct', 'analytical', 'comparative', 'explanatory'
+    # Ollama's token counts and durations for the call, when available
+    generation_stats: Optional[Dict] = None
+    # Extractive answers: where each sentence came from, and the best sentence score
+    source_spans: Optional[List[Dict]] = None
+    confidence: Optional[float] = None
 
 
 class AnswerGenerator:
@@ -38,24 +55,58 @@ class AnswerGenerator:
     """
     
     def __init__(self, ollama_url: str = "http://localhost:11434", 
-                 model_name: str = "mistral"):
+                 model_name: str = "mistral", num_ctx: int = None,
+                 client: Union[OllamaClient, OllamaPool] = None,
+                 client_config: OllamaClientConfig = None,
+                 keep_alive_resolver: Callable[[str], str] = None,
+                 query_processor: QueryProcessor = None,
+                 embedding_service=None,
+                 executor: Executor = None):
         """
         Initialize the answer generator.
         
+        The generator is meant to be long-lived: model and context window
+        can be overridden per call, and the HTTP client pools connections.
+        
         Args:
             ollama_url: Ollama server URL
-            model_name: Name of the Ollama model to use
+            model_name: Default Ollama model to use
+            num_ctx: Default context window to request from Ollama (optional)
+            client: Shared sync Ollama client or endpoint pool (optional)
+            client_config: Connection settings used when creating clients (optional)
+            keep_alive_resolver: Returns the Ollama keep_alive for a model name (optional)
+            query_processor: Shared query processor, used when a call has no processed query (optional)
+            embedding_service: Embedding service used to rank sentences for extractive answers (optional)
+            executor: Bounded executor for blocking generation in the async path
+                (optional; defaults to the event loop's executor)
         """
         self.ollama_url = ollama_url
         self.model_name = model_name
+        self.num_ctx = num_ctx
+        self.client_config = client_config or OllamaClientConfig(base_url=ollama_url)
+        self.client = client or OllamaClient(self.client_config)
+        self.keep_alive_resolver = keep_alive_resolver
+        self._async_client = None
+        self._async_warning_logged = False
         self.logger = logging.getLogger(__name__)
-        self.query_processor = QueryProcessor()
+        self.query_processor = query_processor or QueryProcessor()
+        self.embedding_service = embedding_service
+        self.executor = executor
         
         # Answer generation parameters
         self.max_answer_length = 1000
+        self.max_answer_tokens = 500  # num_predict when a call sets none
         self.min_confidence_threshold = 0.3
         self.max_retries = 3
         
+        # Extractive answers: question types and retrieval strength that qualify,
+        # and the sentence score an automatic extractive answer must reach
+        self.extractive_question_types = ('definition', 'factual', 'person')
+        self.extractive_min_retrieval_similarity = 0.75
+        self.extractive_min_sentence_score = 0.5
+        self.extractive_max_chunks = 2
+        self.extractive_runner_up_ratio = 0.85
+        
         # Prompt templates
         self.prompt_templates = {
             'general': self._get_general_prompt(),
@@ -141,52 +192,242 @@ Instructions:
 
 Analysis:"""
     
-    def generate_answer(self, query: str, context: str) -> GeneratedAnswer:
+    def prompt_fingerprint(self) -> str:
+        """
+        Get a fingerprint of the prompt templates, for cache keys.
+        
+        Returns:
+            Short hex digest of all templates
+        """
+        raw = "\x00".join(f"{name}={template}" for name, template in sorted(self.prompt_templates.items()))
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:16]
+    
+    def estimate_prompt_tokens(self, query: str) -> int:
+        """
+        Estimate prompt tokens excluding context, for the largest template.
+        
+        Args:
+            query: User's question
+            
+        Returns:
+            Estimated token count of the prompt without context
+        """
+        return max(
+            estimate_tokens(template.format(context="", query=query))
+            for template in self.prompt_templates.values()
+        )
+    
+    def generate_answer(self, query: str, context: str, model_name: str = None,
+                        num_ctx: int = None,
+                        processed_query: ProcessedQuery = None,
+                        num_predict: int = None,
+                        read_timeout: float = None,
+                        expires_at: float = None) -> GeneratedAnswer:
         """
         Generate an answer using Ollama.
         
         Args:
             query: User's question
             context: Built context from documents
+            model_name: Ollama model override for this call (optional)
+            num_ctx: Context window override for this call (optional)
+            processed_query: Analysis of the query from earlier stages (optional)
+            num_predict: Maximum number of answer tokens for this call (optional)
+            read_timeout: Read timeout for each attempt of this call (optional)
+            expires_at: Monotonic time by which the call must finish, e.g. the
+                request deadline; attempts are cut short and not retried past
+                it (optional)
             
         Returns:
             Generated answer with metadata
         """
         try:
-            # Process query to determine answer type
-            processed_query = self.query_processor.process_query(query)
-            answer_type = self._determine_answer_type(processed_query)
-            
-            # Select appropriate prompt template
-            prompt_template = self.prompt_templates.get(answer_type, self.prompt_templates['general'])
-            
-            # Build the prompt
-            prompt = prompt_template.format(
-                context=context,
-                query=query
-            )
+            prompt, answer_type = self._build_prompt(query, context, processed_query)
             
             # Generate answer using Ollama
-            raw_answer = self._call_ollama(prompt)
+            payload = self._build_payload(prompt, stream=False, model_name=model_name,
+                                          num_ctx=num_ctx, num_predict=num_predict)
+            result = self._call_ollama(payload, read_timeout=read_timeout, expires_at=expires_at)
+            raw_answer = result.get('response', '').strip()
             
-            # Process and structure the answer
-            processed_answer = self._process_answer(raw_answer, query, context)
+            return self._finalize_answer(raw_answer, query, context, answer_type,
+                                         generation_stats=self._generation_stats(result))
             
-            # Extract sources from context
-            sources = self._extract_sources_from_context(context)
+        except Exception as e:
+            self.logger.error(f"Error generating answer: {e}")
+            return self._generate_fallback_answer(query, context)
+    
+    async def generate_answer_async(self, query: str, context: str, model_name: str = None,
+                                    num_ctx: int = None,
+                                    processed_query: ProcessedQuery = None,
+                                    num_predict: int = None,
+                                    read_timeout: float = None,
+                                    expires_at: float = None) -> GeneratedAnswer:
+        """
+        Generate an answer using the async Ollama client.
+        
+        Endpoint pools have no async client; the blocking path then runs on
+        the generator's executor.
+        
+        Args:
+            query: User's question
+            context: Built context from documents
+            model_name: Ollama model override for this call (optional)
+            num_ctx: Context window override for this call (optional)
+            processed_query: Analysis of the query from earlier stages (optional)
+            num_predict: Maximum number of answer tokens for this call (optional)
+            read_timeout: Read timeout for each attempt of this call (optional)
+            expires_at: Monotonic time by which the call must finish, e.g. the
+                request deadline; attempts are cut short and not retried past
+                it (optional)
             
-            return GeneratedAnswer(
-                answer=processed_answer,
-                sources_used=sources,
-                reasoning=self._generate_reasoning(query, processed_answer),
-                answer_type=answer_type
+        Returns:
+            Generated answer with metadata
+        """
+        if not self._async_supported():
+            return await asyncio.get_running_loop().run_in_executor(
+                self.executor, partial(self.generate_answer, query, context,
+                              model_name=model_name, num_ctx=num_ctx,
+                              processed_query=processed_query,
+                              num_predict=num_predict, read_timeout=read_timeout,
+                              expires_at=expires_at)
             )
-            
+        try:
+            prompt, answer_type = self._build_prompt(query, context, processed_query)
+            payload = self._build_payload(prompt, stream=False, model_name=model_name,
+                                          num_ctx=num_ctx, num_predict=num_predict)
+            result = await self._call_ollama_async(payload, read_timeout=read_timeout,
+                                                   expires_at=expires_at)
+            raw_answer = result.get('response', '').strip()
+            return self._finalize_answer(raw_answer, query, context, answer_type,
+                                         generation_stats=self._generation_stats(result))
         except Exception as e:
             self.logger.error(f"Error generating answer: {e}")
             return self._generate_fallback_answer(query, context)
     
-    def _determine_answer_type(self, processed_query: Dict) -> str:
+    def stream_answer(self, query: str, context: str, model_name: str = None,
+                      num_ctx: int = None,
+                      processed_query: ProcessedQuery = None,
+                      num_predict: int = None,
+                      read_timeout: float = None,
+                      expires_at: float = None) -> 'AnswerStream':
+        """
+        Generate an answer using Ollama, streaming tokens as they arrive.
+        
+        Args:
+            query: User's question
+            context: Built context from documents
+            model_name: Ollama model override for this call (optional)
+            num_ctx: Context window override for this call (optional)
+            processed_query: Analysis of the query from earlier stages (optional)
+            num_predict: Maximum number of answer tokens for this call (optional)
+            read_timeout: Read timeout for each attempt of this call (optional)
+            expires_at: Monotonic time by which the call must finish, e.g. the
+                request deadline; attempts are cut short and not retried past
+                it (optional)
+            
+        Returns:
+            Answer stream; iterate it for tokens, then read ``answer``
+        """
+        return AnswerStream(self, query, context, model_name=model_name, num_ctx=num_ctx,
+                            processed_query=processed_query, num_predict=num_predict,
+                            read_timeout=read_timeout, expires_at=expires_at)
+    
+    def _async_supported(self) -> bool:
+        """Whether generation can use the native async client."""
+        if isinstance(self.client, OllamaPool):
+            return False
+        try:
+            self.async_client
+        except ImportError as e:
+            if not self._async_warning_logged:
+                self.logger.warning(f"Async generation unavailable, using worker threads: {e}")
+                self._async_warning_logged = True
+            return False
+        return True
+    
+    @property
+    def async_client(self) -> AsyncOllamaClient:
+        """Async Ollama client, created on first use from the same settings."""
+        if self._async_client is None:
+            self._async_client = AsyncOllamaClient(self.client_config)
+        return self._async_client
+    
+    def _build_prompt(self, query: str, context: str,
+                      processed_query: ProcessedQuery = None) -> Tuple[str, str]:
+        """
+        Build the prompt for a query.
+        
+        Args:
+            query: User's question
+            context: Built context from documents
+            processed_query: Analysis of the query; computed if not given
+            
+        Returns:
+            Tuple of (prompt, answer_type)
+        """
+        # Process query to determine answer type
+        if processed_query is None:
+            processed_query = self.query_processor.process_query(query)
+        answer_type = self.determine_answer_type(processed_query)
+        
+        # Select appropriate prompt template
+        prompt_template = self.prompt_templates.get(answer_type, self.prompt_templates['general'])
+        
+        prompt = prompt_template.format(
+            context=context,
+            query=query
+        )
+        return prompt, answer_type
+    
+    def _finalize_answer(self, raw_answer: str, query: str, context: str,
+                         answer_type: str, generation_stats: Dict = None) -> GeneratedAnswer:
+        """
+        Process a raw model answer into a generated answer.
+        
+        Args:
+            raw_answer: Raw answer from Ollama
+            query: User's question
+            context: Used context
+            answer_type: Answer type of the prompt
+            generation_stats: Ollama token counts and durations (optional)
+            
+        Returns:
+            Generated answer with metadata
+        """
+        processed_answer = self._process_answer(raw_answer, query, context)
+        sources = self._extract_sources_from_context(context)
+        return GeneratedAnswer(
+            answer=processed_answer,
+            sources_used=sources,
+            reasoning=self._generate_reasoning(query, processed_answer),
+            answer_type=answer_type,
+            generation_stats=generation_stats
+        )
+    
+    @staticmethod
+    def _generation_stats(result: Dict) -> Optional[Dict]:
+        """
+        Extract Ollama's token counts and durations from a final response.
+        
+        Durations are reported by Ollama in nanoseconds and kept as-is.
+        
+        Args:
+            result: Final (``done``) response object from Ollama
+            
+        Returns:
+            Dictionary of counts, durations and tokens per second, or None
+        """
+        keys = ('prompt_eval_count', 'prompt_eval_duration', 'eval_count',
+                'eval_duration', 'load_duration', 'total_duration')
+        stats = {key: result[key] for key in keys if result.get(key) is not None}
+        if not stats:
+            return None
+        if stats.get('eval_count') and stats.get('eval_duration'):
+            stats['tokens_per_second'] = stats['eval_count'] / (stats['eval_duration'] / 1e9)
+        return stats
+    
+    def determine_answer_type(self, processed_query: ProcessedQuery) -> str:
         """
         Determine the type of answer to generate.
         
@@ -196,9 +437,8 @@ Analysis:"""
         Returns:
             Answer type string
         """
-        intent = processed_query['intent']
-        question_type = intent.get('question_type', 'general')
-        intent_category = intent.get('intent_category', 'information')
+        question_type = processed_query.intent.question_type
+        intent_category = processed_query.intent.intent_category
         
         # Map question types to answer types
         type_mapping = {
@@ -218,40 +458,66 @@ Analysis:"""
         
         return type_mapping.get(question_type, 'general')
     
-    def _call_ollama(self, prompt: str) -> str:
+    def _build_payload(self, prompt: str, stream: bool, model_name: str = None,
+                       num_ctx: int = None, num_predict: int = None) -> Dict:
         """
-        Call Ollama API to generate response.
+        Build the Ollama /api/generate request body.
         
         Args:
             prompt: Complete prompt for Ollama
+            stream: Whether Ollama should stream the response
+            model_name: Ollama model override (optional)
+            num_ctx: Context window override (optional)
+            num_predict: Answer token limit (optional; default max_answer_tokens)
             
         Returns:
-            Generated response from Ollama
+            Request payload
         """
+        num_ctx = num_ctx or self.num_ctx
+        model_name = model_name or self.model_name
         payload = {
-            "model": self.model_name,
+            "model": model_name,
             "prompt": prompt,
-            "stream": False,
+            "stream": stream,
             "options": {
                 "temperature": 0.7,
                 "top_p": 0.9,
-                "max_tokens": 500
+                "num_predict": num_predict or self.max_answer_tokens
             }
         }
+        if num_ctx:
+            payload["options"]["num_ctx"] = num_ctx
+        if self.keep_alive_resolver is not None:
+            payload["keep_alive"] = self.keep_alive_resolver(model_name)
+        return payload
+    
+    @staticmethod
+    def _attempt_timeout(read_timeout: Optional[float], expires_at: Optional[float]) -> Optional[float]:
+        """Read timeout for the next attempt, capped by the time left before ``expires_at``."""
+        if expires_at is None:
+            return read_timeout
+        remaining = expires_at - time.monotonic()
+        return remaining if read_timeout is None else min(read_timeout, remaining)
+    
+    def _call_ollama(self, payload: Dict, read_timeout: float = None,
+                     expires_at: float = None) -> Dict:
+        """
+        Call Ollama API to generate response.
         
+        Args:
+            payload: Request payload from _build_payload
+            read_timeout: Read timeout per attempt (optional)
+            expires_at: Monotonic time after which no attempt is started (optional)
+            
+        Returns:
+            Ollama response object (``response`` text plus timing fields)
+        """
         for attempt in range(self.max_retries):
+            timeout = self._attempt_timeout(read_timeout, expires_at)
+            if timeout is not None and timeout <= 0:
+                break
             try:
-                response = requests.post(
-                    f"{self.ollama_url}/api/generate",
-                    json=payload,
-                    timeout=30
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    return result.get('response', '').strip()
-                else:
-                    self.logger.warning(f"Ollama API error (attempt {attempt + 1}): {response.status_code}")
+                return self.client.generate(payload, read_timeout=timeout)
                     
             except Exception as e:
                 self.logger.warning(f"Ollama call failed (attempt {attempt + 1}): {e}")
@@ -260,6 +526,71 @@ Analysis:"""
         
         raise Exception("Failed to generate answer after all retries")
     
+    async def _call_ollama_async(self, payload: Dict, read_timeout: float = None,
+                                 expires_at: float = None) -> Dict:
+        """
+        Async variant of _call_ollama, with the same retries.
+        
+        Args:
+            payload: Request payload from _build_payload
+            read_timeout: Read timeout per attempt (optional)
+            expires_at: Monotonic time after which no attempt is started (optional)
+            
+        Returns:
+            Ollama response object
+        """
+        for attempt in range(self.max_retries):
+            timeout = self._attempt_timeout(read_timeout, expires_at)
+            if timeout is not None and timeout <= 0:
+                break
+            try:
+                return await self.async_client.generate(payload, read_timeout=timeout)
+            except Exception as e:
+                self.logger.warning(f"Ollama call failed (attempt {attempt + 1}): {e}")
+                if attempt < self.max_retries - 1:
+                    await asyncio.sleep(1)
+        
+        raise Exception("Failed to generate answer after all retries")
+    
+    def _stream_ollama(self, payload: Dict, stats: Dict = None,
+                       read_timeout: float = None,
+                       expires_at: float = None) -> Iterator[str]:
+        """
+        Call Ollama API and yield response fragments as they are generated.
+        
+        Ollama streams newline-delimited JSON objects; each carries a
+        ``response`` fragment and the last one has ``done`` set. The stream
+        is not retried once it has started. The read timeout only bounds the
+        gap between chunks, so ``expires_at`` is checked as each chunk
+        arrives; past it the stream is closed, which stops generation, and
+        ``stats['done_reason']`` is set to ``'deadline'``.
+        
+        Args:
+            payload: Request payload from _build_payload
+            stats: Dictionary filled with Ollama's generation stats from the
+                final chunk (optional)
+            read_timeout: Per-call read timeout (optional)
+            expires_at: Monotonic time after which the stream is cut (optional)
+            
+        Yields:
+            Response fragments
+        """
+        chunks = self.client.stream_generate(payload, read_timeout=read_timeout)
+        try:
+            for chunk in chunks:
+                if expires_at is not None and not chunk.get('done') and time.monotonic() >= expires_at:
+                    self.logger.warning("Request deadline reached; ending the answer stream early")
+                    if stats is not None:
+                        stats['done_reason'] = 'deadline'
+                    return
+                fragment = chunk.get('response', '')
+                if fragment:
+                    yield fragment
+                if chunk.get('done') and stats is not None:
+                    stats.update(self._generation_stats(chunk) or {})
+        finally:
+            chunks.close()
+    
     def _process_answer(self, raw_answer: str, query: str, context: str) -> str:
         """
         Process and clean the raw answer from Ollama.
@@ -362,6 +693,148 @@ Analysis:"""
         
         return "; ".join(reasoning_parts) if reasoning_parts else "Answer generated based on available context"
     
+    def should_answer_extractively(self, processed_query: ProcessedQuery,
+                                   retrieval_results: List) -> bool:
+        """
+        Whether a question is simple enough to answer from one strong chunk.
+        
+        Args:
+            processed_query: Analysis of the query
+            retrieval_results: Retrieved chunks, best first
+            
+        Returns:
+            True for definition and factual questions with a strong top match
+        """
+        if not retrieval_results:
+            return False
+        if processed_query.intent.question_type not in self.extractive_question_types:
+            return False
+        if processed_query.intent.intent_category not in ('definition', 'information'):
+            return False
+        best_similarity = max(result.similarity_score for result in retrieval_results)
+        return best_similarity >= self.extractive_min_retrieval_similarity
+    
+    def generate_extractive_answer(self, query: str, retrieval_results: List,
+                                   processed_query: ProcessedQuery = None,
+                                   query_embedding: np.ndarray = None,
+                                   max_sentences: int = 3) -> GeneratedAnswer:
+        """
+        Answer with sentences copied from the top chunks, without calling Ollama.
+        
+        Sentences of the best chunks are ranked by embedding similarity to
+        the query (keyword overlap without an embedding service). The best
+        sentence and any close runners-up are returned in document order,
+        with their exact character spans in the chunk content.
+        
+        Args:
+            query: User's question
+            retrieval_results: Retrieved chunks, best first
+            processed_query: Analysis of the query; computed if not given
+            query_embedding: Unit-normalized query embedding (optional)
+            max_sentences: Maximum number of sentences in the answer
+            
+        Returns:
+            Extractive answer; ``confidence`` holds the best sentence score
+        """
+        chunks = retrieval_results[:self.extractive_max_chunks]
+        candidates = [
+            (chunk_rank, span_start, span_end, text)
+            for chunk_rank, chunk in enumerate(chunks)
+            for span_start, span_end, text in self._split_sentences(chunk.content)
+        ]
+        if not candidates:
+            return GeneratedAnswer(
+                answer="I couldn't find a passage in the documents that answers this question.",
+                sources_used=[],
+                reasoning="No sentences to extract from the retrieved documents",
+                answer_type="extractive",
+                confidence=0.0
+            )
+        
+        scores = self._score_sentences(query, [text for _, _, _, text in candidates],
+                                       processed_query, query_embedding)
+        best_score = max(scores)
+        ranked = sorted(range(len(candidates)), key=lambda i: -scores[i])
+        chosen = [i for i in ranked[:max_sentences]
+                  if scores[i] >= best_score * self.extractive_runner_up_ratio]
+        chosen.sort(key=lambda i: candidates[i][:2])
+        
+        spans = []
+        for i in chosen:
+            chunk_rank, span_start, span_end, text = candidates[i]
+            chunk = chunks[chunk_rank]
+            spans.append({
+                'file_name': chunk.file_name,
+                'chunk_index': chunk.chunk_index,
+                'start': span_start,
+                'end': span_end,
+                'text': text,
+                'score': float(scores[i])
+            })
+        return GeneratedAnswer(
+            answer=" ".join(span['text'] for span in spans),
+            sources_used=list(dict.fromkeys(span['file_name'] for span in spans if span['file_name'])),
+            reasoning="Sentences extracted from the retrieved documents without calling the model",
+            answer_type="extractive",
+            source_spans=spans,
+            confidence=float(best_score)
+        )
+    
+    @staticmethod
+    def _split_sentences(content: str) -> List[Tuple[int, int, str]]:
+        """
+        Split text into sentences with their character offsets.
+        
+        Headings, source markers and fragments under three words are skipped.
+        
+        Args:
+            content: Chunk text
+            
+        Returns:
+            List of (start, end, sentence); ``content[start:end] == sentence``
+        """
+        sentences = []
+        for match in SENTENCE_PATTERN.finditer(content):
+            text = match.group().rstrip()
+            if len(text.split()) < 3 or text.startswith(('#', '[Source:')):
+                continue
+            sentences.append((match.start(), match.start() + len(text), text))
+        return sentences
+    
+    def _score_sentences(self, query: str, sentences: List[str],
+                         processed_query: Optional[ProcessedQuery],
+                         query_embedding: Optional[np.ndarray]) -> List[float]:
+        """
+        Score candidate sentences against the query.
+        
+        Args:
+            query: User's question
+            sentences: Candidate sentences
+            processed_query: Analysis of the query (optional)
+            query_embedding: Unit-normalized query embedding (optional)
+            
+        Returns:
+            Cosine similarity per sentence, or the fraction of query keywords
+            each sentence contains when no embedding service is available
+        """
+        if self.embedding_service is not None:
+            try:
+                if query_embedding is None:
+                    embeddings = self.embedding_service.encode_normalized([query] + sentences)
+                    query_embedding, embeddings = embeddings[0], embeddings[1:]
+                else:
+                    embeddings = self.embedding_service.encode_normalized(sentences)
+                return (embeddings @ query_embedding).tolist()
+            except Exception as e:
+                self.logger.warning(f"Embedding sentences failed, using keyword overlap: {e}")
+        if processed_query is None:
+            processed_query = self.query_processor.process_query(query)
+        keywords = set(processed_query.keywords)
+        if not keywords:
+            return [0.0] * len(sentences)
+        return [len(keywords & set(WORD_PATTERN.findall(sentence.lower()))) / len(keywords)
+                for sentence in sentences]
+    
     def _generate_fallback_answer(self, query: str, context: str) -> GeneratedAnswer:
         """
         Generate a fallback answer when Ollama fails.
@@ -425,6 +898,92 @@ Analysis:"""
         return is_valid, issues
 
 
+class AnswerStream:
+    """
+    Iterable over answer tokens streamed from Ollama.
+    
+    After iteration completes, ``answer`` holds the processed
+    GeneratedAnswer and the timing attributes are populated. If the stream
+    fails before any token arrives, the fallback answer is yielded instead.
+    ``finish_reason`` is ``'done'``, ``'deadline'`` when the stream was cut
+    at ``expires_at``, or ``'error'``.
+    """
+    
+    def __init__(self, generator: AnswerGenerator, query: str, context: str,
+                 model_name: str = None, num_ctx: int = None,
+                 processed_query: ProcessedQuery = None,
+                 num_predict: int = None, read_timeout: float = None,
+                 expires_at: float = None):
+        """
+        Initialize the answer stream.
+        
+        Args:
+            generator: Answer generator that owns the Ollama client
+            query: User's question
+            context: Built context from documents
+            model_name: Ollama model override (optional)
+            num_ctx: Context window override (optional)
+            processed_query: Analysis of the query (optional)
+            num_predict: Answer token limit (optional)
+            read_timeout: Read timeout for the stream (optional)
+            expires_at: Monotonic time by which the stream must finish (optional)
+        """
+        self.generator = generator
+        self.query = query
+        self.context = context
+        self.model_name = model_name
+        self.num_ctx = num_ctx
+        self.processed_query = processed_query
+        self.num_predict = num_predict
+        self.read_timeout = read_timeout
+        self.expires_at = expires_at
+        self.answer: Optional[GeneratedAnswer] = None
+        self.time_to_first_token: Optional[float] = None
+        self.generation_time: Optional[float] = None
+        self.finish_reason: Optional[str] = None
+    
+    def __iter__(self) -> Iterator[str]:
+        start_time = time.time()
+        fragments = []
+        try:
+            prompt, answer_type = self.generator._build_prompt(
+                self.query, self.context, self.processed_query
+            )
+            payload = self.generator._build_payload(
+                prompt, stream=True, model_name=self.model_name, num_ctx=self.num_ctx,
+                num_predict=self.num_predict
+            )
+            stats = {}
+            read_timeout = self.generator._attempt_timeout(self.read_timeout, self.expires_at)
+            if read_timeout is not None:
+                read_timeout = max(read_timeout, 0.001)
+            for fragment in self.generator._stream_ollama(payload, stats, read_timeout=read_timeout,
+                                                          expires_at=self.expires_at):
+                if self.time_to_first_token is None:
+                    self.time_to_first_token = time.time() - start_time
+                fragments.append(fragment)
+                yield fragment
+            self.finish_reason = stats.get('done_reason', 'done')
+            self.answer = self.generator._finalize_answer(
+                "".join(fragments).strip(), self.query, self.context, answer_type,
+                generation_stats=stats or None
+            )
+        except Exception as e:
+            self.generator.logger.error(f"Error streaming answer: {e}")
+            self.finish_reason = 'error'
+            if fragments:
+                # Keep what the client has already seen
+                self.answer = self.generator._finalize_answer(
+                    "".join(fragments).strip(), self.query, self.context, "partial"
+                )
+            else:
+                self.answer = self.generator._generate_fallback_answer(self.query, self.context)
+                self.time_to_first_token = time.time() - start_time
+                yield self.answer.answer
+        finally:
+            self.generation_time = time.time() - start_time
+
+
 # Example usage and testing
 if __name__ == "__main__":
     # Set up logging
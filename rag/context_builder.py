@@ -12,8 +12,12 @@ from dataclasses import dataclass
 import logging
 from collections import defaultdict
 
+import numpy as np
+
 # Use relative import for RetrievalResult
 from .retrieval_engine import RetrievalResult
+from .context_packer import ContextPacker, ContextPiece, estimate_tokens
+from .context_compressor import ContextCompressor
 
 
 @dataclass
@@ -23,6 +27,18 @@ class ContextSection:
     source: str
     relevance_score: float
     section_type: str  # 'main', 'supporting', 'background'
+    token_count: Optional[int] = None
+
+
+@dataclass
+class BuiltContext:
+    """Data class for a built context with token usage."""
+    text: str
+    tokens_used: int
+    token_budget: Optional[int] = None
+    sections_included: int = 0
+    sections_dropped: int = 0
+    compression: Optional[Dict] = None
 
 
 class ContextBuilder:
@@ -36,20 +52,28 @@ class ContextBuilder:
     - Relevance-based ordering
     """
     
-    def __init__(self, max_context_length: int = 3000):
+    def __init__(self, max_context_length: int = 3000, mmr_lambda: float = 0.7,
+                 compressor: Optional[ContextCompressor] = None):
         """
         Initialize the context builder.
         
         Args:
             max_context_length: Maximum context length in characters
+            mmr_lambda: Relevance/diversity trade-off for MMR (1.0 = relevance only)
+            compressor: Extractive compressor used when compression is requested
         """
         self.max_context_length = max_context_length
+        self.mmr_lambda = mmr_lambda
+        self.compressor = compressor
         self.logger = logging.getLogger(__name__)
         
         # Context organization parameters
         self.min_section_length = 50
         self.max_sections = 5
         self.relevance_threshold = 0.4
+        self.main_section_chunks = 2
+        self.duplicate_similarity_threshold = 0.95
+        self.packer = ContextPacker()
         
     def build_context(self, query: str, retrieval_results: List[RetrievalResult]) -> str:
         """
@@ -77,6 +101,109 @@ class ContextBuilder:
         
         return context
     
+    def build_context_with_stats(self, query: str, retrieval_results: List[RetrievalResult],
+                                 token_budget: int = None,
+                                 compress: bool = False) -> BuiltContext:
+        """
+        Build context and report token usage.
+        
+        With a token budget, sections are packed in order into exactly that
+        many tokens, trimming the last one at sentence boundaries. Without
+        one, the character limit of ``build_context`` applies.
+        
+        Args:
+            query: Original user query
+            retrieval_results: List of retrieved document chunks
+            token_budget: Maximum number of context tokens (optional)
+            compress: Run extractive compression before building (optional)
+            
+        Returns:
+            Built context with token statistics
+        """
+        compression_info = None
+        if compress and self.compressor is not None and retrieval_results:
+            # Select first so only chunks that can reach the context are encoded
+            if self.can_diversify(retrieval_results):
+                retrieval_results = self.diversify(
+                    retrieval_results, max_results=self.main_section_chunks + self.max_sections - 1
+                )
+            compression = self.compressor.compress(query, retrieval_results, token_budget)
+            retrieval_results = compression.results
+            compression_info = {
+                'original_tokens': compression.original_tokens,
+                'compressed_tokens': compression.compressed_tokens,
+                'compression_ratio': compression.compression_ratio,
+                'sentences_kept': compression.sentences_kept,
+                'sentences_total': compression.sentences_total,
+                'latency_ms': compression.latency_ms,
+                'estimated_time_saved_ms': compression.estimated_time_saved_ms
+            }
+        
+        if token_budget is None:
+            context = self.build_context(query, retrieval_results)
+            return BuiltContext(text=context, tokens_used=estimate_tokens(context),
+                                compression=compression_info)
+        
+        if not retrieval_results:
+            context = "No relevant information found."
+            return BuiltContext(text=context, tokens_used=estimate_tokens(context),
+                                token_budget=token_budget, compression=compression_info)
+        
+        sections = self._organize_into_sections(query, retrieval_results)
+        packed = self.packer.pack(self._sections_to_pieces(sections), token_budget)
+        return BuiltContext(
+            text=packed.text,
+            tokens_used=packed.tokens_used,
+            token_budget=token_budget,
+            sections_included=packed.pieces_included,
+            sections_dropped=packed.pieces_dropped,
+            compression=compression_info
+        )
+    
+    def _sections_to_pieces(self, sections: List[ContextSection]) -> List[ContextPiece]:
+        """
+        Convert sections into packable pieces in context order.
+        
+        Headings are attached to the first section of their group so they
+        are never packed on their own; joined with blank lines the pieces
+        reproduce ``_create_structured_context``.
+        
+        Args:
+            sections: List of context sections
+            
+        Returns:
+            List of context pieces
+        """
+        pieces = []
+        main_sections = [s for s in sections if s.section_type == "main"]
+        supporting_sections = [s for s in sections if s.section_type == "supporting"]
+        
+        for i, section in enumerate(main_sections):
+            prefix = "## Main Information\n\n" if i == 0 else ""
+            pieces.append(self._section_piece(prefix, section.content, section.token_count))
+        
+        for i, section in enumerate(supporting_sections):
+            prefix = "\n## Additional Information\n\n" if i == 0 else ""
+            prefix += f"[Source: {section.source}]\n"
+            pieces.append(self._section_piece(prefix, section.content, section.token_count))
+        
+        return pieces
+    
+    def _section_piece(self, prefix: str, content: str,
+                       content_tokens: Optional[int]) -> ContextPiece:
+        """Create a context piece, reusing the precomputed content token count."""
+        token_count = None
+        if content_tokens is not None:
+            token_count = estimate_tokens(prefix) + content_tokens
+        return ContextPiece(text=prefix + content, token_count=token_count)
+    
+    def _sum_token_counts(self, results: List[RetrievalResult]) -> Optional[int]:
+        """Sum precomputed chunk token counts, or None if any is missing."""
+        counts = [getattr(r, 'token_count', None) for r in results]
+        if any(count is None for count in counts):
+            return None
+        return sum(counts) + self.packer.separator_tokens * (len(counts) - 1)
+    
     def _organize_into_sections(self, query: str, 
                                results: List[RetrievalResult]) -> List[ContextSection]:
         """
@@ -89,6 +216,9 @@ class ContextBuilder:
         Returns:
             List of context sections
         """
+        if self.can_diversify(results):
+            return self._organize_diversified_sections(results)
+        
         # Group by source and relevance
         source_groups = defaultdict(list)
         
@@ -97,8 +227,11 @@ class ContextBuilder:
         
         sections = []
         
-        # Create main section (highest relevance)
-        main_results = sorted(results, key=lambda x: x.similarity_score, reverse=True)
+        # Create main section (highest relevance; a reranked order is already by relevance)
+        if self.is_reranked(results):
+            main_results = list(results)
+        else:
+            main_results = sorted(results, key=lambda x: x.similarity_score, reverse=True)
         if main_results:
             main_content = self._combine_chunks(main_results[:2])  # Top 2 results
             main_section = ContextSection(
@@ -125,12 +258,119 @@ class ContextBuilder:
                     content=supporting_content,
                     source=source,
                     relevance_score=source_results[0].similarity_score,
-                    section_type="supporting"
+                    section_type="supporting",
+                    token_count=getattr(source_results[0], 'token_count', None)
                 )
                 sections.append(supporting_section)
         
         return sections
     
+    def can_diversify(self, results: List[RetrievalResult]) -> bool:
+        """
+        Check whether MMR diversification can run on the given results.
+        
+        Args:
+            results: Retrieval results
+            
+        Returns:
+            True if every result carries an embedding
+        """
+        return bool(results) and all(
+            getattr(result, 'embedding', None) is not None and len(result.embedding) > 0
+            for result in results
+        )
+    
+    def is_reranked(self, results: List[RetrievalResult]) -> bool:
+        """Check whether the results arrive in cross-encoder order."""
+        return any(result.rerank_score is not None for result in results)
+    
+    def diversify(self, results: List[RetrievalResult],
+                  max_results: int = None) -> List[RetrievalResult]:
+        """
+        Order results by maximal marginal relevance.
+        
+        Relevance is the retrieval similarity score, or for reranked results
+        the position in the incoming (cross-encoder) order, ``1 - rank / n``,
+        since bi-encoder scores would undo the rerank. Redundancy is the
+        cosine similarity between chunk embeddings. The pairwise similarity matrix is
+        computed once and the greedy selection keeps a running max per
+        candidate, so the whole step is a handful of vector operations.
+        Near-duplicates of an already selected chunk are dropped.
+        
+        Args:
+            results: Retrieval results with embeddings
+            max_results: Maximum number of results to select
+            
+        Returns:
+            Selected results in MMR order
+        """
+        if max_results is None:
+            max_results = len(results)
+        
+        embeddings = np.vstack([np.asarray(r.embedding, dtype=np.float32) for r in results])
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings = embeddings / np.maximum(norms, 1e-12)
+        similarity = embeddings @ embeddings.T
+        if self.is_reranked(results):
+            relevance = 1.0 - np.arange(len(results), dtype=np.float32) / len(results)
+        else:
+            relevance = np.array([r.similarity_score for r in results], dtype=np.float32)
+        
+        available = np.ones(len(results), dtype=bool)
+        max_redundancy = np.full(len(results), -np.inf, dtype=np.float32)
+        selected = []
+        
+        while len(selected) < max_results and available.any():
+            if selected:
+                scores = self.mmr_lambda * relevance - (1 - self.mmr_lambda) * max_redundancy
+            else:
+                scores = relevance.copy()
+            scores[~available] = -np.inf
+            best = int(np.argmax(scores))
+            selected.append(best)
+            available[best] = False
+            max_redundancy = np.maximum(max_redundancy, similarity[best])
+            available &= max_redundancy < self.duplicate_similarity_threshold
+        
+        return [results[i] for i in selected]
+    
+    def _organize_diversified_sections(self, results: List[RetrievalResult]) -> List[ContextSection]:
+        """
+        Organize results into sections using MMR selection.
+        
+        The first selected chunks form the main section and the rest become
+        supporting sections, so redundancy is handled before sectioning.
+        
+        Args:
+            results: Retrieval results with embeddings
+            
+        Returns:
+            List of context sections
+        """
+        selected = self.diversify(results, max_results=self.main_section_chunks + self.max_sections - 1)
+        main_results = selected[:self.main_section_chunks]
+        sections = [ContextSection(
+            content="\n\n".join(r.content.strip() for r in main_results),
+            source="Multiple sources",
+            relevance_score=main_results[0].similarity_score,
+            section_type="main",
+            token_count=self._sum_token_counts(main_results)
+        )]
+        
+        for result in selected[self.main_section_chunks:]:
+            if len(sections) >= self.max_sections:
+                break
+            if len(result.content) >= self.min_section_length:
+                sections.append(ContextSection(
+                    content=result.content,
+                    source=result.file_name,
+                    relevance_score=result.similarity_score,
+                    section_type="supporting",
+                    token_count=getattr(result, 'token_count', None)
+                ))
+        
+        return sections
+    
     def _combine_chunks(self, chunks: List[RetrievalResult]) -> str:
         """
         Combine multiple chunks into coherent content.
@@ -0,0 +1,170 @@
+"""
+Context Compressor for Module 3: Question-Answering Engine
+
+This module performs extractive compression of retrieved chunks before they
+are sent to the LLM. Sentences are scored against the query in one batched
+encode and only the most relevant ones are kept, in document order, so the
+prompt is shorter and prompt evaluation on CPU is faster.
+"""
+
+import time
+import logging
+from typing import List, Optional
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+# Use relative imports for core modules
+from .retrieval_engine import RetrievalResult
+from .embedding_service import EmbeddingService
+from .context_packer import estimate_tokens, split_sentences
+
+
+@dataclass
+class CompressionResult:
+    """Data class for context compression results."""
+    results: List[RetrievalResult]
+    original_tokens: int
+    compressed_tokens: int
+    compression_ratio: float  # compressed / original
+    sentences_kept: int
+    sentences_total: int
+    latency_ms: float
+    estimated_time_saved_ms: float
+
+
+class ContextCompressor:
+    """
+    Extractive compressor for retrieved chunks.
+
+    Features:
+    - Sentence-level relevance scoring in one batched encode
+    - Budget-bounded selection of the highest-scoring sentences
+    - Document order preserved within each chunk
+    - Compression ratio and estimated prompt-eval time saved
+    """
+
+    def __init__(self, embedding_service: EmbeddingService,
+                 target_ratio: float = 0.5,
+                 prompt_tokens_per_second: float = 40.0):
+        """
+        Initialize the context compressor.
+
+        Args:
+            embedding_service: Service used to encode the query and sentences
+            target_ratio: Fraction of the original tokens to keep at most
+            prompt_tokens_per_second: Prompt evaluation rate of the LLM, used
+                to estimate the time saved
+        """
+        self.embedding_service = embedding_service
+        self.target_ratio = target_ratio
+        self.prompt_tokens_per_second = prompt_tokens_per_second
+        self.logger = logging.getLogger(__name__)
+
+    def compress(self, query: str, results: List[RetrievalResult],
+                 token_budget: Optional[int] = None) -> CompressionResult:
+        """
+        Compress retrieval results to their most query-relevant sentences.
+
+        Args:
+            query: Original user query
+            results: Retrieval results to compress
+            token_budget: Maximum tokens to keep (optional)
+
+        Returns:
+            Compression result with rewritten retrieval results
+        """
+        start_time = time.perf_counter()
+
+        # (result index, sentence, token count) in document order
+        sentences = []
+        for result_index, result in enumerate(results):
+            for sentence in split_sentences(result.content):
+                sentences.append((result_index, sentence, estimate_tokens(sentence)))
+
+        original_tokens = sum(tokens for _, _, tokens in sentences)
+        if not sentences:
+            return self._unchanged(results, original_tokens, 0, start_time)
+
+        budget = int(original_tokens * self.target_ratio)
+        if token_budget is not None:
+            budget = min(budget, token_budget)
+
+        try:
+            embeddings = self.embedding_service.encode_normalized(
+                [query] + [sentence for _, sentence, _ in sentences]
+            )
+        except Exception as e:
+            self.logger.error(f"Error encoding sentences for compression: {e}")
+            return self._unchanged(results, original_tokens, len(sentences), start_time)
+
+        scores = embeddings[1:] @ embeddings[0]
+
+        keep = np.zeros(len(sentences), dtype=bool)
+        used = 0
+        for i in np.argsort(-scores):
+            tokens = sentences[i][2]
+            if used + tokens <= budget:
+                keep[i] = True
+                used += tokens
+
+        kept_by_result = [[] for _ in results]
+        for i, (result_index, sentence, _) in enumerate(sentences):
+            if keep[i]:
+                kept_by_result[result_index].append(i)
+
+        compressed_results = []
+        for result, kept in zip(results, kept_by_result):
+            if kept:
+                content = " ".join(sentences[i][1] for i in kept)
+                compressed_results.append(replace(
+                    result, content=content, token_count=estimate_tokens(content),
+                    embedding=self._kept_embedding(result, embeddings[1:][kept])
+                ))
+
+        saved_tokens = original_tokens - used
+        latency_ms = (time.perf_counter() - start_time) * 1000
+        compression = CompressionResult(
+            results=compressed_results,
+            original_tokens=original_tokens,
+            compressed_tokens=used,
+            compression_ratio=used / original_tokens if original_tokens else 1.0,
+            sentences_kept=int(keep.sum()),
+            sentences_total=len(sentences),
+            latency_ms=latency_ms,
+            estimated_time_saved_ms=saved_tokens / self.prompt_tokens_per_second * 1000 - latency_ms
+        )
+        self.logger.info(
+            f"Compressed context {original_tokens} -> {used} tokens "
+            f"({compression.compression_ratio:.2f}) in {latency_ms:.1f}ms"
+        )
+        return compression
+
+    @staticmethod
+    def _kept_embedding(result: RetrievalResult,
+                        sentence_embeddings: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Embedding for a compressed chunk.
+
+        The stored chunk embedding describes the text that was cut, so it is
+        replaced by the normalized mean of the kept sentences' embeddings.
+        Results that arrived without an embedding keep none.
+        """
+        if result.embedding is None:
+            return None
+        mean = sentence_embeddings.mean(axis=0)
+        return (mean / max(float(np.linalg.norm(mean)), 1e-12)).astype(np.float32)
+
+    def _unchanged(self, results: List[RetrievalResult], original_tokens: int,
+                   sentences_total: int, start_time: float) -> CompressionResult:
+        """Return a no-op compression result that keeps every sentence."""
+        return CompressionResult(
+            results=list(results),
+            original_tokens=original_tokens,
+            compressed_tokens=original_tokens,
+            compression_ratio=1.0,
+            sentences_kept=sentences_total,
+            sentences_total=sentences_total,
+            latency_ms=(time.perf_counter() - start_time) * 1000,
+            estimated_time_saved_ms=0.0
+        )
@@ -0,0 +1,228 @@
+"""
+Context Packer for Module 3: Question-Answering Engine
+
+This module fits ranked context pieces into an exact token budget derived
+from the model's context window, the prompt template and the tokens reserved
+for the answer. Pieces are taken in rank order and the last one that does not
+fit is trimmed at sentence boundaries.
+"""
+
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+from dataclasses import dataclass
+
+
+# Words, numbers and individual punctuation marks; sub-word tokenizers used by
+# Ollama models produce roughly 1.3 tokens per such piece for English text.
+_TOKEN_PIECE_PATTERN = re.compile(r"\w+|[^\w\s]")
+_SENTENCE_BOUNDARY_PATTERN = re.compile(r'(?<=[.!?])\s+')
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of LLM tokens in a text.
+
+    Args:
+        text: Input text
+
+    Returns:
+        Estimated token count
+    """
+    if not text:
+        return 0
+    pieces = len(_TOKEN_PIECE_PATTERN.findall(text))
+    return int(pieces * 1.3) + 1
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Split text into sentences, keeping the terminating punctuation.
+
+    Args:
+        text: Input text
+
+    Returns:
+        List of non-empty sentences
+    """
+    return [text[start:end].strip() for start, end in sentence_spans(text)]
+
+
+def sentence_spans(text: str) -> List[Tuple[int, int]]:
+    """
+    Find the character offsets of the sentences in a text.
+
+    Slicing the text at these offsets keeps the original whitespace and
+    line breaks between sentences.
+
+    Args:
+        text: Input text
+
+    Returns:
+        List of (start, end) offsets of non-empty sentences
+    """
+    spans = []
+    start = 0
+    for match in _SENTENCE_BOUNDARY_PATTERN.finditer(text):
+        spans.append((start, match.start()))
+        start = match.end()
+    spans.append((start, len(text)))
+    return [(start, end) for start, end in spans if text[start:end].strip()]
+
+
+@dataclass
+class TokenBudget:
+    """Token budget for a single model."""
+    context_window: int
+    answer_reserve: int = 512
+
+    def available_for_context(self, prompt_tokens: int) -> int:
+        """
+        Tokens left for context after the prompt template and answer.
+
+        Args:
+            prompt_tokens: Tokens used by the prompt template and query
+
+        Returns:
+            Number of tokens available for context (never negative)
+        """
+        return max(self.context_window - prompt_tokens - self.answer_reserve, 0)
+
+
+@dataclass
+class ContextPiece:
+    """A ranked piece of context with its precomputed token count."""
+    text: str
+    token_count: Optional[int] = None
+
+
+@dataclass
+class PackedContext:
+    """Result of packing context into a token budget."""
+    text: str
+    tokens_used: int
+    token_budget: int
+    pieces_included: int
+    pieces_trimmed: int
+    pieces_dropped: int
+
+
+class ContextPacker:
+    """
+    Packs ranked context pieces into a token budget.
+
+    Features:
+    - Uses precomputed token counts when available
+    - Sentence-boundary trimming of the piece that overflows
+    - Reports exact tokens used
+    """
+
+    def __init__(self, token_counter: Callable[[str], int] = estimate_tokens,
+                 separator: str = "\n\n"):
+        """
+        Initialize the context packer.
+
+        Args:
+            token_counter: Function returning the token count of a text
+            separator: Separator placed between pieces
+        """
+        self.token_counter = token_counter
+        self.separator = separator
+        self.separator_tokens = token_counter(separator)
+        self.min_trimmed_tokens = 16
+
+    def pack(self, pieces: List[ContextPiece], token_budget: int) -> PackedContext:
+        """
+        Fill the token budget with pieces in rank order.
+
+        Args:
+            pieces: Ranked context pieces
+            token_budget: Maximum number of tokens for the packed context
+
+        Returns:
+            Packed context with usage statistics
+        """
+        packed_parts = []
+        tokens_used = 0
+        trimmed = 0
+        index = 0
+
+        for index, piece in enumerate(pieces):
+            piece_tokens = piece.token_count
+            if piece_tokens is None:
+                piece_tokens = self.token_counter(piece.text)
+            separator_cost = self.separator_tokens if packed_parts else 0
+
+            if tokens_used + separator_cost + piece_tokens <= token_budget:
+                packed_parts.append(piece.text)
+                tokens_used += separator_cost + piece_tokens
+                continue
+
+            # Trim the overflowing piece at sentence boundaries, then stop
+            remaining = token_budget - tokens_used - separator_cost
+            if remaining >= self.min_trimmed_tokens:
+                trimmed_text, trimmed_tokens = self._trim_to_budget(piece.text, remaining)
+                if trimmed_text:
+                    packed_parts.append(trimmed_text)
+                    tokens_used += separator_cost + trimmed_tokens
+                    trimmed = 1
+                    index += 1
+            break
+        else:
+            index = len(pieces)
+
+        return PackedContext(
+            text=self.separator.join(packed_parts),
+            tokens_used=tokens_used,
+            token_budget=token_budget,
+            pieces_included=len(packed_parts),
+            pieces_trimmed=trimmed,
+            pieces_dropped=len(pieces) - index
+        )
+
+    def _trim_to_budget(self, text: str, token_budget: int) -> tuple:
+        """
+        Keep leading sentences of a text until the budget is reached.
+
+        The kept sentences are sliced from the text, so headers, line breaks
+        and list layout survive the trim.
+
+        Args:
+            text: Text to trim
+            token_budget: Maximum tokens for the trimmed text
+
+        Returns:
+            Tuple of (trimmed_text, token_count)
+        """
+        end = 0
+        used = 0
+        for start, sentence_end in sentence_spans(text):
+            sentence_tokens = self.token_counter(text[start:sentence_end])
+            if used + sentence_tokens > token_budget:
+                break
+            end = sentence_end
+            used += sentence_tokens
+        trimmed_text = text[:end].strip()
+        return trimmed_text, self.token_counter(trimmed_text) if trimmed_text else 0
+
+
+def resolve_token_budget(model_name: str, context_windows: Dict[str, int],
+                         default_context_window: int, answer_reserve: int) -> TokenBudget:
+    """
+    Look up the token budget for a model.
+
+    Model names are matched exactly first, then by family (the part before
+    the ``:`` tag), so ``llama3:8b`` falls back to a ``llama3`` entry.
+
+    Args:
+        model_name: Ollama model name
+        context_windows: Mapping of model name or family to context window
+        default_context_window: Context window for unknown models
+        answer_reserve: Tokens reserved for the answer
+
+    Returns:
+        Token budget for the model
+    """
+    context_window = context_windows.get(model_name)
+    if context_window is None:
+        context_window = context_windows.get(model_name.split(':')[0], default_context_window)
+    return TokenBudget(context_window=context_window, answer_reserve=answer_reserve)
@@ -0,0 +1,144 @@
+"""
+Request Deadlines for Module 3: Question-Answering Engine
+
+This module tracks the time budget of a request. A Deadline is created when
+the request arrives (from a client header or the configured default) and is
+passed down the pipeline; each stage asks it how much time is left. The
+DeadlinePolicy turns the remaining budget into cheaper settings: fewer
+retrieval candidates, no reranking, and a smaller generation limit
+(``num_predict``), and the request fails fast once the budget is spent.
+"""
+
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+
+class RequestTimeoutError(Exception):
+    """Raised when a request's deadline passes before it completes."""
+
+
+@dataclass
+class Deadline:
+    """Time budget of one request, measured on ``time.monotonic()``."""
+    timeout: Optional[float] = None  # seconds; None means unbounded
+    started: float = field(default_factory=time.monotonic)
+    # Stages that ran with reduced settings to fit the budget
+    degraded: List[str] = field(default_factory=list)
+
+    @property
+    def expires_at(self) -> Optional[float]:
+        """Absolute monotonic expiry time, or None when unbounded."""
+        return self.started + self.timeout if self.timeout is not None else None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left (never negative), or None when unbounded."""
+        if self.timeout is None:
+            return None
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        return self.timeout is not None and time.monotonic() >= self.expires_at
+
+    def budget_bucket(self) -> Optional[int]:
+        """
+        Coarse class of the remaining budget, for coalescing keys.
+
+        Budgets in one class are within a factor of two of each other, so
+        requests sharing a result were given similar settings.
+
+        Returns:
+            Power-of-two bucket of the remaining seconds, or None when unbounded
+        """
+        if self.timeout is None:
+            return None
+        return math.ceil(math.log2(max(self.remaining(), 1e-3)))
+
+    def degrade(self, stage: str):
+        """Record that a stage was cut short to fit the budget."""
+        if stage not in self.degraded:
+            self.degraded.append(stage)
+
+    def check(self, stage: str):
+        """
+        Fail fast before starting a stage the request has no time for.
+
+        Args:
+            stage: Name of the stage about to start
+
+        Raises:
+            RequestTimeoutError: The deadline has passed
+        """
+        if self.expired:
+            raise RequestTimeoutError(
+                f"Request deadline of {self.timeout:.2f}s exceeded before {stage}"
+            )
+
+
+@dataclass(frozen=True)
+class DeadlinePolicy:
+    """Maps the remaining budget to per-stage settings."""
+    full_retrieval_seconds: float = 10.0  # below this, candidate counts shrink
+    min_top_k: int = 2
+    skip_rerank_seconds: float = 5.0
+    generation_tokens_per_second: float = 15.0
+    prompt_tokens_per_second: float = 40.0
+    min_answer_tokens: int = 32
+    max_answer_tokens: int = 500
+
+    def retrieval_limits(self, deadline: Optional[Deadline], top_k: int,
+                         variations: int) -> tuple:
+        """
+        Candidate counts for the remaining budget.
+
+        Args:
+            deadline: Request deadline (optional)
+            top_k: Results per query without a deadline
+            variations: Query variations without a deadline
+
+        Returns:
+            Tuple of (top_k, number of variations to search)
+        """
+        remaining = deadline.remaining() if deadline is not None else None
+        if remaining is None or remaining >= self.full_retrieval_seconds:
+            return top_k, variations
+        fraction = remaining / self.full_retrieval_seconds
+        return (max(self.min_top_k, min(top_k, round(top_k * fraction))),
+                max(1, min(variations, round(variations * fraction))))
+
+    def skip_rerank(self, deadline: Optional[Deadline]) -> bool:
+        """Whether the budget is too small to rerank."""
+        remaining = deadline.remaining() if deadline is not None else None
+        return remaining is not None and remaining < self.skip_rerank_seconds
+
+    def num_predict(self, deadline: Optional[Deadline], prompt_tokens: int = 0,
+                    max_tokens: Optional[int] = None) -> Optional[int]:
+        """
+        Answer token limit that fits in the remaining budget.
+
+        Args:
+            deadline: Request deadline (optional)
+            prompt_tokens: Estimated prompt size, whose evaluation is budgeted first
+            max_tokens: Limit without time pressure (default: ``max_answer_tokens``)
+
+        Returns:
+            Token limit, or None when there is no deadline
+        """
+        remaining = deadline.remaining() if deadline is not None else None
+        if remaining is None:
+            return None
+        generation_seconds = remaining - prompt_tokens / self.prompt_tokens_per_second
+        tokens = int(generation_seconds * self.generation_tokens_per_second)
+        return max(self.min_answer_tokens, min(max_tokens or self.max_answer_tokens, tokens))
+
+    def describe(self, deadline: Optional[Deadline]) -> Optional[Dict]:
+        """Deadline summary for result metadata."""
+        if deadline is None or deadline.timeout is None:
+            return None
+        return {
+            'timeout': deadline.timeout,
+            'remaining': deadline.remaining(),
+            'degraded': list(deadline.degraded)
+        }
@@ -1,18 +1,51 @@
+import os
 import numpy as np
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import logging
 
+from .fake_embedder import HashEmbedder
+from .metrics import EMBEDDING_BATCH_SIZE
+
+# Backends: 'sentence-transformers' (default) or 'hash' (deterministic, no weights)
+EMBEDDING_BACKEND_ENV = 'RAG_EMBEDDING_BACKEND'
+EMBEDDING_DIM_ENV = 'RAG_EMBEDDING_DIM'
+# Model behind Chroma's default embedding function (an ONNX export of the same weights)
+CHROMA_DEFAULT_MODEL = 'sentence-transformers/all-MiniLM-L6-v2'
+
+
+def resolve_embedding_backend(backend: Optional[str] = None,
+                              dimension: Optional[int] = None) -> tuple:
+    """Resolve (backend, dimension) from arguments, then environment, then defaults"""
+    backend = (backend or os.environ.get(EMBEDDING_BACKEND_ENV) or 'sentence-transformers').lower()
+    dimension = dimension or int(os.environ.get(EMBEDDING_DIM_ENV, 384))
+    return backend, dimension
+
+
+def default_embedding_function(backend: Optional[str] = None, dimension: Optional[int] = None):
+    """ChromaDB embedding function for the configured backend (None keeps Chroma's default)"""
+    backend, dimension = resolve_embedding_backend(backend, dimension)
+    return HashEmbedder(dimension) if backend == 'hash' else None
+
+
 class EmbeddingService:
     """Generates embeddings for text chunks"""
     
-    def __init__(self, model_name: str = 'sentence-transformers/all-MiniLM-L6-v2'):
-        self.model_name = model_name
+    def __init__(self, model_name: str = 'sentence-transformers/all-MiniLM-L6-v2',
+                 backend: Optional[str] = None, dimension: Optional[int] = None):
+        self.backend, self.dimension = resolve_embedding_backend(backend, dimension)
+        self.model_name = model_name if self.backend != 'hash' else f"hash-{self.dimension}"
         self.logger = logging.getLogger(__name__)
         self.model = None
         self._load_model()
     
     def _load_model(self):
         """Load the embedding model"""
+        if self.backend == 'hash':
+            self.model = HashEmbedder(self.dimension)
+            self.logger.info(f"Using hash embedder with dimension {self.dimension}")
+            return
+        if self.backend != 'sentence-transformers':
+            raise ValueError(f"Unsupported embedding backend: {self.backend}")
         try:
             from sentence_transformers import SentenceTransformer
             self.logger.info(f"Loading embedding model: {self.model_name}")
@@ -29,6 +62,7 @@ class EmbeddingService:
         
         try:
             self.logger.info(f"Generating embeddings for {len(texts)} texts")
+            EMBEDDING_BATCH_SIZE.observe(len(texts))
             embeddings = self.model.encode(texts, show_progress_bar=True)
             
             # Convert to list of numpy arrays
@@ -45,12 +79,35 @@ class EmbeddingService:
     def generate_single_embedding(self, text: str) -> np.ndarray:
         """Generate embedding for a single text"""
         try:
+            EMBEDDING_BATCH_SIZE.observe(1)
             embedding = self.model.encode([text])
             return embedding[0]
         except Exception as e:
             self.logger.error(f"Error generating single embedding: {e}")
             return np.array([])
     
+    def encode_normalized(self, texts: List[str]) -> np.ndarray:
+        """Encode texts in one batch into a unit-normalized 2D array"""
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        EMBEDDING_BATCH_SIZE.observe(len(texts))
+        embeddings = self.model.encode(
+            texts,
+            batch_size=len(texts),
+            show_progress_bar=False,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        )
+        return np.asarray(embeddings, dtype=np.float32)
+    
+    def embedding_function(self):
+        """ChromaDB embedding function matching this service (None keeps Chroma's default)"""
+        return self.model if self.backend == 'hash' else None
+    
+    def matches_store_embeddings(self) -> bool:
+        """Whether this service embeds like the vector store, so its query vectors can be searched directly"""
+        return self.backend == 'hash' or self.model_name == CHROMA_DEFAULT_MODEL
+    
     def get_embedding_dimension(self) -> int:
         """Get the dimension of the embeddings"""
         if self.model is None:
@@ -92,6 +149,7 @@ class EmbeddingService:
         """Get information about the embedding model"""
         return {
             'model_name': self.model_name,
+            'backend': self.backend,
             'embedding_dimension': self.get_embedding_dimension(),
             'model_loaded': self.model is not None
         } 
\ No newline at end of file
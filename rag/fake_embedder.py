@@ -0,0 +1,119 @@
+"""
+Fake Embedder for Module 3: Question-Answering Engine
+
+This module provides a deterministic embedding model that needs no weights.
+Texts are turned into word, word-bigram and character-trigram features that
+are hashed into a fixed number of signed buckets and L2-normalized, so texts
+sharing words or word fragments land close together. It mimics the parts of
+the SentenceTransformer ``encode`` API the pipeline uses and can be passed to
+ChromaDB as an embedding function, which lets tests and benchmarks run
+offline at full speed.
+"""
+
+import re
+import hashlib
+from functools import lru_cache
+from typing import List, Tuple, Union
+
+import numpy as np
+
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+@lru_cache(maxsize=200000)
+def _bucket(feature: str, dimension: int) -> Tuple[int, float]:
+    """Hash a feature to a (bucket, sign) pair."""
+    digest = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'little')
+    return digest % dimension, (1.0 if (digest >> 63) & 1 else -1.0)
+
+
+class HashEmbedder:
+    """
+    Deterministic hashed n-gram embedder.
+
+    Features:
+    - Stable vectors across processes and runs
+    - Configurable dimension
+    - SentenceTransformer-style ``encode``
+    - ChromaDB-style ``__call__``
+    """
+
+    def __init__(self, dimension: int = 384, word_weight: float = 1.0,
+                 bigram_weight: float = 0.5, trigram_weight: float = 0.3):
+        """
+        Initialize the embedder.
+
+        Args:
+            dimension: Embedding dimension
+            word_weight: Weight of word features
+            bigram_weight: Weight of word-bigram features
+            trigram_weight: Weight of character-trigram features
+        """
+        if dimension <= 0:
+            raise ValueError("Embedding dimension must be positive")
+        self.dimension = dimension
+        self.word_weight = word_weight
+        self.bigram_weight = bigram_weight
+        self.trigram_weight = trigram_weight
+
+    def embed(self, text: str) -> np.ndarray:
+        """
+        Embed one text.
+
+        Args:
+            text: Input text
+
+        Returns:
+            Unit-normalized float32 vector (all zeros for text without words)
+        """
+        words = WORD_PATTERN.findall(text.lower())
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        if not words:
+            return vector
+
+        features = [(word, self.word_weight) for word in words]
+        features.extend((f"{a} {b}", self.bigram_weight) for a, b in zip(words, words[1:]))
+        for word in words:
+            padded = f"#{word}#"
+            features.extend((padded[i:i + 3], self.trigram_weight) for i in range(len(padded) - 2))
+
+        buckets = [_bucket(feature, self.dimension) for feature, _ in features]
+        indices = np.fromiter((b[0] for b in buckets), dtype=np.int64, count=len(buckets))
+        values = np.fromiter((b[1] * w for b, (_, w) in zip(buckets, features)),
+                             dtype=np.float32, count=len(buckets))
+        np.add.at(vector, indices, values)
+
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
+
+    def encode(self, sentences: Union[str, List[str]], batch_size: int = 32,
+               show_progress_bar: bool = False, convert_to_numpy: bool = True,
+               normalize_embeddings: bool = False, **kwargs) -> np.ndarray:
+        """
+        Embed texts; signature follows ``SentenceTransformer.encode``.
+
+        Vectors are always normalized, so ``normalize_embeddings`` has no
+        effect; the other keyword arguments are accepted and ignored.
+
+        Args:
+            sentences: Text or list of texts
+
+        Returns:
+            Array of shape (n, dimension), or (dimension,) for a single text
+        """
+        if isinstance(sentences, str):
+            return self.embed(sentences)
+        if not sentences:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        return np.stack([self.embed(text) for text in sentences])
+
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        """ChromaDB embedding function interface."""
+        return self.encode(list(input)).tolist()
+
+    def get_sentence_embedding_dimension(self) -> int:
+        """Embedding dimension, as reported by SentenceTransformer."""
+        return self.dimension
@@ -0,0 +1,349 @@
+"""
+Fake Ollama Server for Module 3: Question-Answering Engine
+
+This module provides a small stand-in for the Ollama HTTP API, built only on
+the standard library, so the pipeline can be tested and load-tested without
+a real model. It implements ``/api/generate`` (streaming and non-streaming),
+``/api/tags`` and ``/api/ps`` with configurable time-to-first-token,
+tokens per second and jitter, deterministic canned answers, and injected
+failures (HTTP 500s, hung requests and slow streams).
+
+Run it with ``python -m rag.fake_ollama --port 11435`` and point
+``QAEngineConfig.ollama_url`` (or ``ollama_urls``) at it.
+"""
+
+import json
+import time
+import random
+import hashlib
+import logging
+import argparse
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from dataclasses import dataclass, field
+
+
+DEFAULT_ANSWERS = [
+    "Based on the provided context, the answer is described in the main information section.",
+    "The context explains this topic in detail; the key points are summarized in the first source.",
+    "According to the documents, this is covered by the additional information section.",
+    "I don't know."
+]
+
+
+@dataclass
+class FakeOllamaConfig:
+    """Latency, failure and answer settings for the fake server."""
+    time_to_first_token: float = 0.2      # seconds before the first token
+    tokens_per_second: float = 30.0
+    jitter: float = 0.1                   # relative +/- jitter on every delay
+    load_time: float = 0.0                # extra delay the first time a model is used
+    error_rate: float = 0.0               # fraction of requests answered with HTTP 500
+    timeout_rate: float = 0.0             # fraction of requests that hang
+    hang_seconds: float = 120.0           # how long a hung request stalls
+    slow_stream_rate: float = 0.0         # fraction of streams generated slowly
+    slow_stream_factor: float = 10.0      # slowdown applied to slow streams
+    models: List[str] = field(default_factory=lambda: ["mistral:7b"])
+    canned_answers: Dict[str, str] = field(default_factory=dict)  # prompt substring -> answer
+    seed: Optional[int] = None
+
+
+class FakeOllamaServer:
+    """
+    Threaded fake Ollama server.
+
+    Features:
+    - /api/generate with NDJSON streaming and Ollama-style timing fields
+    - /api/tags and /api/ps model listings
+    - Configurable latency, jitter and failure injection
+    - Answers chosen deterministically from the prompt
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 11435,
+                 config: FakeOllamaConfig = None):
+        """
+        Initialize the server (call ``start`` or ``serve_forever`` to run it).
+
+        Args:
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+            config: Latency, failure and answer settings
+        """
+        self.config = config or FakeOllamaConfig()
+        self.logger = logging.getLogger(__name__)
+        self._random = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._loaded = set()
+        self._stats = {'requests': 0, 'streams': 0, 'errors_injected': 0,
+                       'timeouts_injected': 0, 'slow_streams': 0, 'tokens': 0}
+
+        handler = type('FakeOllamaHandler', (_FakeOllamaHandler,), {'fake': self})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """Base URL of the running server."""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'FakeOllamaServer':
+        """Serve in a background thread; returns self for chaining."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever,
+                                        name="fake-ollama", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Serve in the current thread until interrupted."""
+        self.httpd.serve_forever()
+
+    def stop(self):
+        """Stop serving and close the socket."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get request and injection counters."""
+        with self._lock:
+            return dict(self._stats)
+
+    def answer_for(self, prompt: str) -> str:
+        """
+        Pick the answer for a prompt.
+
+        Canned answers match on a prompt substring; otherwise the answer is
+        chosen from a fixed list by a hash of the prompt, so the same prompt
+        always gets the same answer.
+
+        Args:
+            prompt: Prompt sent by the client
+
+        Returns:
+            Answer text
+        """
+        for needle, answer in self.config.canned_answers.items():
+            if needle in prompt:
+                return answer
+        digest = int(hashlib.sha256(prompt.encode('utf-8')).hexdigest(), 16)
+        return DEFAULT_ANSWERS[digest % len(DEFAULT_ANSWERS)]
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def _roll(self, rate: float) -> bool:
+        if rate <= 0:
+            return False
+        with self._lock:
+            return self._random.random() < rate
+
+    def _delay(self, seconds: float) -> float:
+        """Apply jitter to a delay."""
+        if self.config.jitter <= 0 or seconds <= 0:
+            return seconds
+        with self._lock:
+            factor = 1.0 + self._random.uniform(-self.config.jitter, self.config.jitter)
+        return max(seconds * factor, 0.0)
+
+    def _load(self, model: str) -> float:
+        """Mark a model as loaded; returns the load delay for a cold model."""
+        with self._lock:
+            cold = model not in self._loaded
+            self._loaded.add(model)
+        return self.config.load_time if cold else 0.0
+
+
+class _FakeOllamaHandler(BaseHTTPRequestHandler):
+    """Request handler; ``fake`` is bound to the owning FakeOllamaServer."""
+
+    fake: FakeOllamaServer = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        self.fake.logger.debug("%s - %s", self.address_string(), format % args)
+
+    def do_GET(self):
+        if self.path == '/api/tags':
+            models = [{'name': name, 'model': name, 'size': 0} for name in self.fake.config.models]
+            self._send_json(200, {'models': models})
+        elif self.path == '/api/ps':
+            with self.fake._lock:
+                loaded = sorted(self.fake._loaded)
+            self._send_json(200, {'models': [{'name': name, 'model': name} for name in loaded]})
+        else:
+            self._send_json(404, {'error': f"unknown path {self.path}"})
+
+    def do_POST(self):
+        if self.path != '/api/generate':
+            self._send_json(404, {'error': f"unknown path {self.path}"})
+            return
+
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            self._send_json(400, {'error': 'invalid JSON body'})
+            return
+
+        fake = self.fake
+        config = fake.config
+        fake._count('requests')
+        model = body.get('model', '')
+        if config.models and model not in config.models:
+            self._send_json(404, {'error': f"model '{model}' not found"})
+            return
+
+        if fake._roll(config.error_rate):
+            fake._count('errors_injected')
+            self._send_json(500, {'error': 'injected failure'})
+            return
+        if fake._roll(config.timeout_rate):
+            fake._count('timeouts_injected')
+            time.sleep(config.hang_seconds)
+            self.close_connection = True
+            return
+
+        start_time = time.time()
+        load_delay = fake._load(model)
+        prompt = body.get('prompt', '')
+        if not prompt:
+            # Empty prompt only loads the model, like Ollama
+            time.sleep(load_delay)
+            self._send_json(200, self._final_chunk(model, '', start_time, load_delay, 0, 0, 0.0))
+            return
+
+        answer = fake.answer_for(prompt)
+        tokens = [piece + ' ' for piece in answer.split(' ')]
+        tokens[-1] = tokens[-1].rstrip()
+        token_delay = 1.0 / config.tokens_per_second if config.tokens_per_second > 0 else 0.0
+        if body.get('stream', True) and fake._roll(config.slow_stream_rate):
+            fake._count('slow_streams')
+            token_delay *= config.slow_stream_factor
+
+        prompt_tokens = len(prompt.split())
+        time.sleep(load_delay + fake._delay(config.time_to_first_token))
+        prompt_eval = time.time() - start_time - load_delay
+
+        if body.get('stream', True):
+            fake._count('streams')
+            self._stream(model, tokens, token_delay, start_time, load_delay, prompt_tokens, prompt_eval)
+        else:
+            time.sleep(sum(fake._delay(token_delay) for _ in tokens[1:]))
+            fake._count('tokens', len(tokens))
+            final = self._final_chunk(model, answer, start_time, load_delay,
+                                      prompt_tokens, len(tokens), prompt_eval)
+            self._send_json(200, final)
+
+    def _stream(self, model: str, tokens: List[str], token_delay: float, start_time: float,
+                load_delay: float, prompt_tokens: int, prompt_eval: float):
+        """Write NDJSON chunks using chunked transfer encoding."""
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        try:
+            for i, token in enumerate(tokens):
+                if i:
+                    time.sleep(self.fake._delay(token_delay))
+                self._write_chunk({'model': model, 'created_at': _now(),
+                                   'response': token, 'done': False})
+                self.fake._count('tokens')
+            self._write_chunk(self._final_chunk(model, '', start_time, load_delay,
+                                                prompt_tokens, len(tokens), prompt_eval))
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+    def _final_chunk(self, model: str, response: str, start_time: float, load_delay: float,
+                     prompt_tokens: int, eval_tokens: int, prompt_eval: float) -> Dict:
+        """Last response object with Ollama's timing fields (nanoseconds)."""
+        total = time.time() - start_time
+        return {
+            'model': model,
+            'created_at': _now(),
+            'response': response,
+            'done': True,
+            'done_reason': 'stop',
+            'total_duration': int(total * 1e9),
+            'load_duration': int(load_delay * 1e9),
+            'prompt_eval_count': prompt_tokens,
+            'prompt_eval_duration': int(prompt_eval * 1e9),
+            'eval_count': eval_tokens,
+            'eval_duration': int(max(total - load_delay - prompt_eval, 0.0) * 1e9)
+        }
+
+    def _write_chunk(self, obj: Dict):
+        data = (json.dumps(obj) + "\n").encode('utf-8')
+        self.wfile.write(f"{len(data):X}\r\n".encode('ascii') + data + b"\r\n")
+        self.wfile.flush()
+
+    def _send_json(self, status: int, obj: Dict):
+        data = json.dumps(obj).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def main(argv: List[str] = None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Fake Ollama server for offline testing")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=11435)
+    parser.add_argument('--ttft', type=float, default=0.2, help="time to first token (s)")
+    parser.add_argument('--tokens-per-second', type=float, default=30.0)
+    parser.add_argument('--jitter', type=float, default=0.1, help="relative jitter, e.g. 0.1")
+    parser.add_argument('--load-time', type=float, default=0.0, help="cold model load delay (s)")
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--timeout-rate', type=float, default=0.0)
+    parser.add_argument('--hang-seconds', type=float, default=120.0)
+    parser.add_argument('--slow-stream-rate', type=float, default=0.0)
+    parser.add_argument('--slow-stream-factor', type=float, default=10.0)
+    parser.add_argument('--model', action='append', dest='models',
+                        help="model to advertise (repeatable; default mistral:7b)")
+    parser.add_argument('--answers', help="JSON file mapping prompt substrings to answers")
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args(argv)
+
+    canned_answers = {}
+    if args.answers:
+        with open(args.answers, 'r', encoding='utf-8') as f:
+            canned_answers = json.load(f)
+
+    config = FakeOllamaConfig(
+        time_to_first_token=args.ttft,
+        tokens_per_second=args.tokens_per_second,
+        jitter=args.jitter,
+        load_time=args.load_time,
+        error_rate=args.error_rate,
+        timeout_rate=args.timeout_rate,
+        hang_seconds=args.hang_seconds,
+        slow_stream_rate=args.slow_stream_rate,
+        slow_stream_factor=args.slow_stream_factor,
+        models=args.models or ["mistral:7b"],
+        canned_answers=canned_answers,
+        seed=args.seed
+    )
+
+    logging.basicConfig(level=logging.INFO)
+    server = FakeOllamaServer(args.host, args.port, config)
+    print(f"Fake Ollama listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,382 @@
+"""
+Generation Scheduler for Module 3: Question-Answering Engine
+
+This module provides admission control in front of LLM generation. A
+scheduler bounds how many generations run concurrently against a backend
+and holds the rest in a bounded priority queue (interactive before batch).
+Queued requests that can no longer finish before their deadline are dropped,
+and a full queue is rejected immediately with a retry hint instead of
+piling more work onto an overloaded Ollama. Threads and coroutines wait in
+the same queue; a coroutine waits on a future, not on a worker thread.
+"""
+
+import time
+import heapq
+import asyncio
+import itertools
+import logging
+import threading
+from contextlib import contextmanager, asynccontextmanager
+from enum import IntEnum
+from typing import Callable, Dict, List, Optional
+
+
+class Priority(IntEnum):
+    """Scheduling priority; lower values are served first."""
+    INTERACTIVE = 0
+    BATCH = 1
+
+
+class SchedulerRejectedError(Exception):
+    """Raised when a generation is not admitted."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class QueueFullError(SchedulerRejectedError):
+    """Raised when the queue is at capacity."""
+
+
+class DeadlineExceededError(SchedulerRejectedError):
+    """Raised when a queued generation would miss its deadline."""
+
+
+class _Ticket:
+    """A queued generation request."""
+
+    __slots__ = ('priority', 'seq', 'deadline', 'enqueued_at', 'cancelled',
+                 'future', 'loop', 'granted')
+
+    def __init__(self, priority: int, seq: int, deadline: Optional[float],
+                 future: 'asyncio.Future' = None, loop: asyncio.AbstractEventLoop = None):
+        self.priority = priority
+        self.seq = seq
+        self.deadline = deadline
+        self.enqueued_at = time.monotonic()
+        self.cancelled = False
+        # Set for coroutine waiters, which are handed their slot by _dispatch
+        self.future = future
+        self.loop = loop
+        self.granted = False
+
+    def __lt__(self, other: '_Ticket') -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+def _resolve(future: 'asyncio.Future'):
+    """Wake a waiting coroutine; runs on its event loop."""
+    if not future.done():
+        future.set_result(None)
+
+
+class GenerationScheduler:
+    """
+    Bounded-concurrency, bounded-queue priority scheduler.
+
+    Features:
+    - Concurrency limit per backend
+    - Priority queue with a size limit
+    - Deadline-aware dropping using the observed service time
+    - Queue depth, wait time and rejection statistics
+    """
+
+    def __init__(self, name: str = "ollama", max_concurrency: int = 2,
+                 max_queue: int = 32, queue_timeouts: Dict[str, float] = None,
+                 backends: Callable[[], int] = None):
+        """
+        Initialize the scheduler.
+
+        Args:
+            name: Backend name used in logs and stats
+            max_concurrency: Maximum generations running at once per backend
+            max_queue: Maximum generations waiting
+            queue_timeouts: Default deadline (seconds from enqueue) per
+                priority name, e.g. {"interactive": 30, "batch": 600}
+            backends: Returns the number of healthy backends (optional; one
+                backend when omitted). The limit follows it, so the hosts left
+                after an ejection are not handed the whole budget; a raised
+                limit takes effect at the next release.
+        """
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.backends = backends
+        self.max_queue = max_queue
+        self.queue_timeouts = queue_timeouts or {'interactive': 30.0, 'batch': 600.0}
+        self.logger = logging.getLogger(__name__)
+
+        self._condition = threading.Condition()
+        self._queue: List[_Ticket] = []
+        self._queued = 0
+        self._active = 0
+        self._seq = itertools.count()
+
+        # Exponentially weighted averages, in seconds
+        self._service_time = 5.0
+        self._wait_time = 0.0
+        self._stats = {'admitted': 0, 'completed': 0, 'rejected_queue_full': 0,
+                       'dropped_deadline': 0}
+
+    @contextmanager
+    def slot(self, priority: Priority = Priority.INTERACTIVE, deadline: float = None):
+        """
+        Hold a generation slot for the duration of the block.
+
+        Args:
+            priority: Scheduling priority
+            deadline: Absolute ``time.monotonic()`` deadline (optional); the
+                per-priority queue timeout applies when omitted
+
+        Raises:
+            QueueFullError: The queue is at capacity
+            DeadlineExceededError: The request would miss its deadline
+        """
+        deadline = self._resolve_deadline(priority, deadline)
+        wait_time = self._acquire(int(priority), deadline)
+        started = time.monotonic()
+        try:
+            yield wait_time
+        finally:
+            self._release(time.monotonic() - started)
+
+    @asynccontextmanager
+    async def slot_async(self, priority: Priority = Priority.INTERACTIVE, deadline: float = None):
+        """
+        Async variant of ``slot``.
+
+        The request queues alongside threaded callers but waits on a future
+        that is resolved from the releasing thread, so it holds no thread.
+
+        Args:
+            priority: Scheduling priority
+            deadline: Absolute ``time.monotonic()`` deadline (optional)
+
+        Raises:
+            QueueFullError: The queue is at capacity
+            DeadlineExceededError: The request would miss its deadline
+        """
+        deadline = self._resolve_deadline(priority, deadline)
+        loop = asyncio.get_running_loop()
+        with self._condition:
+            ticket = None
+            if not self._try_admit():
+                self._check_queue_capacity()
+                ticket = _Ticket(int(priority), next(self._seq), deadline,
+                                 future=loop.create_future(), loop=loop)
+                heapq.heappush(self._queue, ticket)
+                self._queued += 1
+                self._dispatch()
+        wait_time = await self._wait_async(ticket) if ticket is not None else 0.0
+        started = time.monotonic()
+        try:
+            yield wait_time
+        finally:
+            self._release(time.monotonic() - started)
+
+    def check_admission(self, priority: Priority = Priority.INTERACTIVE, deadline: float = None):
+        """
+        Fail now if a generation would be rejected, without reserving anything.
+
+        Lets a caller reject a request before committing to a response (for
+        example before a streaming response is started). The later ``slot``
+        call can still reject the request if load rises in between.
+
+        Args:
+            priority: Scheduling priority
+            deadline: Absolute ``time.monotonic()`` deadline (optional)
+
+        Raises:
+            QueueFullError: The queue is at capacity
+            DeadlineExceededError: The request could not start before its deadline
+        """
+        deadline = self._resolve_deadline(priority, deadline)
+        with self._condition:
+            if self._active < self._limit() and self._queued == 0:
+                return
+            self._check_queue_capacity()
+            if deadline is not None and time.monotonic() + self._service_time > deadline:
+                self._stats['dropped_deadline'] += 1
+                raise DeadlineExceededError(
+                    f"Generation on {self.name} would miss its deadline",
+                    retry_after=self._estimate_wait()
+                )
+
+    def _resolve_deadline(self, priority: Priority, deadline: Optional[float]) -> Optional[float]:
+        """Apply the per-priority queue timeout when no deadline is given."""
+        if deadline is not None:
+            return deadline
+        timeout = self.queue_timeouts.get(Priority(priority).name.lower())
+        return time.monotonic() + timeout if timeout else None
+
+    def _try_admit(self) -> bool:
+        """Take a slot if one is free and nobody is queued; caller holds the lock."""
+        if self._active < self._limit() and self._queued == 0:
+            self._active += 1
+            self._stats['admitted'] += 1
+            return True
+        return False
+
+    def _acquire(self, priority: int, deadline: Optional[float]) -> float:
+        """Wait for a slot; returns the time spent queued."""
+        with self._condition:
+            if self._try_admit():
+                return 0.0
+            self._check_queue_capacity()
+
+            ticket = _Ticket(priority, next(self._seq), deadline)
+            heapq.heappush(self._queue, ticket)
+            self._queued += 1
+
+            try:
+                while True:
+                    now = time.monotonic()
+                    if ticket.deadline is not None and now + self._service_time > ticket.deadline:
+                        self._stats['dropped_deadline'] += 1
+                        raise DeadlineExceededError(
+                            f"Generation on {self.name} would miss its deadline",
+                            retry_after=self._estimate_wait()
+                        )
+                    if self._head() is ticket and self._active < self._limit():
+                        heapq.heappop(self._queue)
+                        break
+                    timeout = None
+                    if ticket.deadline is not None:
+                        timeout = max(ticket.deadline - self._service_time - now, 0.001)
+                    self._condition.wait(timeout)
+            except BaseException:
+                ticket.cancelled = True
+                self._queued -= 1
+                self._dispatch()
+                self._condition.notify_all()
+                raise
+
+            self._queued -= 1
+            self._active += 1
+            self._stats['admitted'] += 1
+            waited = time.monotonic() - ticket.enqueued_at
+            self._wait_time = 0.8 * self._wait_time + 0.2 * waited
+            return waited
+
+    def _limit(self) -> int:
+        """Generations allowed at once across the healthy backends."""
+        backends = 1
+        if self.backends is not None:
+            try:
+                backends = max(int(self.backends()), 1)
+            except Exception as e:
+                self.logger.warning(f"Could not count backends for {self.name}: {e}")
+        return self.max_concurrency * backends
+
+    def _check_queue_capacity(self):
+        """Reject a request that would overflow the queue; caller holds the lock."""
+        if self._queued >= self.max_queue:
+            self._stats['rejected_queue_full'] += 1
+            raise QueueFullError(
+                f"Generation queue for {self.name} is full ({self._queued} waiting)",
+                retry_after=self._estimate_wait()
+            )
+
+    async def _wait_async(self, ticket: _Ticket) -> float:
+        """Wait for ``_dispatch`` to grant a queued coroutine's slot; returns the time queued."""
+        while True:
+            with self._condition:
+                if ticket.granted:
+                    break
+                now = time.monotonic()
+                if ticket.deadline is not None and now + self._service_time > ticket.deadline:
+                    self._cancel_ticket(ticket)
+                    self._stats['dropped_deadline'] += 1
+                    raise DeadlineExceededError(
+                        f"Generation on {self.name} would miss its deadline",
+                        retry_after=self._estimate_wait()
+                    )
+                timeout = None
+                if ticket.deadline is not None:
+                    timeout = max(ticket.deadline - self._service_time - now, 0.001)
+            try:
+                # Shield so a timeout re-checks the deadline instead of cancelling the grant
+                await asyncio.wait_for(asyncio.shield(ticket.future), timeout)
+            except asyncio.TimeoutError:
+                continue
+            except asyncio.CancelledError:
+                with self._condition:
+                    granted = ticket.granted
+                    if not granted:
+                        self._cancel_ticket(ticket)
+                if granted:
+                    # The slot was handed over after the caller went away
+                    self._release(None)
+                raise
+        return time.monotonic() - ticket.enqueued_at
+
+    def _cancel_ticket(self, ticket: _Ticket):
+        """Withdraw a queued ticket and let the next one in; caller holds the lock."""
+        ticket.cancelled = True
+        self._queued -= 1
+        self._dispatch()
+        self._condition.notify_all()
+
+    def _dispatch(self):
+        """
+        Hand free slots to coroutine tickets at the head of the queue; caller
+        holds the lock. A threaded ticket at the head takes its own slot when
+        notified, so dispatch stops there to keep priority order.
+        """
+        while self._active < self._limit():
+            ticket = self._head()
+            if ticket is None or ticket.future is None:
+                return
+            heapq.heappop(self._queue)
+            self._queued -= 1
+            try:
+                ticket.loop.call_soon_threadsafe(_resolve, ticket.future)
+            except RuntimeError:
+                # The waiter's event loop is closed; nobody is left to use the slot
+                ticket.cancelled = True
+                continue
+            self._active += 1
+            self._stats['admitted'] += 1
+            ticket.granted = True
+            waited = time.monotonic() - ticket.enqueued_at
+            self._wait_time = 0.8 * self._wait_time + 0.2 * waited
+
+    def _release(self, service_time: Optional[float]):
+        """Free a slot and wake the queue; None skips the service time update."""
+        with self._condition:
+            self._active -= 1
+            self._stats['completed'] += 1
+            if service_time is not None:
+                self._service_time = 0.8 * self._service_time + 0.2 * service_time
+            self._dispatch()
+            self._condition.notify_all()
+
+    def _head(self) -> Optional[_Ticket]:
+        """Highest-priority live ticket; caller holds the lock."""
+        while self._queue and self._queue[0].cancelled:
+            heapq.heappop(self._queue)
+        return self._queue[0] if self._queue else None
+
+    def _estimate_wait(self) -> float:
+        """Estimated seconds until a new request would start; caller holds the lock."""
+        return (self._queued + 1) * self._service_time / max(self._limit(), 1)
+
+    def get_stats(self) -> Dict:
+        """
+        Get scheduler statistics.
+
+        Returns:
+            Dictionary with queue depth, active count, averages and counters
+        """
+        with self._condition:
+            return {
+                'name': self.name,
+                'queue_depth': self._queued,
+                'active': self._active,
+                'max_concurrency': self.max_concurrency,
+                'concurrency_limit': self._limit(),
+                'max_queue': self.max_queue,
+                'avg_wait_time': self._wait_time,
+                'avg_service_time': self._service_time,
+                **self._stats
+            }
@@ -0,0 +1,143 @@
+"""
+Load Shedding for Module 3: Question-Answering Engine
+
+This module picks a degradation tier from live load signals so the service
+answers more cheaply, in steps, instead of timing out when queues grow:
+
+- Tier 0 (normal): full pipeline
+- Tier 1 (reduced): no query expansion, no reranking
+- Tier 2 (minimal): additionally a lower top_k and a smaller context budget
+- Tier 3 (cache_only): cached answers, otherwise an extractive answer without
+  calling the LLM
+
+The tier rises as soon as a signal crosses a threshold and steps down one
+tier at a time once load has stayed lower for a recovery period.
+"""
+
+import time
+import logging
+import threading
+from enum import IntEnum
+from typing import Callable, Dict, Sequence
+
+from .metrics import LOAD_SHED_REQUESTS
+
+
+class LoadTier(IntEnum):
+    """Degradation tiers, from cheapest reduction to most aggressive."""
+    NORMAL = 0
+    REDUCED = 1
+    MINIMAL = 2
+    CACHE_ONLY = 3
+
+
+class LoadShedder:
+    """
+    Selects the degradation tier for new requests.
+
+    Features:
+    - Queue depth and queue wait signals
+    - Configurable per-tier thresholds
+    - Immediate escalation, gradual recovery
+    """
+
+    def __init__(self, signals: Callable[[], Dict[str, float]],
+                 queue_depths: Sequence[float] = (8, 16, 24),
+                 queue_waits: Sequence[float] = (5.0, 10.0, 20.0),
+                 recovery_seconds: float = 10.0,
+                 enabled: bool = True):
+        """
+        Initialize the load shedder.
+
+        Args:
+            signals: Returns the current ``queue_depth`` and ``queue_wait`` (seconds)
+            queue_depths: Queue depths at which tiers 1, 2 and 3 start
+            queue_waits: Average queue waits (seconds) at which tiers 1, 2 and 3 start
+            recovery_seconds: Time load must stay below the current tier before stepping down
+            enabled: Always report the normal tier when False
+        """
+        self.logger = logging.getLogger(__name__)
+        self.signals = signals
+        self.queue_depths = tuple(queue_depths)
+        self.queue_waits = tuple(queue_waits)
+        self.recovery_seconds = recovery_seconds
+        self.enabled = enabled
+        self._tier = LoadTier.NORMAL
+        self._below_since = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _level(value: float, thresholds: Sequence[float]) -> int:
+        """Number of thresholds the value has reached."""
+        return sum(1 for threshold in thresholds if value >= threshold)
+
+    def evaluate(self) -> LoadTier:
+        """
+        Update the tier from the current signals.
+
+        Returns:
+            Active tier
+        """
+        if not self.enabled:
+            return LoadTier.NORMAL
+        try:
+            signals = self.signals()
+        except Exception as e:
+            self.logger.warning(f"Could not read load signals: {e}")
+            return self._tier
+        target = LoadTier(min(max(
+            self._level(signals.get('queue_depth', 0), self.queue_depths),
+            self._level(signals.get('queue_wait', 0.0), self.queue_waits)
+        ), LoadTier.CACHE_ONLY))
+
+        with self._lock:
+            now = time.monotonic()
+            previous = self._tier
+            if target >= self._tier:
+                self._tier = target
+                self._below_since = None
+            elif self._below_since is None:
+                self._below_since = now
+            elif now - self._below_since >= self.recovery_seconds:
+                self._tier = LoadTier(self._tier - 1)
+                self._below_since = now if target < self._tier else None
+            tier = self._tier
+        if tier != previous:
+            self.logger.warning(f"Load shedding tier {previous.name.lower()} -> {tier.name.lower()} ({signals})")
+        return tier
+
+    def select(self, requests: int = 1) -> LoadTier:
+        """
+        Pick the tier for new requests and count them.
+
+        Args:
+            requests: Number of requests that will run at the tier (e.g. a batch chunk)
+
+        Returns:
+            Tier the requests run at
+        """
+        tier = self.evaluate()
+        LOAD_SHED_REQUESTS.inc(requests, tier=tier.name.lower())
+        return tier
+
+    @staticmethod
+    def describe(tier: LoadTier) -> Dict:
+        """Tier summary for result metadata."""
+        return {'tier': int(tier), 'name': tier.name.lower()}
+
+    def get_stats(self) -> Dict:
+        """
+        Get load shedding state.
+
+        Returns:
+            Dictionary with the active tier and thresholds
+        """
+        with self._lock:
+            tier = self._tier
+        return {
+            'enabled': self.enabled,
+            **self.describe(tier),
+            'queue_depths': list(self.queue_depths),
+            'queue_waits': list(self.queue_waits),
+            'recovery_seconds': self.recovery_seconds
+        }
@@ -6,13 +6,21 @@ def patched_load(resource_name, *args, **kwargs):
         return nltk.data.load_orig('tokenizers/punkt', *args, **kwargs)
     return nltk.data.load_orig(resource_name, *args, **kwargs)
 nltk.data.load = patched_load
-from fastapi import FastAPI, UploadFile, File, Form
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request
+from fastapi.responses import StreamingResponse, JSONResponse, Response
 from pydantic import BaseModel
 from ragbot_fastapi.core.qa_engine import QAEngine, QAEngineConfig
 from ragbot_fastapi.core.text_chunker import TextChunker
 from ragbot_fastapi.core.embedding_service import EmbeddingService
 from ragbot_fastapi.core.vector_store import VectorStore
+from ragbot_fastapi.core.model_manager import ModelNotAvailableError
+from ragbot_fastapi.core.generation_scheduler import Priority, SchedulerRejectedError, QueueFullError
+from ragbot_fastapi.core.deadline import RequestTimeoutError
+from ragbot_fastapi.core import metrics
 import os
+import json
+import time
+import asyncio
 import PyPDF2
 
 app = FastAPI(title="RAG Bot (FastAPI)")
@@ -20,7 +28,8 @@ app = FastAPI(title="RAG Bot (FastAPI)")
 qa_engine = QAEngine()
 chunker = TextChunker()
 embedder = EmbeddingService()
-vector_store = VectorStore(db_path="ragbot_fastapi/vector_db")
+vector_store = VectorStore(db_path="ragbot_fastapi/vector_db",
+                           embedding_function=embedder.embedding_function())
 
 def extract_text_from_pdf(file_path):
     text = ""
@@ -33,6 +42,16 @@ def extract_text_from_pdf(file_path):
 class AskRequest(BaseModel):
     question: str
     model_name: str = None
+    force_generation: bool = False
+    priority: str = "interactive"
+    extractive: bool = None
+    compress_context: bool = None
+
+class BatchAskRequest(BaseModel):
+    questions: list[str]
+    model_name: str = None
+    force_generation: bool = False
+    compress_context: bool = None
 
 class AskResponse(BaseModel):
     answer: str
@@ -41,6 +60,108 @@ class AskResponse(BaseModel):
     context_used: str = None
     metadata: dict = None
 
+# Endpoints counted in request/error metrics
+INSTRUMENTED_PATHS = ("/ask", "/ask/stream", "/ask/batch", "/upload")
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    if request.url.path not in INSTRUMENTED_PATHS:
+        return await call_next(request)
+    endpoint = request.url.path
+    start_time = time.perf_counter()
+    try:
+        response = await call_next(request)
+    except Exception:
+        metrics.HTTP_REQUESTS.inc(endpoint=endpoint, status="500")
+        metrics.HTTP_ERRORS.inc(endpoint=endpoint)
+        raise
+    metrics.HTTP_REQUESTS.inc(endpoint=endpoint, status=str(response.status_code))
+    if response.status_code >= 500:
+        metrics.HTTP_ERRORS.inc(endpoint=endpoint)
+    metrics.HTTP_LATENCY.observe(time.perf_counter() - start_time, endpoint=endpoint)
+    return response
+
+def cache_hit_ratios():
+    ratios = {}
+    if qa_engine.answer_cache is not None:
+        ratios[("answer",)] = qa_engine.answer_cache.get_stats()["hit_ratio"]
+    if qa_engine.semantic_cache is not None:
+        ratios[("semantic",)] = qa_engine.semantic_cache.get_stats()["hit_ratio"]
+    return ratios
+
+def queue_depths():
+    depths = {("generation",): qa_engine.scheduler.get_stats()["queue_depth"]}
+    if qa_engine.ollama_pool is not None:
+        for endpoint in qa_engine.ollama_pool.get_stats()["endpoints"]:
+            depths[("ollama:" + endpoint["url"],)] = endpoint["outstanding"]
+    return depths
+
+metrics.CACHE_HIT_RATIO.set_function(cache_hit_ratios)
+metrics.VECTOR_STORE_DOCUMENTS.set_function(lambda: vector_store.get_collection_info()["count"])
+metrics.QUEUE_DEPTH.set_function(queue_depths)
+# Read-only: scrapes must not advance the shedder's recovery
+metrics.LOAD_SHED_TIER.set_function(lambda: qa_engine.load_shedder.get_stats()["tier"])
+metrics.IN_FLIGHT.set_function(lambda: {
+    ("generation",): qa_engine.scheduler.get_stats()["active"],
+    ("coalesced",): qa_engine.singleflight.get_stats()["in_flight"]
+})
+
+@app.get("/metrics")
+def prometheus_metrics():
+    return Response(content=metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+def parse_priority(name: str) -> Priority:
+    try:
+        return Priority[name.upper()]
+    except KeyError:
+        raise HTTPException(status_code=422, detail=f"Unknown priority: {name}")
+
+def request_timeout(request: Request):
+    """Time budget in seconds from the X-Request-Timeout-Ms header (None uses the config default)."""
+    value = request.headers.get("X-Request-Timeout-Ms")
+    if value is None:
+        return None
+    try:
+        timeout_ms = float(value)
+    except ValueError:
+        raise HTTPException(status_code=422, detail=f"Invalid X-Request-Timeout-Ms: {value}")
+    if timeout_ms <= 0:
+        raise HTTPException(status_code=422, detail="X-Request-Timeout-Ms must be positive")
+    return timeout_ms / 1000.0
+
+async def cancel_on_disconnect(request: Request, task: asyncio.Task, poll_interval: float = 0.25):
+    """Wait for the task, cancelling it if the client goes away; returns None when cancelled."""
+    while True:
+        done, _ = await asyncio.wait({task}, timeout=poll_interval)
+        if done:
+            return task.result()
+        if await request.is_disconnected():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            return None
+
+@app.exception_handler(RequestTimeoutError)
+def request_timed_out(request, exc: RequestTimeoutError):
+    return JSONResponse(status_code=504, content={"detail": str(exc)})
+
+@app.exception_handler(SchedulerRejectedError)
+def scheduler_rejected(request, exc: SchedulerRejectedError):
+    status_code = 429 if isinstance(exc, QueueFullError) else 503
+    return JSONResponse(
+        status_code=status_code,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(max(int(round(exc.retry_after)), 1))}
+    )
+
+@app.on_event("startup")
+def preload_models():
+    if qa_engine.ollama_pool is not None:
+        qa_engine.ollama_pool.start_health_checks(qa_engine.config.ollama_health_check_interval)
+    qa_engine.model_manager.preload()
+
 @app.get("/")
 def root():
     return {"message": "Welcome to the FastAPI RAG Bot!"}
@@ -62,15 +183,98 @@ def upload_document(file: UploadFile = File(...)):
     chunks = chunker.chunk_by_section(doc)
     embeddings = embedder.generate_embeddings([c["content"] for c in chunks])
     vector_store.store_documents(chunks, embeddings)
+    qa_engine.bump_corpus_version()
     return {"filename": file.filename, "status": "uploaded and ingested"}
 
 @app.post("/ask", response_model=AskResponse)
-def ask_question(request: AskRequest):
-    result = qa_engine.ask_question(request.question, model_name=request.model_name)
+async def ask_question(request: AskRequest, http_request: Request):
+    task = asyncio.ensure_future(qa_engine.ask_question_async(
+        request.question,
+        model_name=request.model_name,
+        compress_context=request.compress_context,
+        force_generation=request.force_generation,
+        priority=parse_priority(request.priority),
+        timeout=request_timeout(http_request),
+        extractive=request.extractive
+    ))
+    try:
+        result = await cancel_on_disconnect(http_request, task)
+    except ModelNotAvailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    if result is None:
+        # Client closed the connection; nobody reads this response
+        return Response(status_code=499)
     return AskResponse(
         answer=result.answer,
         sources=result.sources,
         processing_time=result.processing_time,
         context_used=result.context_used,
         metadata=result.metadata
-    ) 
\ No newline at end of file
+    )
+
+@app.post("/ask/stream")
+def ask_question_stream(request: AskRequest, http_request: Request):
+    """Stream answer tokens as server-sent events; the final event carries sources and timing."""
+    # Admission is checked here, so rejections get their status code (429/503/504)
+    # instead of an error event in a 200 response
+    try:
+        events = qa_engine.ask_question_stream(
+            request.question,
+            model_name=request.model_name,
+            compress_context=request.compress_context,
+            force_generation=request.force_generation,
+            priority=parse_priority(request.priority),
+            timeout=request_timeout(http_request),
+            extractive=request.extractive
+        )
+    except ModelNotAvailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    # A disconnected client closes this generator, which stops generation
+    def event_stream():
+        for event in events:
+            yield f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/ask/batch")
+def ask_questions_batch(request: BatchAskRequest):
+    """Answer many questions; one JSON line per question, in completion order."""
+    def result_lines():
+        for index, result in qa_engine.iter_batch_answers(
+            request.questions,
+            model_name=request.model_name,
+            compress_context=request.compress_context,
+            force_generation=request.force_generation
+        ):
+            line = {"index": index, "question": result.query, "answer": result.answer,
+                    "sources": result.sources, "processing_time": result.processing_time,
+                    "metadata": result.metadata}
+            yield json.dumps(line, default=str) + "\n"
+    return StreamingResponse(result_lines(), media_type="application/x-ndjson")
+
+@app.get("/models/status")
+def models_status():
+    qa_engine.model_manager.refresh_resident()
+    return qa_engine.model_manager.get_status()
+
+@app.delete("/documents/{source}")
+def delete_document(source: str):
+    deleted = vector_store.delete_documents_by_source(source)
+    if deleted:
+        qa_engine.bump_corpus_version()
+    return {"source": source, "deleted_chunks": deleted}
+
+@app.get("/admin/cache")
+def answer_cache_stats():
+    if qa_engine.answer_cache is None:
+        return {"enabled": False, "corpus_version": qa_engine.corpus_version}
+    return {"enabled": True, **qa_engine.answer_cache.get_stats()}
+
+@app.delete("/admin/cache")
+def purge_answer_cache():
+    if qa_engine.answer_cache is None:
+        return {"enabled": False, "purged": 0}
+    return {"enabled": True, "purged": qa_engine.answer_cache.purge()}
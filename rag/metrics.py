@@ -0,0 +1,277 @@
+"""
+Metrics for Module 3: Question-Answering Engine
+
+This module provides Prometheus-style counters, gauges and histograms and
+renders them in the Prometheus text exposition format for ``/metrics``.
+Counters and histograms are sharded per thread: an update only touches the
+calling thread's own dictionary, so the hot path takes no lock; shards are
+summed when the endpoint is scraped. Gauges can be backed by a function
+that is evaluated at scrape time (queue depths, cache hit ratios, store
+size).
+"""
+
+import bisect
+import logging
+import threading
+from typing import Callable, Dict, List, Sequence, Tuple
+
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(labelnames: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    """Render a label set, e.g. ``{stage="retrieval",le="0.1"}``."""
+    parts = [
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in zip(labelnames, values)
+    ]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Base class holding the name, help text and label names."""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _label_values(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class _Sharded(_Metric):
+    """Per-thread storage; each thread writes only its own dictionary."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._local = threading.local()
+        self._shards: List[Dict] = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> Dict:
+        shard = getattr(self._local, 'values', None)
+        if shard is None:
+            shard = {}
+            self._local.values = shard
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def _snapshot(self) -> List[List[Tuple]]:
+        with self._shards_lock:
+            shards = list(self._shards)
+        # Copying a dict is atomic under the GIL
+        return [list(dict(shard).items()) for shard in shards]
+
+
+class Counter(_Sharded):
+    """Monotonic counter."""
+
+    type_name = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        """Increment the counter for a label set."""
+        shard = self._shard()
+        key = self._label_values(labels)
+        shard[key] = shard.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        """Current total for a label set."""
+        key = self._label_values(labels)
+        return sum(value for shard in self._snapshot() for k, value in shard if k == key)
+
+    def _samples(self) -> List[str]:
+        totals: Dict[LabelValues, float] = {}
+        for shard in self._snapshot():
+            for key, value in shard:
+                totals[key] = totals.get(key, 0) + value
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in sorted(totals.items())]
+
+
+class Histogram(_Sharded):
+    """Bucketed distribution with sum and count."""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        """Record one observation for a label set."""
+        shard = self._shard()
+        key = self._label_values(labels)
+        state = shard.get(key)
+        if state is None:
+            # Per-bucket (non-cumulative) counts, the last one for +Inf; then sum
+            state = [[0] * (len(self.buckets) + 1), 0.0]
+            shard[key] = state
+        state[0][bisect.bisect_left(self.buckets, value)] += 1
+        state[1] += value
+
+    def _samples(self) -> List[str]:
+        merged: Dict[LabelValues, list] = {}
+        for shard in self._snapshot():
+            for key, (counts, total) in shard:
+                entry = merged.setdefault(key, [[0] * (len(self.buckets) + 1), 0.0])
+                entry[0] = [a + b for a, b in zip(entry[0], counts)]
+                entry[1] += total
+
+        lines = []
+        for key, (counts, total) in sorted(merged.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = 'le="{}"'.format(_format_value(bound))
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Point-in-time value, set directly or computed at scrape time."""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._function: Callable = None
+
+    def set(self, value: float, **labels):
+        """Set the value for a label set."""
+        self._values[self._label_values(labels)] = value
+
+    def set_function(self, function: Callable):
+        """
+        Compute the gauge at scrape time.
+
+        Args:
+            function: Returns a number, or a dict of label-value tuple to number
+        """
+        self._function = function
+
+    def _samples(self) -> List[str]:
+        values = dict(self._values)
+        if self._function is not None:
+            try:
+                computed = self._function()
+            except Exception as e:
+                logging.getLogger(__name__).warning(f"Gauge {self.name} failed: {e}")
+                computed = {}
+            if isinstance(computed, dict):
+                values.update({tuple(str(v) for v in key): value for key, value in computed.items()})
+            elif computed is not None:
+                values[()] = computed
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in sorted(values.items())]
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        """Add a metric; registering the same name again returns the existing one."""
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Pipeline metrics
+STAGE_LATENCY = REGISTRY.histogram(
+    "rag_stage_duration_seconds", "Duration of QA pipeline stages", ("stage",))
+REQUEST_LATENCY = REGISTRY.histogram(
+    "rag_qa_duration_seconds", "End-to-end QA pipeline duration")
+HTTP_REQUESTS = REGISTRY.counter(
+    "rag_http_requests_total", "HTTP requests by endpoint and status", ("endpoint", "status"))
+HTTP_ERRORS = REGISTRY.counter(
+    "rag_http_errors_total", "HTTP requests that failed with a server error", ("endpoint",))
+HTTP_LATENCY = REGISTRY.histogram(
+    "rag_http_request_duration_seconds", "HTTP request duration", ("endpoint",))
+EMBEDDING_BATCH_SIZE = REGISTRY.histogram(
+    "rag_embedding_batch_size", "Texts per embedding call",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024))
+OLLAMA_TOKENS_PER_SECOND = REGISTRY.histogram(
+    "rag_ollama_tokens_per_second", "Ollama generation speed", ("model",),
+    buckets=(1, 2, 5, 10, 20, 30, 50, 75, 100, 150, 250))
+QUERY_VARIATION_GAIN = REGISTRY.histogram(
+    "rag_query_variation_new_chunks",
+    "Chunks retrieved only by a query variation, by synonym dictionary phrase and synonym",
+    ("phrase", "synonym"), buckets=(0, 1, 2, 3, 5, 10))
+OLLAMA_TOKENS = REGISTRY.counter(
+    "rag_ollama_tokens_total", "Tokens processed by Ollama", ("model", "kind"))
+
+LOAD_SHED_REQUESTS = REGISTRY.counter(
+    "rag_load_shed_requests_total", "Requests by load shedding tier", ("tier",))
+MODEL_ROUTES = REGISTRY.counter(
+    "rag_model_routes_total", "Generation requests by routed model and answer type",
+    ("model", "answer_type", "reason"))
+
+# Gauges computed at scrape time; wired up by the service
+CACHE_HIT_RATIO = REGISTRY.gauge("rag_cache_hit_ratio", "Cache hit ratio", ("cache",))
+VECTOR_STORE_DOCUMENTS = REGISTRY.gauge("rag_vector_store_documents", "Chunks in the vector store")
+QUEUE_DEPTH = REGISTRY.gauge("rag_queue_depth", "Requests waiting", ("queue",))
+IN_FLIGHT = REGISTRY.gauge("rag_in_flight", "Requests in progress", ("component",))
+LOAD_SHED_TIER = REGISTRY.gauge("rag_load_shed_tier", "Active load shedding tier (0 = normal)")
+
+
+def observe_trace(trace_summary: Dict):
+    """
+    Record stage latencies from a finished trace summary.
+
+    Args:
+        trace_summary: Output of ``Trace.finish()``
+    """
+    for stage in trace_summary.get('stages', []):
+        STAGE_LATENCY.observe(stage['duration_ms'] / 1000.0, stage=stage['name'])
+    REQUEST_LATENCY.observe(trace_summary.get('total_ms', 0.0) / 1000.0)
@@ -0,0 +1,327 @@
+"""
+Model Manager for Module 3: Question-Answering Engine
+
+This module manages which Ollama models are loaded. Configured models are
+preloaded at startup with an empty prompt (Ollama loads the model and returns
+without generating), ``keep_alive`` is applied per model, and requests for
+models that were not preloaded can be allowed, refused or serialized so they
+do not keep evicting the preloaded ones.
+"""
+
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager, asynccontextmanager
+from typing import Dict, List, Optional, Union
+from dataclasses import dataclass, asdict
+
+from .ollama_client import OllamaClient
+from .ollama_pool import OllamaPool
+
+
+@dataclass
+class ModelStatus:
+    """Data class for the load state of one model."""
+    name: str
+    preloaded: bool
+    resident: bool
+    keep_alive: str
+    load_time: Optional[float] = None
+    last_loaded_at: Optional[float] = None
+    error: Optional[str] = None
+
+
+class ModelNotAvailableError(Exception):
+    """Raised when a request targets a model that is not preloaded and the policy refuses it."""
+
+
+class _HandoffLock:
+    """
+    FIFO mutex shared by threads and coroutines.
+
+    Release hands ownership straight to the next waiter. Coroutines wait on
+    a future instead of a worker thread, and a cancelled coroutine either
+    leaves the queue or, if ownership already reached it, passes it on.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._held = False
+        self._waiters = deque()
+
+    def acquire(self):
+        with self._lock:
+            if not self._held:
+                self._held = True
+                return
+            waiter = threading.Event()
+            self._waiters.append(waiter)
+        waiter.wait()
+
+    async def acquire_async(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if not self._held:
+                self._held = True
+                return
+            waiter = (loop.create_future(), loop)
+            self._waiters.append(waiter)
+        try:
+            await waiter[0]
+        except asyncio.CancelledError:
+            with self._lock:
+                queued = waiter in self._waiters
+                if queued:
+                    self._waiters.remove(waiter)
+            if not queued:
+                self.release()
+            raise
+
+    def release(self):
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if isinstance(waiter, threading.Event):
+                    waiter.set()
+                    return
+                future, loop = waiter
+                try:
+                    loop.call_soon_threadsafe(_resolve, future)
+                    return
+                except RuntimeError:
+                    continue  # the waiter's event loop is closed
+            self._held = False
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+def _resolve(future: 'asyncio.Future'):
+    """Wake a waiting coroutine; runs on its event loop."""
+    if not future.done():
+        future.set_result(None)
+
+
+class ModelManager:
+    """
+    Tracks and warms the Ollama models used for generation.
+
+    Features:
+    - Startup preloading with a zero-token request
+    - Per-model keep_alive
+    - Resident model tracking via /api/ps
+    - Admission policy for models that were not preloaded
+    """
+
+    POLICIES = ('allow', 'refuse', 'queue')
+
+    def __init__(self, client: Union[OllamaClient, OllamaPool], preload_models: List[str] = None,
+                 keep_alive: Dict[str, str] = None, default_keep_alive: str = "30m",
+                 cold_model_policy: str = "allow", preload_timeout: float = 300.0):
+        """
+        Initialize the model manager.
+
+        Args:
+            client: Ollama client or endpoint pool used for preloading and status calls
+            preload_models: Models to load at startup
+            keep_alive: Per-model keep_alive values (e.g. {"mistral:7b": "-1"})
+            default_keep_alive: keep_alive for models without an explicit value
+            cold_model_policy: 'allow', 'refuse' or 'queue' for non-preloaded models
+            preload_timeout: Read timeout in seconds for each model load, which
+                can take far longer than the client's generation timeout
+        """
+        if cold_model_policy not in self.POLICIES:
+            raise ValueError(f"Unsupported cold model policy: {cold_model_policy}")
+
+        self.client = client
+        self.preload_models = list(preload_models or [])
+        self.keep_alive = dict(keep_alive or {})
+        self.default_keep_alive = default_keep_alive
+        self.cold_model_policy = cold_model_policy
+        self.preload_timeout = preload_timeout
+        self.logger = logging.getLogger(__name__)
+
+        self._models: Dict[str, ModelStatus] = {
+            name: ModelStatus(name=name, preloaded=False, resident=False,
+                              keep_alive=self.keep_alive_for(name))
+            for name in self.preload_models
+        }
+        self._lock = threading.Lock()
+        # Serializes generations for cold models under the 'queue' policy
+        self._cold_model_lock = _HandoffLock()
+
+    def keep_alive_for(self, model_name: str) -> str:
+        """
+        Get the keep_alive value for a model.
+
+        Args:
+            model_name: Ollama model name
+
+        Returns:
+            keep_alive duration string
+        """
+        return self.keep_alive.get(model_name, self.default_keep_alive)
+
+    def preload(self) -> Dict[str, bool]:
+        """
+        Load all configured models into Ollama.
+
+        Returns:
+            Dictionary of model name to whether it loaded
+        """
+        loaded = {}
+        for name in self.preload_models:
+            loaded[name] = self.load_model(name)
+        self.refresh_resident()
+        return loaded
+
+    def load_model(self, model_name: str) -> bool:
+        """
+        Load one model with an empty prompt and its keep_alive.
+
+        Args:
+            model_name: Ollama model name
+
+        Returns:
+            True if the model loaded
+        """
+        start_time = time.time()
+        try:
+            self.client.load_model(model_name, self.keep_alive_for(model_name),
+                                   read_timeout=self.preload_timeout)
+        except Exception as e:
+            self.logger.error(f"Failed to preload model {model_name}: {e}")
+            with self._lock:
+                status = self._status(model_name)
+                status.error = str(e)
+            return False
+
+        load_time = time.time() - start_time
+        with self._lock:
+            status = self._status(model_name)
+            status.preloaded = True
+            status.resident = True
+            status.load_time = load_time
+            status.last_loaded_at = time.time()
+            status.error = None
+        self.logger.info(f"Preloaded model {model_name} in {load_time:.1f}s")
+        return True
+
+    def refresh_resident(self) -> List[str]:
+        """
+        Refresh which models Ollama currently holds in memory.
+
+        Returns:
+            Names of resident models
+        """
+        try:
+            running = self.client.get("/api/ps").get('models', [])
+        except Exception as e:
+            self.logger.warning(f"Could not query running models: {e}")
+            return []
+
+        resident = [m.get('name') or m.get('model') for m in running]
+        with self._lock:
+            for status in self._models.values():
+                status.resident = status.name in resident
+            for name in resident:
+                if name not in self._models:
+                    self._models[name] = ModelStatus(
+                        name=name, preloaded=False, resident=True,
+                        keep_alive=self.keep_alive_for(name)
+                    )
+        return resident
+
+    def is_preloaded(self, model_name: str) -> bool:
+        """Check whether a model was preloaded successfully."""
+        with self._lock:
+            status = self._models.get(model_name)
+            return bool(status and status.preloaded)
+
+    def check_admission(self, model_name: str):
+        """
+        Raise now if a generation for the model would be refused.
+
+        Lets callers fail a request before committing to a response; nothing
+        is reserved, so the later ``admit`` still applies the policy.
+
+        Args:
+            model_name: Ollama model name
+
+        Raises:
+            ModelNotAvailableError: The model is cold and the policy is 'refuse'
+        """
+        if self.cold_model_policy == 'refuse' and not self.is_preloaded(model_name):
+            raise ModelNotAvailableError(f"Model {model_name} is not preloaded on this server")
+
+    @contextmanager
+    def admit(self, model_name: str):
+        """
+        Admit a generation for a model according to the cold model policy.
+
+        Preloaded models are always admitted. Other models are admitted
+        ('allow'), refused with ModelNotAvailableError ('refuse'), or run one
+        at a time ('queue').
+
+        Args:
+            model_name: Ollama model name
+        """
+        if self.is_preloaded(model_name) or self.cold_model_policy == 'allow':
+            yield
+        elif self.cold_model_policy == 'refuse':
+            raise ModelNotAvailableError(f"Model {model_name} is not preloaded on this server")
+        else:
+            self.logger.info(f"Queueing generation for cold model {model_name}")
+            with self._cold_model_lock:
+                yield
+
+    @asynccontextmanager
+    async def admit_async(self, model_name: str):
+        """
+        Async variant of ``admit``; waiting for the cold-model lock does not
+        block the event loop or hold a worker thread.
+
+        Args:
+            model_name: Ollama model name
+        """
+        if self.is_preloaded(model_name) or self.cold_model_policy == 'allow':
+            yield
+        elif self.cold_model_policy == 'refuse':
+            raise ModelNotAvailableError(f"Model {model_name} is not preloaded on this server")
+        else:
+            self.logger.info(f"Queueing generation for cold model {model_name}")
+            await self._cold_model_lock.acquire_async()
+            try:
+                yield
+            finally:
+                self._cold_model_lock.release()
+
+    def get_status(self) -> Dict:
+        """
+        Get model residency status.
+
+        Returns:
+            Dictionary with policy and per-model status
+        """
+        with self._lock:
+            models = [asdict(status) for status in self._models.values()]
+        return {
+            'cold_model_policy': self.cold_model_policy,
+            'default_keep_alive': self.default_keep_alive,
+            'models': models
+        }
+
+    def _status(self, model_name: str) -> ModelStatus:
+        """Get or create the status entry for a model; caller holds the lock."""
+        if model_name not in self._models:
+            self._models[model_name] = ModelStatus(
+                name=model_name, preloaded=False, resident=False,
+                keep_alive=self.keep_alive_for(model_name)
+            )
+        return self._models[model_name]
@@ -0,0 +1,169 @@
+"""
+Model Routing for Module 3: Question-Answering Engine
+
+This module picks the Ollama model and generation limits for a question from
+its answer type (as classified by the answer generator). Short definition
+and factual answers go to a small, fast model with a small token budget;
+comparison and analytical answers go to a larger model with a longer budget
+and read timeout. A model named explicitly by the caller is never rerouted.
+
+Routes name a model directly or through the aliases ``small``, ``large`` and
+``default``; an alias with no model configured falls back to the default
+model. Until a small or large model or a route override is configured, the
+router is inactive and every question keeps the default model and limits.
+A route's read timeout replaces the client default for each attempt.
+"""
+
+import logging
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from .metrics import MODEL_ROUTES
+
+DEFAULT_ROUTES = {
+    'definition': {'model': 'small', 'num_predict': 200},
+    'general': {'model': 'small', 'num_predict': 300},
+    'process': {'model': 'default', 'num_predict': 400},
+    'comparison': {'model': 'large', 'num_predict': 500, 'read_timeout': 60.0},
+    'analytical': {'model': 'large', 'num_predict': 600, 'read_timeout': 60.0}
+}
+
+
+@dataclass(frozen=True)
+class ModelRoute:
+    """Data class for the model and limits chosen for one request."""
+    answer_type: str
+    model_name: str
+    num_predict: Optional[int] = None
+    read_timeout: Optional[float] = None  # seconds; None keeps the client default
+    reason: str = 'intent'  # 'intent', 'explicit', 'unconfigured' or 'disabled'
+
+
+class ModelRouter:
+    """
+    Routes questions to models by answer type.
+
+    Features:
+    - Small/large/default model aliases
+    - Per-answer-type token budgets and read timeouts
+    - Routes overridable per answer type from configuration
+    - Decision logging and counters
+    """
+
+    def __init__(self, default_model: str, routes: Dict[str, Dict] = None,
+                 small_model: Optional[str] = None, large_model: Optional[str] = None,
+                 enabled: bool = True):
+        """
+        Initialize the model router.
+
+        Args:
+            default_model: Model used when a route names no model
+            routes: Per-answer-type overrides of ``DEFAULT_ROUTES``; each maps to
+                ``model``, ``num_predict`` and ``read_timeout`` (optional)
+            small_model: Model behind the ``small`` alias (optional)
+            large_model: Model behind the ``large`` alias (optional)
+            enabled: Always use the default model without limits when False
+        """
+        self.logger = logging.getLogger(__name__)
+        self.default_model = default_model
+        self.models = {'small': small_model, 'large': large_model, 'default': default_model}
+        self.enabled = enabled
+        # Default routes only take effect alongside some routing configuration
+        self.configured = bool(small_model or large_model or routes)
+        self.routes: Dict[str, Dict] = {name: dict(route) for name, route in DEFAULT_ROUTES.items()}
+        for answer_type, override in (routes or {}).items():
+            self.routes.setdefault(answer_type, {}).update(override)
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def _resolve_model(self, name: Optional[str]) -> str:
+        """Model name for an alias or literal name."""
+        if name is None:
+            return self.default_model
+        if name in self.models:
+            return self.models[name] or self.default_model
+        return name
+
+    @property
+    def routes_by_answer_type(self) -> bool:
+        """Whether the chosen model depends on the answer type."""
+        return self.enabled and self.configured
+
+    def route(self, answer_type: str, model_name: Optional[str] = None) -> ModelRoute:
+        """
+        Choose the model and limits for a question.
+
+        Args:
+            answer_type: Answer type from the answer generator
+            model_name: Model requested by the caller (optional; never rerouted)
+
+        Returns:
+            Routing decision
+        """
+        decision = self.resolve(answer_type, model_name)
+        if decision.reason == 'intent':
+            self.logger.info(
+                f"Routing {answer_type} question to {decision.model_name} "
+                f"(num_predict={decision.num_predict}, read_timeout={decision.read_timeout})"
+            )
+
+        MODEL_ROUTES.inc(model=decision.model_name, answer_type=answer_type, reason=decision.reason)
+        with self._lock:
+            self._counts[decision.model_name] += 1
+        return decision
+
+    def resolve(self, answer_type: str, model_name: Optional[str] = None) -> ModelRoute:
+        """
+        Routing decision for a question, without logging or counting it.
+
+        Args:
+            answer_type: Answer type from the answer generator
+            model_name: Model requested by the caller (optional; never rerouted)
+
+        Returns:
+            Routing decision
+        """
+        if model_name:
+            decision = ModelRoute(answer_type=answer_type, model_name=model_name, reason='explicit')
+        elif not self.enabled or not self.configured:
+            decision = ModelRoute(answer_type=answer_type, model_name=self.default_model,
+                                  reason='disabled' if not self.enabled else 'unconfigured')
+        else:
+            route = self.routes.get(answer_type) or self.routes.get('general', {})
+            decision = ModelRoute(
+                answer_type=answer_type,
+                model_name=self._resolve_model(route.get('model')),
+                num_predict=route.get('num_predict'),
+                read_timeout=route.get('read_timeout')
+            )
+        return decision
+
+    @staticmethod
+    def describe(decision: ModelRoute) -> Dict:
+        """Routing summary for result metadata."""
+        return {
+            'answer_type': decision.answer_type,
+            'model': decision.model_name,
+            'num_predict': decision.num_predict,
+            'read_timeout': decision.read_timeout,
+            'reason': decision.reason
+        }
+
+    def get_stats(self) -> Dict:
+        """
+        Get routing configuration and counts.
+
+        Returns:
+            Dictionary with the routes, model aliases and requests per model
+        """
+        with self._lock:
+            counts = dict(self._counts)
+        return {
+            'enabled': self.enabled,
+            'configured': self.configured,
+            'models': {alias: self._resolve_model(alias) for alias in self.models},
+            'routes': {name: dict(route) for name, route in self.routes.items()},
+            'requests_by_model': counts
+        }
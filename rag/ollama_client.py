@@ -0,0 +1,250 @@
+"""
+Ollama Client for Module 3: Question-Answering Engine
+
+This module provides long-lived HTTP clients for the Ollama API. The sync
+client keeps a pooled keep-alive ``requests.Session``; the async client wraps
+``httpx.AsyncClient`` for use from async endpoints. Both use separate connect
+and read timeouts so a dead host fails fast while slow generations are allowed
+to finish.
+"""
+
+import json
+import logging
+from typing import AsyncIterator, Dict, Iterator, Optional
+from dataclasses import dataclass
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+@dataclass
+class OllamaClientConfig:
+    """Connection settings shared by the sync and async clients."""
+    base_url: str = "http://localhost:11434"
+    connect_timeout: float = 3.05
+    read_timeout: float = 30.0
+    pool_connections: int = 4    # number of distinct hosts kept in the pool
+    pool_maxsize: int = 16       # keep-alive connections per host
+    pool_block: bool = False     # block instead of opening overflow connections
+
+
+class OllamaError(Exception):
+    """Raised when Ollama returns an error status or error payload."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class OllamaClient:
+    """
+    Pooled, keep-alive sync client for the Ollama API.
+
+    One instance should be shared per process; ``requests.Session`` is safe
+    to use from the FastAPI threadpool for these simple request patterns.
+    """
+
+    def __init__(self, config: OllamaClientConfig = None):
+        """
+        Initialize the client.
+
+        Args:
+            config: Connection settings
+        """
+        self.config = config or OllamaClientConfig()
+        self.base_url = self.config.base_url.rstrip('/')
+        self.logger = logging.getLogger(__name__)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.config.pool_connections,
+            pool_maxsize=self.config.pool_maxsize,
+            pool_block=self.config.pool_block
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    @property
+    def timeout(self) -> tuple:
+        """(connect, read) timeout tuple for requests."""
+        return (self.config.connect_timeout, self.config.read_timeout)
+
+    def generate(self, payload: Dict, read_timeout: float = None) -> Dict:
+        """
+        Call /api/generate without streaming.
+
+        Args:
+            payload: Request body (``stream`` is forced to False)
+            read_timeout: Optional per-call read timeout override
+
+        Returns:
+            Parsed JSON response
+        """
+        payload = dict(payload, stream=False)
+        timeout = (self.config.connect_timeout, read_timeout or self.config.read_timeout)
+        response = self.session.post(f"{self.base_url}/api/generate", json=payload, timeout=timeout)
+        if response.status_code != 200:
+            raise OllamaError(f"Ollama API error: {response.status_code}", response.status_code)
+        return response.json()
+
+    def stream_generate(self, payload: Dict, read_timeout: float = None) -> Iterator[Dict]:
+        """
+        Call /api/generate with streaming and yield each NDJSON chunk.
+
+        Args:
+            payload: Request body (``stream`` is forced to True)
+            read_timeout: Optional per-call read timeout override
+
+        Yields:
+            Parsed response chunks; the last one has ``done`` set
+        """
+        payload = dict(payload, stream=True)
+        timeout = (self.config.connect_timeout, read_timeout or self.config.read_timeout)
+        with self.session.post(f"{self.base_url}/api/generate", json=payload,
+                               stream=True, timeout=timeout) as response:
+            if response.status_code != 200:
+                raise OllamaError(f"Ollama API error: {response.status_code}", response.status_code)
+            # chunk_size=None yields data as it arrives instead of buffering 512 bytes
+            for line in response.iter_lines(chunk_size=None):
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get('error'):
+                    raise OllamaError(f"Ollama stream error: {chunk['error']}")
+                yield chunk
+                if chunk.get('done'):
+                    break
+
+    def load_model(self, model_name: str, keep_alive: str, read_timeout: float = None) -> Dict:
+        """
+        Load a model with an empty prompt; Ollama returns without generating.
+
+        Args:
+            model_name: Ollama model name
+            keep_alive: keep_alive duration for the model
+            read_timeout: Optional read timeout override; loading a large model
+                from disk can take longer than a generation
+
+        Returns:
+            Parsed JSON response
+        """
+        return self.generate({"model": model_name, "prompt": "", "keep_alive": keep_alive},
+                             read_timeout=read_timeout)
+
+    def get(self, path: str) -> Dict:
+        """
+        Call a GET endpoint such as /api/tags or /api/ps.
+
+        Args:
+            path: API path
+
+        Returns:
+            Parsed JSON response
+        """
+        response = self.session.get(f"{self.base_url}{path}", timeout=self.timeout)
+        if response.status_code != 200:
+            raise OllamaError(f"Ollama API error: {response.status_code}", response.status_code)
+        return response.json()
+
+    def close(self):
+        """Close pooled connections."""
+        self.session.close()
+
+
+class AsyncOllamaClient:
+    """
+    Pooled async client for the Ollama API, built on httpx.
+
+    httpx is imported lazily so the sync path does not require it.
+    """
+
+    def __init__(self, config: OllamaClientConfig = None):
+        """
+        Initialize the client.
+
+        Args:
+            config: Connection settings
+        """
+        try:
+            import httpx
+        except ImportError as e:
+            raise ImportError("AsyncOllamaClient requires httpx (pip install httpx)") from e
+
+        self.config = config or OllamaClientConfig()
+        self.base_url = self.config.base_url.rstrip('/')
+        self.logger = logging.getLogger(__name__)
+        self._httpx = httpx
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(self.config.read_timeout, connect=self.config.connect_timeout),
+            limits=httpx.Limits(
+                max_connections=self.config.pool_maxsize,
+                max_keepalive_connections=self.config.pool_maxsize
+            )
+        )
+
+    def _timeout(self, read_timeout: float = None):
+        return self._httpx.Timeout(read_timeout or self.config.read_timeout,
+                                   connect=self.config.connect_timeout)
+
+    async def generate(self, payload: Dict, read_timeout: float = None) -> Dict:
+        """
+        Call /api/generate without streaming.
+
+        Args:
+            payload: Request body (``stream`` is forced to False)
+            read_timeout: Optional per-call read timeout override
+
+        Returns:
+            Parsed JSON response
+        """
+        payload = dict(payload, stream=False)
+        response = await self.client.post(f"{self.base_url}/api/generate", json=payload,
+                                          timeout=self._timeout(read_timeout))
+        if response.status_code != 200:
+            raise OllamaError(f"Ollama API error: {response.status_code}", response.status_code)
+        return response.json()
+
+    async def stream_generate(self, payload: Dict, read_timeout: float = None) -> AsyncIterator[Dict]:
+        """
+        Call /api/generate with streaming and yield each NDJSON chunk.
+
+        Args:
+            payload: Request body (``stream`` is forced to True)
+            read_timeout: Optional per-call read timeout override
+
+        Yields:
+            Parsed response chunks; the last one has ``done`` set
+        """
+        payload = dict(payload, stream=True)
+        async with self.client.stream("POST", f"{self.base_url}/api/generate", json=payload,
+                                      timeout=self._timeout(read_timeout)) as response:
+            if response.status_code != 200:
+                raise OllamaError(f"Ollama API error: {response.status_code}", response.status_code)
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get('error'):
+                    raise OllamaError(f"Ollama stream error: {chunk['error']}")
+                yield chunk
+                if chunk.get('done'):
+                    break
+
+    async def get(self, path: str) -> Dict:
+        """
+        Call a GET endpoint such as /api/tags or /api/ps.
+
+        Args:
+            path: API path
+
+        Returns:
+            Parsed JSON response
+        """
+        response = await self.client.get(f"{self.base_url}{path}", timeout=self._timeout())
+        if response.status_code != 200:
+            raise OllamaError(f"Ollama API error: {response.status_code}", response.status_code)
+        return response.json()
+
+    async def aclose(self):
+        """Close pooled connections."""
+        await self.client.aclose()
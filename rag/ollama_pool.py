@@ -0,0 +1,483 @@
+"""
+Ollama Pool for Module 3: Question-Answering Engine
+
+This module spreads generation across several Ollama hosts. The pool exposes
+the same interface as ``OllamaClient`` so the answer generator and model
+manager can use either. Requests go to the healthy endpoint with the fewest
+outstanding requests, preferring endpoints that already have the requested
+model loaded. Endpoints that keep failing are ejected for a cool-down period
+and re-admitted after a successful probe. Optionally, a non-streaming request
+that runs past a latency percentile is hedged to a second host and the first
+answer wins. A hedge goes to a different endpoint, and only to one with
+spare capacity, so it never adds load to the slow host or a busy one.
+"""
+
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field, replace
+from typing import Deque, Dict, Iterator, List, Optional, Set
+
+import numpy as np
+
+from .ollama_client import OllamaClient, OllamaClientConfig, OllamaError
+
+
+@dataclass(eq=False)
+class Endpoint:
+    """Data class for one Ollama host and its routing state."""
+    url: str
+    client: OllamaClient
+    outstanding: int = 0
+    consecutive_failures: int = 0
+    ejected_until: float = 0.0
+    probing: bool = False
+    loaded_models: Set[str] = field(default_factory=set)
+    avg_latency: Optional[float] = None
+    requests: int = 0
+    failures: int = 0
+
+    @property
+    def ejected(self) -> bool:
+        return self.ejected_until > 0.0
+
+
+class OllamaPool:
+    """
+    Load-balancing client over several Ollama endpoints.
+
+    Features:
+    - Least-outstanding-requests routing
+    - Preference for endpoints with the model already loaded
+    - Ejection after consecutive failures, re-admission after a probe
+    - Failover to another endpoint on connection errors
+    - Optional hedged requests past a latency percentile
+    """
+
+    def __init__(self, urls: List[str], client_config: OllamaClientConfig = None,
+                 max_failures: int = 3, eject_seconds: float = 30.0,
+                 hedge_percentile: float = None, hedge_min_samples: int = 20,
+                 endpoint_concurrency: int = None):
+        """
+        Initialize the pool.
+
+        Args:
+            urls: Ollama base URLs
+            client_config: Connection settings applied to every endpoint
+            max_failures: Consecutive failures before an endpoint is ejected
+            eject_seconds: Cool-down before an ejected endpoint is probed again
+            hedge_percentile: Latency percentile (0-100) after which a request
+                is hedged to a second endpoint; None disables hedging
+            hedge_min_samples: Latency samples required before hedging starts
+            endpoint_concurrency: Generations each endpoint is sized for; a
+                request is only hedged to an endpoint with fewer outstanding
+                (optional; unlimited when omitted)
+        """
+        if not urls:
+            raise ValueError("OllamaPool needs at least one endpoint")
+
+        self.config = client_config or OllamaClientConfig()
+        self.max_failures = max_failures
+        self.eject_seconds = eject_seconds
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.endpoint_concurrency = endpoint_concurrency
+        self.logger = logging.getLogger(__name__)
+
+        self.endpoints = [
+            Endpoint(url=url.rstrip('/'), client=OllamaClient(replace(self.config, base_url=url)))
+            for url in urls
+        ]
+        self._lock = threading.Lock()
+        self._next = 0
+        self._latencies: Deque[float] = deque(maxlen=500)
+        self._stats = {'failovers': 0, 'ejections': 0, 'readmissions': 0,
+                       'hedges': 0, 'hedges_won': 0}
+        self._executor = None
+        self._health_thread = None
+        self._stop = threading.Event()
+
+    @property
+    def timeout(self) -> tuple:
+        """(connect, read) timeout tuple for requests."""
+        return (self.config.connect_timeout, self.config.read_timeout)
+
+    def generate(self, payload: Dict, read_timeout: float = None) -> Dict:
+        """
+        Call /api/generate without streaming on the best endpoint.
+
+        Args:
+            payload: Request body
+            read_timeout: Optional per-call read timeout override
+
+        Returns:
+            Parsed JSON response
+        """
+        hedge_after = self._hedge_threshold()
+        if hedge_after is None:
+            return self._generate_with_failover(payload, read_timeout)
+        return self._generate_hedged(payload, read_timeout, hedge_after)
+
+    def stream_generate(self, payload: Dict, read_timeout: float = None) -> Iterator[Dict]:
+        """
+        Call /api/generate with streaming on the best endpoint.
+
+        Fails over to another endpoint only before the first chunk; a stream
+        that breaks midway is not restarted.
+
+        Args:
+            payload: Request body
+            read_timeout: Optional per-call read timeout override
+
+        Yields:
+            Parsed response chunks; the last one has ``done`` set
+        """
+        model = payload.get('model')
+        tried: List[Endpoint] = []
+        while True:
+            endpoint = self._acquire(model, exclude=tried)
+            tried.append(endpoint)
+            start_time = time.time()
+            started = False
+            try:
+                for chunk in endpoint.client.stream_generate(payload, read_timeout=read_timeout):
+                    started = True
+                    yield chunk
+            except GeneratorExit:
+                # Consumer stopped reading; the endpoint did nothing wrong
+                self._release(endpoint, model)
+                raise
+            except Exception as e:
+                self._release(endpoint, model, error=e)
+                if started or not self._should_failover(e, tried):
+                    raise
+                self._record_failover(endpoint, e)
+                continue
+            self._release(endpoint, model, latency=time.time() - start_time)
+            return
+
+    def load_model(self, model_name: str, keep_alive: str, read_timeout: float = None) -> Dict:
+        """
+        Load a model on every available endpoint.
+
+        Args:
+            model_name: Ollama model name
+            keep_alive: keep_alive duration for the model
+            read_timeout: Optional read timeout override; loading a large model
+                from disk can take longer than a generation
+
+        Returns:
+            Response from the last endpoint that loaded the model
+        """
+        payload = {"model": model_name, "prompt": "", "keep_alive": keep_alive}
+        result, errors = None, []
+        for endpoint in self._available():
+            try:
+                result = endpoint.client.generate(payload, read_timeout=read_timeout)
+            except Exception as e:
+                errors.append(f"{endpoint.url}: {e}")
+                if self._counts_as_failure(e):
+                    self._record_failure(endpoint, e)
+                continue
+            with self._lock:
+                endpoint.loaded_models.add(model_name)
+        if result is None:
+            raise OllamaError(f"Model {model_name} failed to load on all endpoints: {'; '.join(errors)}")
+        return result
+
+    def get(self, path: str) -> Dict:
+        """
+        Call a GET endpoint.
+
+        ``/api/ps`` is answered with the union of models running on all
+        available endpoints, and refreshes which models each one has loaded.
+        Other paths go to the first endpoint that answers.
+
+        Args:
+            path: API path
+
+        Returns:
+            Parsed JSON response
+        """
+        if path == '/api/ps':
+            self.check_health()
+            with self._lock:
+                names = sorted(set().union(*(e.loaded_models for e in self.endpoints
+                                             if not e.ejected)))
+            return {'models': [{'name': name} for name in names]}
+
+        last_error = None
+        for endpoint in self._available():
+            try:
+                return endpoint.client.get(path)
+            except Exception as e:
+                last_error = e
+                self._record_failure(endpoint, e)
+        raise OllamaError(f"No Ollama endpoint answered {path}: {last_error}")
+
+    def healthy_count(self) -> int:
+        """Number of endpoints currently in rotation."""
+        with self._lock:
+            return sum(1 for e in self.endpoints if not e.ejected)
+
+    def check_health(self) -> Dict[str, bool]:
+        """
+        Probe every endpoint with /api/ps.
+
+        Healthy probes re-admit ejected endpoints and refresh loaded models;
+        failed probes count as failures.
+
+        Returns:
+            Dictionary of endpoint URL to health
+        """
+        health = {}
+        for endpoint in self.endpoints:
+            try:
+                running = endpoint.client.get('/api/ps').get('models', [])
+            except Exception as e:
+                self._record_failure(endpoint, e)
+                health[endpoint.url] = False
+                continue
+            with self._lock:
+                endpoint.loaded_models = {m.get('name') or m.get('model') for m in running}
+                self._readmit(endpoint)
+            health[endpoint.url] = True
+        return health
+
+    def start_health_checks(self, interval: float = 15.0):
+        """
+        Probe endpoints periodically in a background thread.
+
+        Args:
+            interval: Seconds between probes
+        """
+        if self._health_thread is not None or interval <= 0:
+            return
+
+        def run():
+            while not self._stop.wait(interval):
+                self.check_health()
+
+        self._health_thread = threading.Thread(target=run, name="ollama-health", daemon=True)
+        self._health_thread.start()
+
+    def get_stats(self) -> Dict:
+        """
+        Get per-endpoint routing state and pool counters.
+
+        Returns:
+            Dictionary with endpoint states and counters
+        """
+        with self._lock:
+            endpoints = [{
+                'url': e.url,
+                'healthy': not e.ejected,
+                'outstanding': e.outstanding,
+                'consecutive_failures': e.consecutive_failures,
+                'loaded_models': sorted(e.loaded_models),
+                'avg_latency': e.avg_latency,
+                'requests': e.requests,
+                'failures': e.failures
+            } for e in self.endpoints]
+            stats = dict(self._stats)
+        stats['endpoints'] = endpoints
+        stats['hedge_threshold'] = self._hedge_threshold()
+        return stats
+
+    def close(self):
+        """Stop health checks and close pooled connections."""
+        self._stop.set()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        for endpoint in self.endpoints:
+            endpoint.client.close()
+
+    def _generate_with_failover(self, payload: Dict, read_timeout: Optional[float],
+                                exclude: List[Endpoint] = None,
+                                attempted: List[Endpoint] = None) -> Dict:
+        """
+        Run a generation, moving to another endpoint on connection failures.
+
+        Endpoints in ``exclude`` are never used; each endpoint picked is
+        appended to ``attempted`` (optional) as soon as it is chosen.
+        """
+        model = payload.get('model')
+        tried = list(exclude or [])
+        while True:
+            endpoint = self._acquire(model, exclude=tried)
+            tried.append(endpoint)
+            if attempted is not None:
+                attempted.append(endpoint)
+            start_time = time.time()
+            try:
+                result = endpoint.client.generate(payload, read_timeout=read_timeout)
+            except Exception as e:
+                self._release(endpoint, model, error=e)
+                if not self._should_failover(e, tried):
+                    raise
+                self._record_failover(endpoint, e)
+                continue
+            self._release(endpoint, model, latency=time.time() - start_time)
+            return result
+
+    def _generate_hedged(self, payload: Dict, read_timeout: Optional[float],
+                         hedge_after: float) -> Dict:
+        """
+        Run a generation and hedge it to a second endpoint if it is slow.
+
+        The losing request is not cancelled (blocking HTTP calls cannot be
+        interrupted); its result is discarded when it completes.
+        """
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=max(2 * len(self.endpoints), 4),
+                        thread_name_prefix="ollama-hedge"
+                    )
+
+        primary_endpoints: List[Endpoint] = []
+        primary = self._executor.submit(
+            self._generate_with_failover, payload, read_timeout, None, primary_endpoints
+        )
+        done, _ = wait([primary], timeout=hedge_after)
+        exclude = list(primary_endpoints)
+        if done or not self._has_spare_endpoint(exclude):
+            return primary.result()
+
+        with self._lock:
+            self._stats['hedges'] += 1
+        self.logger.info(f"Hedging generation after {hedge_after:.2f}s")
+        hedge = self._executor.submit(self._generate_with_failover, payload, read_timeout, exclude)
+
+        pending = {primary, hedge}
+        last_error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        with self._lock:
+                            self._stats['hedges_won'] += 1
+                    return future.result()
+                last_error = future.exception()
+        raise last_error
+
+    def _hedge_threshold(self) -> Optional[float]:
+        """Latency after which a request is hedged, or None when hedging is off."""
+        if self.hedge_percentile is None or len(self.endpoints) < 2:
+            return None
+        with self._lock:
+            if len(self._latencies) < self.hedge_min_samples:
+                return None
+            samples = np.fromiter(self._latencies, dtype=float)
+        return float(np.percentile(samples, self.hedge_percentile))
+
+    def _has_spare_endpoint(self, exclude: List[Endpoint]) -> bool:
+        """Whether a healthy endpoint outside ``exclude`` has room for another request."""
+        with self._lock:
+            return any(
+                not e.ejected and e not in exclude and (
+                    self.endpoint_concurrency is None or e.outstanding < self.endpoint_concurrency)
+                for e in self.endpoints
+            )
+
+    def _available(self) -> List[Endpoint]:
+        """Endpoints that are not ejected, or whose cool-down has passed."""
+        now = time.time()
+        with self._lock:
+            return [e for e in self.endpoints if not e.ejected or now >= e.ejected_until]
+
+    def _acquire(self, model: Optional[str], exclude: List[Endpoint]) -> Endpoint:
+        """
+        Pick an endpoint and count the request as outstanding.
+
+        Healthy endpoints come first; an ejected endpoint past its cool-down
+        gets a single probe request at a time. Among candidates, the fewest
+        outstanding requests wins, with one extra request charged to
+        endpoints that do not have the model loaded; ties go to the lowest
+        average latency.
+        """
+        now = time.time()
+        with self._lock:
+            healthy = [e for e in self.endpoints if not e.ejected and e not in exclude]
+            candidates = healthy or [
+                e for e in self.endpoints
+                if e.ejected and now >= e.ejected_until and not e.probing and e not in exclude
+            ]
+            if not candidates:
+                raise OllamaError("No healthy Ollama endpoint available")
+
+            # Rotate the start so ties are spread across endpoints
+            self._next = (self._next + 1) % len(candidates)
+            rotated = candidates[self._next:] + candidates[:self._next]
+            endpoint = min(rotated, key=lambda e: (
+                e.outstanding + (0 if model in e.loaded_models else 1),
+                e.avg_latency or 0.0
+            ))
+
+            if endpoint.ejected:
+                endpoint.probing = True
+            endpoint.outstanding += 1
+            endpoint.requests += 1
+            return endpoint
+
+    def _release(self, endpoint: Endpoint, model: Optional[str], latency: float = None,
+                 error: Exception = None):
+        """Finish a request and update endpoint health."""
+        with self._lock:
+            endpoint.outstanding -= 1
+            endpoint.probing = False
+        if error is not None:
+            if self._counts_as_failure(error):
+                self._record_failure(endpoint, error)
+            return
+
+        with self._lock:
+            endpoint.consecutive_failures = 0
+            self._readmit(endpoint)
+            if model:
+                endpoint.loaded_models.add(model)
+            endpoint.avg_latency = latency if endpoint.avg_latency is None else (
+                0.8 * endpoint.avg_latency + 0.2 * latency)
+            self._latencies.append(latency)
+
+    def _record_failure(self, endpoint: Endpoint, error: Exception):
+        """Count a failure and eject the endpoint past the threshold."""
+        with self._lock:
+            endpoint.failures += 1
+            endpoint.consecutive_failures += 1
+            if endpoint.ejected or endpoint.consecutive_failures >= self.max_failures:
+                if not endpoint.ejected:
+                    self._stats['ejections'] += 1
+                    self.logger.warning(f"Ejecting Ollama endpoint {endpoint.url}: {error}")
+                endpoint.ejected_until = time.time() + self.eject_seconds
+                endpoint.loaded_models.clear()
+
+    def _readmit(self, endpoint: Endpoint):
+        """Return an ejected endpoint to rotation; caller holds the lock."""
+        if endpoint.ejected:
+            endpoint.ejected_until = 0.0
+            endpoint.consecutive_failures = 0
+            self._stats['readmissions'] += 1
+            self.logger.info(f"Re-admitted Ollama endpoint {endpoint.url}")
+
+    def _record_failover(self, endpoint: Endpoint, error: Exception):
+        with self._lock:
+            self._stats['failovers'] += 1
+        self.logger.warning(f"Ollama endpoint {endpoint.url} failed, trying another: {error}")
+
+    def _should_failover(self, error: Exception, tried: List[Endpoint]) -> bool:
+        """Whether another endpoint is worth trying after an error."""
+        with self._lock:
+            untried = any(e not in tried for e in self.endpoints)
+        return untried and self._counts_as_failure(error)
+
+    @staticmethod
+    def _counts_as_failure(error: Exception) -> bool:
+        """Client errors (4xx) are the request's fault, not the endpoint's."""
+        if isinstance(error, OllamaError) and error.status_code is not None:
+            return error.status_code >= 500
+        return True
@@ -6,17 +6,40 @@ a complete question-answering system using RAG (Retrieval-Augmented Generation).
 """
 
 import time
+import asyncio
 import logging
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from functools import partial
+from typing import Dict, FrozenSet, Iterator, List, Optional, Tuple
+from dataclasses import dataclass, field, fields, replace, asdict
 from datetime import datetime
 
+import numpy as np
+
 # Use relative imports for core modules
-from .query_processor import QueryProcessor
-from .retrieval_engine import RetrievalEngine
+from .query_processor import QueryProcessor, ProcessedQuery
+from .synonym_engine import SynonymEngine
+from .retrieval_engine import RetrievalEngine, RetrievalResult
 from .context_builder import ContextBuilder
 from .answer_generator import AnswerGenerator, GeneratedAnswer
 from .response_formatter import ResponseFormatter, FormattedResponse
+from .reranker import Reranker
+from .context_packer import resolve_token_budget
+from .context_compressor import ContextCompressor
+from .ollama_client import OllamaClient, OllamaClientConfig
+from .ollama_pool import OllamaPool
+from .model_manager import ModelManager, ModelNotAvailableError
+from .singleflight import SingleFlight, FollowerTimeoutError
+from .answer_cache import AnswerCache
+from .semantic_cache import SemanticCache
+from .generation_scheduler import GenerationScheduler, Priority, QueueFullError, SchedulerRejectedError
+from .tracing import Trace, Tracer
+from .deadline import Deadline, DeadlinePolicy, RequestTimeoutError
+from .load_shedding import LoadShedder, LoadTier
+from .model_router import ModelRoute, ModelRouter
+from .metrics import observe_trace, OLLAMA_TOKENS, OLLAMA_TOKENS_PER_SECOND
 
 
 @dataclass
@@ -24,12 +47,117 @@ class QAEngineConfig:
     """Configuration for the QA Engine."""
     vector_store_path: str = "ragbot_fastapi/vector_db"
     collection_name: str = "documents"
+    # None reads RAG_EMBEDDING_BACKEND / RAG_EMBEDDING_DIM; 'hash' needs no model weights
+    embedding_backend: Optional[str] = None
+    embedding_dimension: Optional[int] = None
+    # Query expansion: JSON synonym file (None reads RAG_SYNONYMS_PATH, else built-in),
+    # variation cap, and similarity above which a variation is not searched
+    synonyms_path: Optional[str] = None
+    max_query_variations: int = 4
+    variation_similarity_threshold: float = 0.95
     ollama_url: str = "http://localhost:11434"
     model_name: str = "mistral:7b"
     max_context_length: int = 3000
     max_answer_length: int = 1000
     min_confidence_threshold: float = 0.3
     enable_logging: bool = True
+    enable_reranking: bool = False
+    reranker_model: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    rerank_top_n: int = 20
+    rerank_time_budget_ms: float = 250.0
+    # Concurrent cross-encoder passes; requests skip reranking when all are busy
+    rerank_max_workers: int = 2
+    mmr_lambda: float = 0.7
+    # Context windows (tokens) per model name or family; see resolve_token_budget
+    model_context_windows: Dict[str, int] = field(default_factory=lambda: {
+        'mistral': 8192,
+        'llama3': 8192,
+        'gemma': 8192
+    })
+    default_context_window: int = 4096
+    answer_token_reserve: int = 512
+    enable_context_compression: bool = False
+    compression_target_ratio: float = 0.5
+    prompt_tokens_per_second: float = 40.0  # prompt eval rate used to estimate time saved
+    # Ollama HTTP connection pool; size pool_maxsize to the expected concurrency
+    ollama_connect_timeout: float = 3.05
+    ollama_read_timeout: float = 30.0
+    # Ollama hosts to balance generation across; when set, this list replaces
+    # ollama_url (include that host here to keep using it)
+    ollama_urls: List[str] = field(default_factory=list)
+    ollama_max_failures: int = 3
+    ollama_eject_seconds: float = 30.0
+    ollama_health_check_interval: float = 15.0
+    ollama_hedge_percentile: Optional[float] = None  # e.g. 95.0 to enable hedging
+    ollama_hedge_min_samples: int = 20
+    ollama_pool_connections: int = 4
+    ollama_pool_maxsize: int = 16
+    # Models loaded at startup, their keep_alive, and handling of other models
+    preload_models: List[str] = field(default_factory=lambda: ["mistral:7b"])
+    model_keep_alive: Dict[str, str] = field(default_factory=dict)
+    default_keep_alive: str = "30m"
+    cold_model_policy: str = "allow"  # 'allow', 'refuse' or 'queue'
+    model_preload_timeout: float = 300.0  # read timeout per model load, in seconds
+    enable_request_coalescing: bool = True
+    # Admission control for generation; concurrency is per Ollama host
+    generation_max_concurrency: int = 2
+    generation_max_queue: int = 32
+    generation_queue_timeouts: Dict[str, float] = field(default_factory=lambda: {
+        'interactive': 30.0,
+        'batch': 600.0
+    })
+    # Persistent answer cache (SQLite); also persists the corpus version
+    enable_answer_cache: bool = False
+    answer_cache_path: str = "ragbot_fastapi/answer_cache.sqlite3"
+    answer_cache_ttl_seconds: float = 86400.0
+    answer_cache_max_entries: int = 10000
+    # In-memory cache keyed by query meaning and retrieved chunk set
+    enable_semantic_cache: bool = False
+    semantic_cache_threshold: float = 0.92
+    semantic_cache_max_entries: int = 1000
+    semantic_cache_ttl_seconds: float = 3600.0
+    semantic_cache_chunk_match_k: int = 3
+    # Skip generation when the best retrieved similarity is below this value
+    retrieval_confidence_threshold: float = 0.2
+    gated_source_count: int = 3
+    # Request deadlines: default budget (seconds) when the client sends none, and
+    # the remaining budget below which retrieval shrinks and reranking is skipped
+    default_request_timeout: Optional[float] = None
+    deadline_full_retrieval_seconds: float = 10.0
+    deadline_skip_rerank_seconds: float = 5.0
+    generation_tokens_per_second: float = 15.0  # used to size num_predict to the budget
+    max_answer_tokens: int = 500
+    # Extractive answers for definition/factual questions with a strong top match;
+    # an automatic one is used only if its best sentence reaches the score
+    enable_extractive_answers: bool = True
+    extractive_min_retrieval_similarity: float = 0.75
+    extractive_min_sentence_score: float = 0.5
+    # Load shedding: generation queue depths and average queue waits (seconds) at
+    # which tiers 1 (no expansion/rerank), 2 (smaller top_k/context) and 3
+    # (cache or extractive answers only) start
+    enable_load_shedding: bool = True
+    load_shed_queue_depths: Tuple[int, int, int] = (8, 16, 24)
+    load_shed_queue_waits: Tuple[float, float, float] = (5.0, 10.0, 20.0)
+    load_shed_recovery_seconds: float = 10.0
+    load_shed_top_k: int = 2
+    load_shed_context_ratio: float = 0.5
+    # Model routing by answer type when the request names no model: definition and
+    # factual questions use the small model, comparison and analytical ones the
+    # large model (add them to preload_models). Routes apply only once a small or
+    # large model or model_routes is configured; model_routes overrides
+    # model/num_predict/read_timeout per answer type.
+    enable_model_routing: bool = True
+    small_model_name: Optional[str] = None
+    large_model_name: Optional[str] = None
+    model_routes: Dict[str, Dict] = field(default_factory=dict)
+    # Per-stage spans are always kept in result metadata; export is optional
+    enable_opentelemetry: bool = False
+    # Worker threads for blocking steps of ask_question_async (embedding, Chroma, rerank)
+    async_executor_workers: int = 8
+    # Batch answering: questions retrieved per vector store call, and
+    # generations kept in flight (capped at generation_max_queue)
+    batch_retrieval_size: int = 32
+    batch_generation_concurrency: int = 4
 
 
 @dataclass
@@ -44,6 +172,43 @@ class QAEngineResult:
     formatted_response: FormattedResponse
 
 
+@dataclass(frozen=True)
+class RequestOptions:
+    """Per-request options; hashable so they can be part of a coalescing key."""
+    model_name: Optional[str] = None  # None: routed by answer type
+    rerank: Optional[bool] = None
+    compress_context: Optional[bool] = None
+    force_generation: bool = False
+    extractive: Optional[bool] = None  # None: decided per question; True/False: forced
+    # Scheduling-only fields do not change the answer and are left out of keys
+    priority: Priority = field(default=Priority.INTERACTIVE, compare=False)
+    deadline: Optional[Deadline] = field(default=None, compare=False)
+    tier: LoadTier = field(default=LoadTier.NORMAL, compare=False)
+    
+    def key_fields(self) -> Dict:
+        """Fields that affect the answer, for cache keys."""
+        return {f.name: getattr(self, f.name) for f in fields(self) if f.compare}
+
+
+@dataclass
+class PreparedRequest:
+    """Retrieval and context state shared by the blocking and streaming paths."""
+    query: str
+    start_time: float
+    retrieval_results: List[RetrievalResult]
+    context: str
+    model_name: Optional[str] = None
+    num_ctx: Optional[int] = None
+    metadata: Dict = field(default_factory=dict)
+    # Result produced without generation (confidence gate or semantic cache hit)
+    early_result: Optional[QAEngineResult] = None
+    query_embedding: Optional[np.ndarray] = None
+    chunk_key: Optional[FrozenSet] = None
+    trace: Optional[Trace] = None
+    processed_query: Optional[ProcessedQuery] = None
+    route: Optional[ModelRoute] = None
+
+
 class QAEngine:
     """
     Main Question-Answering Engine that orchestrates all components.
@@ -63,10 +228,7 @@ class QAEngine:
         Args:
             config: Configuration for the QA Engine
         """
-        # Always use mistral:7b and localhost endpoint
         self.config = config or QAEngineConfig()
-        self.config.ollama_url = "http://localhost:11434"
-        self.config.model_name = "mistral:7b"
         
         # Set up logging
         if self.config.enable_logging:
@@ -77,69 +239,1329 @@ class QAEngine:
         
         self.logger = logging.getLogger(__name__)
         
+        # Bounded pool for blocking work in the async path
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.config.async_executor_workers,
+            thread_name_prefix="qa-engine"
+        )
+        
         # Initialize components
-        self.query_processor = QueryProcessor()
+        self.query_processor = QueryProcessor(
+            synonym_engine=SynonymEngine.from_config(self.config.synonyms_path),
+            max_variations=self.config.max_query_variations
+        )
         self.retrieval_engine = RetrievalEngine(
             vector_store_path=self.config.vector_store_path,
-            collection_name=self.config.collection_name
+            collection_name=self.config.collection_name,
+            embedding_backend=self.config.embedding_backend,
+            embedding_dimension=self.config.embedding_dimension
         )
+        self.retrieval_engine.variation_similarity_threshold = self.config.variation_similarity_threshold
         self.context_builder = ContextBuilder(
-            max_context_length=self.config.max_context_length
+            max_context_length=self.config.max_context_length,
+            mmr_lambda=self.config.mmr_lambda,
+            compressor=ContextCompressor(
+                self.retrieval_engine.embedding_service,
+                target_ratio=self.config.compression_target_ratio,
+                prompt_tokens_per_second=self.config.prompt_tokens_per_second
+            )
+        )
+        # One long-lived generator (and pooled Ollama client) per engine
+        client_config = OllamaClientConfig(
+            base_url=self.config.ollama_url,
+            connect_timeout=self.config.ollama_connect_timeout,
+            read_timeout=self.config.ollama_read_timeout,
+            pool_connections=self.config.ollama_pool_connections,
+            pool_maxsize=self.config.ollama_pool_maxsize
+        )
+        ollama_urls = self.config.ollama_urls or [self.config.ollama_url]
+        if len(ollama_urls) > 1:
+            ollama_client = OllamaPool(
+                ollama_urls, client_config,
+                max_failures=self.config.ollama_max_failures,
+                eject_seconds=self.config.ollama_eject_seconds,
+                hedge_percentile=self.config.ollama_hedge_percentile,
+                hedge_min_samples=self.config.ollama_hedge_min_samples,
+                endpoint_concurrency=self.config.generation_max_concurrency
+            )
+        else:
+            ollama_client = OllamaClient(client_config)
+        self.ollama_pool = ollama_client if isinstance(ollama_client, OllamaPool) else None
+        self.model_manager = ModelManager(
+            ollama_client,
+            preload_models=self.config.preload_models,
+            keep_alive=self.config.model_keep_alive,
+            default_keep_alive=self.config.default_keep_alive,
+            cold_model_policy=self.config.cold_model_policy,
+            preload_timeout=self.config.model_preload_timeout
         )
         self.answer_generator = AnswerGenerator(
             ollama_url=self.config.ollama_url,
-            model_name=self.config.model_name
+            model_name=self.config.model_name,
+            client=ollama_client,
+            client_config=client_config,
+            keep_alive_resolver=self.model_manager.keep_alive_for,
+            query_processor=self.query_processor,
+            embedding_service=self.retrieval_engine.embedding_service,
+            executor=self.executor
         )
+        self.answer_generator.extractive_min_retrieval_similarity = self.config.extractive_min_retrieval_similarity
+        self.answer_generator.extractive_min_sentence_score = self.config.extractive_min_sentence_score
+        self.answer_generator.max_answer_tokens = self.config.max_answer_tokens
         self.response_formatter = ResponseFormatter()
+        self.tracer = Tracer(enable_opentelemetry=self.config.enable_opentelemetry,
+                             on_finish=observe_trace)
+        self.deadline_policy = DeadlinePolicy(
+            full_retrieval_seconds=self.config.deadline_full_retrieval_seconds,
+            skip_rerank_seconds=self.config.deadline_skip_rerank_seconds,
+            generation_tokens_per_second=self.config.generation_tokens_per_second,
+            prompt_tokens_per_second=self.config.prompt_tokens_per_second,
+            max_answer_tokens=self.config.max_answer_tokens
+        )
+        self.scheduler = GenerationScheduler(
+            name=",".join(ollama_urls),
+            max_concurrency=self.config.generation_max_concurrency,
+            max_queue=self.config.generation_max_queue,
+            queue_timeouts=self.config.generation_queue_timeouts,
+            backends=self.ollama_pool.healthy_count if self.ollama_pool is not None else None
+        )
+        self.load_shedder = LoadShedder(
+            self._load_signals,
+            queue_depths=self.config.load_shed_queue_depths,
+            queue_waits=self.config.load_shed_queue_waits,
+            recovery_seconds=self.config.load_shed_recovery_seconds,
+            enabled=self.config.enable_load_shedding
+        )
+        self.model_router = ModelRouter(
+            self.config.model_name,
+            routes=self.config.model_routes,
+            small_model=self.config.small_model_name,
+            large_model=self.config.large_model_name,
+            enabled=self.config.enable_model_routing
+        )
+        self.reranker = None
+        if self.config.enable_reranking:
+            self.reranker = Reranker(
+                model_name=self.config.reranker_model,
+                top_n=self.config.rerank_top_n,
+                time_budget_ms=self.config.rerank_time_budget_ms,
+                max_workers=self.config.rerank_max_workers
+            )
         
+        # Request counters, reported by get_request_stats()
+        self._stats = Counter()
+        self._stats_lock = threading.Lock()
+        self._corpus_version = 0
+        self.singleflight = SingleFlight()
+        self.answer_cache = None
+        if self.config.enable_answer_cache:
+            self.answer_cache = AnswerCache(
+                db_path=self.config.answer_cache_path,
+                ttl_seconds=self.config.answer_cache_ttl_seconds,
+                max_entries=self.config.answer_cache_max_entries
+            )
+        self.semantic_cache = None
+        if self.config.enable_semantic_cache:
+            self.semantic_cache = SemanticCache(
+                similarity_threshold=self.config.semantic_cache_threshold,
+                max_entries=self.config.semantic_cache_max_entries,
+                ttl_seconds=self.config.semantic_cache_ttl_seconds
+            )
+        self._prompt_fingerprint = self.answer_generator.prompt_fingerprint()
         self.logger.info("QA Engine initialized successfully")
     
-    def ask_question(self, query: str, model_name: str = None) -> QAEngineResult:
+    def ask_question(self, query: str, model_name: str = None,
+                     rerank: bool = None,
+                     compress_context: bool = None,
+                     force_generation: bool = False,
+                     priority: Priority = Priority.INTERACTIVE,
+                     timeout: float = None,
+                     extractive: bool = None) -> QAEngineResult:
         """
         Ask a question and get a comprehensive answer.
+        
+        Identical questions in flight at the same time (same normalized
+        query, model, options and corpus version) are computed once.
+        
+        Args:
+            query: User's question
+            model_name: Name of the Ollama model to use (optional; routed by answer type when omitted)
+            rerank: Enable or disable the rerank stage for this request (optional)
+            compress_context: Enable or disable context compression for this request (optional)
+            force_generation: Call the LLM even when retrieval confidence is low
+            priority: Scheduling priority for generation
+            timeout: Time budget in seconds (optional; defaults to
+                ``default_request_timeout``)
+            extractive: Force (True) or disable (False) an extractive answer
+                without the LLM; None decides from intent and retrieval strength
+        Returns:
+            Complete QA engine result
+        """
+        start_time = time.time()
+        self._record_stat('requests_total')
+        options = RequestOptions(
+            model_name=model_name,
+            rerank=rerank,
+            compress_context=compress_context,
+            force_generation=force_generation,
+            extractive=extractive,
+            priority=priority,
+            deadline=self._start_deadline(timeout),
+            tier=self.load_shedder.select()
+        )
+        try:
+            cached = self._lookup_cached_answer(query, options, start_time)
+            if cached is not None:
+                return cached
+            if not self.config.enable_request_coalescing:
+                return self._answer_question(query, start_time, options)
+            result, shared = self._coalesce(
+                query, options, lambda: self._answer_question(query, start_time, options)
+            )
+            if not shared:
+                return result
+            self._record_stat('coalesced_requests')
+            return replace(result, metadata=dict(result.metadata, coalesced=True))
+        except Exception as e:
+            self.logger.error(f"Error in ask_question: {e}")
+            raise
+    
+    def ask_question_stream(self, query: str, model_name: str = None,
+                            rerank: bool = None,
+                            compress_context: bool = None,
+                            force_generation: bool = False,
+                            priority: Priority = Priority.INTERACTIVE,
+                            timeout: float = None,
+                            extractive: bool = None) -> Iterator[Dict]:
+        """
+        Ask a question and stream the answer as it is generated.
+        
+        Yields ``{'event': 'token', 'data': {'token': ...}}`` events while
+        Ollama generates, then one ``{'event': 'done', 'data': ...}`` event
+        with the final answer, sources and timing. Concurrent identical
+        streams share one generation and each receive every event.
+        
+        The answer cache, generation admission and the routed model's
+        admission are checked when this is called, before any event is
+        produced, so a rejected request raises here and an HTTP layer can
+        still answer with an error status.
+        
+        Args:
+            query: User's question
+            model_name: Name of the Ollama model to use (optional; routed by answer type when omitted)
+            rerank: Enable or disable the rerank stage for this request (optional)
+            compress_context: Enable or disable context compression for this request (optional)
+            force_generation: Call the LLM even when retrieval confidence is low
+            priority: Scheduling priority for generation
+            timeout: Time budget in seconds (optional; defaults to
+                ``default_request_timeout``)
+            extractive: Force (True) or disable (False) an extractive answer
+                without the LLM; None decides from intent and retrieval strength
+            
+        Returns:
+            Iterator of stream events
+            
+        Raises:
+            SchedulerRejectedError: Generation would not be admitted now
+            ModelNotAvailableError: The model the question routes to is refused
+        """
+        start_time = time.time()
+        self._record_stat('requests_total')
+        self._record_stat('stream_requests')
+        options = RequestOptions(
+            model_name=model_name,
+            rerank=rerank,
+            compress_context=compress_context,
+            force_generation=force_generation,
+            extractive=extractive,
+            priority=priority,
+            deadline=self._start_deadline(timeout),
+            tier=self.load_shedder.select()
+        )
+        cached = self._lookup_cached_answer(query, options, start_time)
+        if cached is not None:
+            return iter([
+                {'event': 'token', 'data': {'token': cached.answer}},
+                {'event': 'done', 'data': self._result_payload(cached)}
+            ])
+        if options.tier < LoadTier.CACHE_ONLY:
+            # Cache-only requests are answered without generation
+            self.scheduler.check_admission(options.priority, self._expires_at(options))
+            self._check_model_admission(query, options)
+        if not self.config.enable_request_coalescing:
+            return self._stream_question(query, start_time, options)
+        return self._coalesced_stream(query, start_time, options)
+    
+    def _coalesced_stream(self, query: str, start_time: float,
+                          options: 'RequestOptions') -> Iterator[Dict]:
+        """
+        Stream events for a question, sharing one generation between identical streams.
+        
+        Args:
+            query: User's question
+            start_time: Request start time
+            options: Per-request options
+            
+        Yields:
+            Stream events
+        """
+        coalesced_counted = False
+        for event, shared in self.singleflight.do_stream(
+            self._coalescing_key(query, options),
+            lambda: self._stream_question(query, start_time, options)
+        ):
+            if shared and not coalesced_counted:
+                self._record_stat('coalesced_requests')
+                coalesced_counted = True
+            if shared and event['event'] == 'done':
+                data = dict(event['data'])
+                data['metadata'] = dict(data.get('metadata') or {}, coalesced=True)
+                event = {'event': 'done', 'data': data}
+            yield event
+    
+    async def ask_question_async(self, query: str, model_name: str = None,
+                                 rerank: bool = None,
+                                 compress_context: bool = None,
+                                 force_generation: bool = False,
+                                 priority: Priority = Priority.INTERACTIVE,
+                                 timeout: float = None,
+                                 extractive: bool = None) -> QAEngineResult:
+        """
+        Async variant of ask_question.
+        
+        Blocking steps (query processing, embedding and Chroma calls,
+        reranking, SQLite cache) run on a bounded executor and generation
+        awaits the async Ollama client. The answer cache is checked before
+        retrieval starts, so a hit does no embedding or Chroma work. A
+        request waiting on generation holds no thread.
+        
         Args:
             query: User's question
-            model_name: Name of the Ollama model to use (optional)
+            model_name: Name of the Ollama model to use (optional; routed by answer type when omitted)
+            rerank: Enable or disable the rerank stage for this request (optional)
+            compress_context: Enable or disable context compression for this request (optional)
+            force_generation: Call the LLM even when retrieval confidence is low
+            priority: Scheduling priority for generation
+            timeout: Time budget in seconds (optional; defaults to
+                ``default_request_timeout``)
+            extractive: Force (True) or disable (False) an extractive answer
+                without the LLM; None decides from intent and retrieval strength
         Returns:
             Complete QA engine result
         """
         start_time = time.time()
+        self._record_stat('requests_total')
+        options = RequestOptions(
+            model_name=model_name,
+            rerank=rerank,
+            compress_context=compress_context,
+            force_generation=force_generation,
+            extractive=extractive,
+            priority=priority,
+            deadline=self._start_deadline(timeout),
+            tier=self.load_shedder.select()
+        )
+        try:
+            if not self.config.enable_request_coalescing:
+                return await self._answer_question_async(query, start_time, options)
+            result, shared = await self._coalesce_async(
+                query, options, lambda: self._answer_question_async(query, start_time, options)
+            )
+            if not shared:
+                return result
+            self._record_stat('coalesced_requests')
+            return replace(result, metadata=dict(result.metadata, coalesced=True))
+        except Exception as e:
+            self.logger.error(f"Error in ask_question_async: {e}")
+            raise
+    
+    async def _answer_question_async(self, query: str, start_time: float,
+                                     options: 'RequestOptions') -> QAEngineResult:
+        """
+        Run the full pipeline for one question without holding a thread.
+        
+        Args:
+            query: User's question
+            start_time: Request start time
+            options: Per-request options
+            
+        Returns:
+            Complete QA engine result
+        """
+        corpus_version = self.corpus_version
+        trace = self.tracer.start_trace('qa.ask_question')
+        # The SQLite lookup is fast; checking it first means a hit starts no
+        # embedding or Chroma work that could not be stopped
+        cached = await self._run_blocking(self._lookup_cached_answer, query, options, start_time)
+        if cached is not None:
+            return cached
+        processed_query, retrieval_results = await self._retrieve_async(query, options, trace)
+        
+        prepared = await self._run_blocking(
+            self._prepare_from_retrieval,
+            query, start_time, options, trace, processed_query, retrieval_results
+        )
+        if prepared.early_result is not None:
+            await self._run_blocking(
+                self._store_cached_answer, query, options, prepared.early_result, corpus_version
+            )
+            return prepared.early_result
+        
+        async with self.scheduler.slot_async(options.priority, self._expires_at(options)) as queue_wait, \
+                self.model_manager.admit_async(prepared.model_name):
+            trace.record('queue_wait', queue_wait)
+            limits = self._generation_limits(prepared, options)
+            with trace.span('generation', model=prepared.model_name, **limits):
+                generated_answer = await self.answer_generator.generate_answer_async(
+                    query, prepared.context,
+                    model_name=prepared.model_name, num_ctx=prepared.num_ctx,
+                    processed_query=prepared.processed_query, **limits
+                )
+        prepared.metadata['queue_wait'] = queue_wait
+        self._record_generation_stats(prepared, generated_answer)
+        result = self._build_result(prepared, generated_answer)
+        await self._run_blocking(self._store_cached_answer, query, options, result, corpus_version)
+        self._store_semantic_answer(prepared, options, result, corpus_version)
+        return result
+    
+    async def _retrieve_async(self, query: str, options: 'RequestOptions',
+                              trace: Trace) -> Tuple[ProcessedQuery, List[RetrievalResult]]:
+        """
+        Process the query and retrieve candidates on the executor.
+        
+        Args:
+            query: User's question
+            options: Per-request options
+            trace: Request trace
+            
+        Returns:
+            Tuple of (processed query, retrieval results)
+        """
+        with trace.span('query_processing') as span:
+            processed_query = await self._run_blocking(self.query_processor.process_query, query)
+            span.set('keywords', len(processed_query.keywords))
+            span.set('variations', len(processed_query.query_variations))
+        queries, top_k = self._retrieval_limits(processed_query, options)
+        with trace.span('retrieval', top_k=top_k) as span:
+            retrieval_results = await self.retrieval_engine.search_multiple_queries_async(
+                queries, top_k=top_k, executor=self.executor,
+                sources=processed_query.variation_sources[:len(queries)]
+            )
+            span.set('candidates', len(retrieval_results))
+        self.logger.info(f"Retrieved {len(retrieval_results)} relevant documents")
+        return processed_query, retrieval_results
+    
+    async def _run_blocking(self, fn, *args, **kwargs):
+        """Run a blocking call on the engine's bounded executor."""
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, partial(fn, *args, **kwargs)
+        )
+    
+    def _answer_question(self, query: str, start_time: float,
+                         options: 'RequestOptions') -> QAEngineResult:
+        """
+        Run the full pipeline for one question.
+        
+        Args:
+            query: User's question
+            start_time: Request start time
+            options: Per-request options
+            
+        Returns:
+            Complete QA engine result
+        """
+        corpus_version = self.corpus_version
+        prepared = self._prepare_request(query, start_time, options)
+        if prepared.early_result is not None:
+            self._store_cached_answer(query, options, prepared.early_result, corpus_version)
+            return prepared.early_result
+        return self._generate_result(prepared, options, corpus_version)
+    
+    def _generate_result(self, prepared: PreparedRequest, options: 'RequestOptions',
+                         corpus_version: int) -> QAEngineResult:
+        """
+        Generate the answer for a prepared request and cache the result.
+        
+        Args:
+            prepared: Prepared request without an early result
+            options: Per-request options
+            corpus_version: Corpus version the request was retrieved against
+            
+        Returns:
+            Complete QA engine result
+        """
+        trace = prepared.trace
+        with self.scheduler.slot(options.priority, self._expires_at(options)) as queue_wait, \
+                self.model_manager.admit(prepared.model_name):
+            trace.record('queue_wait', queue_wait)
+            limits = self._generation_limits(prepared, options)
+            with trace.span('generation', model=prepared.model_name, **limits):
+                generated_answer = self.answer_generator.generate_answer(
+                    prepared.query, prepared.context,
+                    model_name=prepared.model_name, num_ctx=prepared.num_ctx,
+                    processed_query=prepared.processed_query, **limits
+                )
+        prepared.metadata['queue_wait'] = queue_wait
+        self._record_generation_stats(prepared, generated_answer)
+        result = self._build_result(prepared, generated_answer)
+        self._store_cached_answer(prepared.query, options, result, corpus_version)
+        self._store_semantic_answer(prepared, options, result, corpus_version)
+        return result
+    
+    def _stream_question(self, query: str, start_time: float,
+                         options: 'RequestOptions') -> Iterator[Dict]:
+        """
+        Run the pipeline for one question, streaming generation events.
+        
+        Args:
+            query: User's question
+            start_time: Request start time
+            options: Per-request options
+            
+        Yields:
+            Stream events
+        """
+        try:
+            corpus_version = self.corpus_version
+            prepared = self._prepare_request(query, start_time, options)
+            if prepared.early_result is not None:
+                self._store_cached_answer(query, options, prepared.early_result, corpus_version)
+                yield {'event': 'done', 'data': self._result_payload(prepared.early_result)}
+                return
+            
+            trace = prepared.trace
+            with self.scheduler.slot(options.priority, self._expires_at(options)) as queue_wait, \
+                    self.model_manager.admit(prepared.model_name):
+                trace.record('queue_wait', queue_wait)
+                limits = self._generation_limits(prepared, options)
+                stream = self.answer_generator.stream_answer(
+                    query, prepared.context,
+                    model_name=prepared.model_name, num_ctx=prepared.num_ctx,
+                    processed_query=prepared.processed_query, **limits
+                )
+                with trace.span('generation', model=prepared.model_name, stream=True, **limits) as span:
+                    for token in stream:
+                        yield {'event': 'token', 'data': {'token': token}}
+                    span.set('time_to_first_token_ms', (stream.time_to_first_token or 0.0) * 1000.0)
+            prepared.metadata['queue_wait'] = queue_wait
+            if stream.finish_reason == 'deadline':
+                # Cut short: flag the answer and keep it out of the caches
+                options.deadline.degrade('generation')
+                prepared.metadata['deadline'] = dict(
+                    prepared.metadata.get('deadline') or {},
+                    degraded=list(options.deadline.degraded), truncated=True
+                )
+            self._record_generation_stats(prepared, stream.answer)
+            
+            result = self._build_result(prepared, stream.answer)
+            result.metadata['timing'] = {
+                'time_to_first_token': stream.time_to_first_token,
+                'generation_time': stream.generation_time,
+                'total_time': result.processing_time,
+                'finish_reason': stream.finish_reason
+            }
+            self._store_cached_answer(query, options, result, corpus_version)
+            self._store_semantic_answer(prepared, options, result, corpus_version)
+            yield {'event': 'done', 'data': self._result_payload(result)}
+        except Exception as e:
+            self.logger.error(f"Error in ask_question_stream: {e}")
+            # The response status is already sent; carry the one it would have had
+            if isinstance(e, RequestTimeoutError):
+                status = 504
+            elif isinstance(e, SchedulerRejectedError):
+                status = 429 if isinstance(e, QueueFullError) else 503
+            elif isinstance(e, ModelNotAvailableError):
+                status = 503
+            else:
+                status = 500
+            yield {'event': 'error', 'data': {'message': str(e), 'status': status}}
+    
+    def _check_model_admission(self, query: str, options: 'RequestOptions'):
+        """
+        Raise now if the model this question routes to would be refused.
+        
+        Only the 'refuse' policy rejects, so the query is processed here to
+        find its answer type only when that policy is active and the model is
+        routed by answer type.
+        
+        Args:
+            query: User's question
+            options: Per-request options
+        """
+        if self.model_manager.cold_model_policy != 'refuse':
+            return
+        answer_type = 'general'
+        if not options.model_name and self.model_router.routes_by_answer_type:
+            answer_type = self.answer_generator.determine_answer_type(
+                self.query_processor.process_query(query)
+            )
+        route = self.model_router.resolve(answer_type, options.model_name)
+        self.model_manager.check_admission(route.model_name)
+    
+    def _start_deadline(self, timeout: Optional[float]) -> Optional[Deadline]:
+        """Deadline for a new request, or None when it has no time budget."""
+        if timeout is None:
+            timeout = self.config.default_request_timeout
+        return Deadline(timeout) if timeout is not None else None
+    
+    @staticmethod
+    def _expires_at(options: 'RequestOptions') -> Optional[float]:
+        """Absolute deadline for the generation scheduler."""
+        return options.deadline.expires_at if options.deadline is not None else None
+    
+    @staticmethod
+    def _is_degraded(options: 'RequestOptions') -> bool:
+        """Whether the request ran with reduced settings; such results are not cached."""
+        if options.tier > LoadTier.NORMAL:
+            return True
+        return options.deadline is not None and bool(options.deadline.degraded)
+    
+    def _load_signals(self) -> Dict[str, float]:
+        """Live load signals for the load shedder."""
+        stats = self.scheduler.get_stats()
+        # The average wait only updates when requests queue, so ignore it once the queue drains
+        return {
+            'queue_depth': stats['queue_depth'],
+            'queue_wait': stats['avg_wait_time'] if stats['queue_depth'] else 0.0
+        }
+    
+    def _retrieval_limits(self, processed_query: ProcessedQuery,
+                          options: 'RequestOptions') -> Tuple[List[str], int]:
+        """
+        Query variations and results per query that fit the remaining budget.
+        
+        Args:
+            processed_query: Processed query
+            options: Per-request options
+            
+        Returns:
+            Tuple of (queries to search, top_k)
+        """
+        queries = list(processed_query.query_variations)
+        top_k = self.retrieval_engine.default_top_k
+        if options.tier >= LoadTier.REDUCED:
+            queries = queries[:1]
+        if options.tier >= LoadTier.MINIMAL:
+            top_k = min(top_k, self.config.load_shed_top_k)
+        if options.deadline is None:
+            return queries, top_k
+        options.deadline.check('retrieval')
+        reduced_top_k, variations = self.deadline_policy.retrieval_limits(
+            options.deadline, top_k, len(queries)
+        )
+        if reduced_top_k < top_k or variations < len(queries):
+            options.deadline.degrade('retrieval')
+        return queries[:variations], reduced_top_k
+    
+    def _generation_limits(self, prepared: PreparedRequest, options: 'RequestOptions') -> Dict:
+        """
+        Answer token limit, read timeout and expiry for the route and remaining budget.
+        
+        Called once the generation slot is held, so queue time is accounted
+        for. The deadline can only lower the route's token limit; the
+        generator cuts each attempt short at the deadline. Also records the
+        deadline summary in the result metadata.
+        
+        Args:
+            prepared: Prepared request
+            options: Per-request options
+            
+        Returns:
+            Keyword arguments for the answer generator (empty without a route
+            limit or deadline)
+        """
+        limits = {}
+        route = prepared.route
+        if route is not None and route.num_predict:
+            limits['num_predict'] = route.num_predict
+        if route is not None and route.read_timeout:
+            limits['read_timeout'] = route.read_timeout
+        deadline = options.deadline
+        if deadline is None or deadline.timeout is None:
+            return limits
+        deadline.check('generation')
+        prompt_tokens = prepared.metadata.get('context_tokens', {})
+        prompt_tokens = prompt_tokens.get('used', 0) + prompt_tokens.get('prompt_tokens', 0)
+        answer_tokens = limits.get('num_predict', self.config.max_answer_tokens)
+        num_predict = self.deadline_policy.num_predict(deadline, prompt_tokens, answer_tokens)
+        if num_predict < answer_tokens:
+            deadline.degrade('generation')
+        prepared.metadata['deadline'] = dict(
+            self.deadline_policy.describe(deadline), num_predict=num_predict
+        )
+        return dict(limits, num_predict=num_predict, expires_at=deadline.expires_at)
+    
+    def _coalescing_key(self, query: str, options: 'RequestOptions') -> Tuple:
+        """
+        Build the key under which identical in-flight requests are coalesced.
+        
+        Args:
+            query: User's question
+            options: Per-request options
+            
+        Returns:
+            Hashable key of normalized query, options, load tier, deadline
+            budget class and corpus version
+        """
+        # Deadline and tier change the answer's settings, so only requests
+        # with the same tier and a similar budget share a result
+        budget = options.deadline.budget_bucket() if options.deadline is not None else None
+        return (self.query_processor.normalize_query(query), options, int(options.tier),
+                budget, self.corpus_version)
+    
+    def _coalesce(self, query: str, options: 'RequestOptions',
+                  fn) -> Tuple[QAEngineResult, bool]:
+        """
+        Run ``fn`` through the singleflight group within the request's deadline.
+        
+        A follower stops waiting when its own deadline passes, and runs the
+        request itself when the leader ran out of time.
+        
+        Args:
+            query: User's question
+            options: Per-request options
+            fn: Computation producing the result
+            
+        Returns:
+            Tuple of (result, shared)
+        """
+        deadline = options.deadline
+        try:
+            return self.singleflight.do(
+                self._coalescing_key(query, options), fn,
+                timeout=deadline.remaining() if deadline is not None else None,
+                retry_on=(RequestTimeoutError,)
+            )
+        except FollowerTimeoutError:
+            raise RequestTimeoutError(
+                f"Request deadline of {deadline.timeout:.2f}s exceeded waiting for a coalesced request"
+            ) from None
+    
+    async def _coalesce_async(self, query: str, options: 'RequestOptions',
+                              fn) -> Tuple[QAEngineResult, bool]:
+        """Async variant of ``_coalesce``."""
+        deadline = options.deadline
         try:
-            self.logger.info(f"Processing query: {query}")
+            return await self.singleflight.do_async(
+                self._coalescing_key(query, options), fn,
+                timeout=deadline.remaining() if deadline is not None else None,
+                retry_on=(RequestTimeoutError,)
+            )
+        except FollowerTimeoutError:
+            raise RequestTimeoutError(
+                f"Request deadline of {deadline.timeout:.2f}s exceeded waiting for a coalesced request"
+            ) from None
+    
+    def _answer_cache_key(self, query: str, options: 'RequestOptions') -> str:
+        """Build the persistent cache key for a request."""
+        return AnswerCache.make_key(
+            self.query_processor.normalize_query(query),
+            options.key_fields(),
+            self._prompt_fingerprint
+        )
+    
+    def _lookup_cached_answer(self, query: str, options: 'RequestOptions',
+                              start_time: float) -> Optional[QAEngineResult]:
+        """
+        Look up a cached answer for the current corpus version.
+        
+        Args:
+            query: User's question
+            options: Per-request options
+            start_time: Request start time
+            
+        Returns:
+            Cached result with cache metadata, or None on a miss
+        """
+        if self.answer_cache is None:
+            return None
+        try:
+            entry = self.answer_cache.get(self._answer_cache_key(query, options), self.corpus_version)
+        except Exception as e:
+            self.logger.warning(f"Answer cache lookup failed: {e}")
+            return None
+        if entry is None:
+            return None
+        
+        self._record_stat('answer_cache_hits')
+        payload = entry['payload']
+        processing_time = time.time() - start_time
+        metadata = dict(payload['metadata'])
+        # The stored trace describes the original computation, not this request
+        metadata.pop('trace', None)
+        metadata['cache'] = {
+            'hit': True,
+            'age_seconds': entry['age_seconds'],
+            'hits': entry['hits'],
+            'original_processing_time': payload['processing_time']
+        }
+        metadata['load_shedding'] = LoadShedder.describe(options.tier)
+        formatted = payload.get('formatted_response')
+        return QAEngineResult(
+            query=query,
+            answer=payload['answer'],
+            sources=payload['sources'],
+            processing_time=processing_time,
+            context_used=payload['context_used'],
+            metadata=metadata,
+            formatted_response=FormattedResponse(**dict(formatted, metadata=metadata)) if formatted else None
+        )
+    
+    def _store_cached_answer(self, query: str, options: 'RequestOptions',
+                             result: QAEngineResult, corpus_version: int):
+        """
+        Store a result in the answer cache unless it is a failure.
+        
+        Args:
+            query: User's question
+            options: Per-request options
+            result: Result to store
+            corpus_version: Corpus version the result was computed against
+        """
+        if self.answer_cache is None or self._is_degraded(options):
+            return
+        if result.metadata.get('error') or result.metadata.get('answer_type') in ('fallback', 'partial'):
+            return
+        payload = {
+            'answer': result.answer,
+            'sources': result.sources,
+            'processing_time': result.processing_time,
+            'context_used': result.context_used,
+            'metadata': result.metadata,
+            'formatted_response': asdict(result.formatted_response) if result.formatted_response else None
+        }
+        try:
+            self.answer_cache.put(self._answer_cache_key(query, options), corpus_version, payload)
+        except Exception as e:
+            self.logger.warning(f"Answer cache store failed: {e}")
+    
+    def _semantic_cache_keys(self, normalized_query: str,
+                             retrieval_results: List[RetrievalResult]) -> Tuple[Optional[np.ndarray], FrozenSet]:
+        """
+        Compute the query embedding and retrieved chunk set for the semantic cache.
+        
+        Args:
+            normalized_query: Normalized user query
+            retrieval_results: Retrieved document chunks
+            
+        Returns:
+            Tuple of (unit query embedding or None, chunk identifier set)
+        """
+        top_results = sorted(retrieval_results, key=lambda r: r.similarity_score, reverse=True)
+        chunk_ids = []
+        for r in top_results:
+            chunk_id = (r.file_name, r.chunk_index)
+            if chunk_id not in chunk_ids:
+                chunk_ids.append(chunk_id)
+            if len(chunk_ids) >= self.config.semantic_cache_chunk_match_k:
+                break
+        try:
+            embedding = self.retrieval_engine.embedding_service.encode_normalized([normalized_query])[0]
+        except Exception as e:
+            self.logger.warning(f"Semantic cache embedding failed: {e}")
+            embedding = None
+        return embedding, frozenset(chunk_ids)
+    
+    def _lookup_semantic_answer(self, query: str, query_embedding: Optional[np.ndarray],
+                                chunk_key: FrozenSet, options: 'RequestOptions',
+                                start_time: float) -> Optional[QAEngineResult]:
+        """
+        Look up an answer to a near-duplicate question.
+        
+        Args:
+            query: User's question
+            query_embedding: Unit query embedding (None skips the lookup)
+            chunk_key: Retrieved chunk identifier set
+            options: Per-request options
+            start_time: Request start time
+            
+        Returns:
+            Cached result with semantic cache metadata, or None on a miss
+        """
+        if query_embedding is None:
+            return None
+        hit = self.semantic_cache.lookup(query_embedding, chunk_key, options, self.corpus_version)
+        if hit is None:
+            return None
+        entry, similarity = hit
+        self._record_stat('semantic_cache_hits')
+        cached = entry.value
+        metadata = dict(cached.metadata)
+        metadata['semantic_cache'] = {
+            'hit': True,
+            'similarity': similarity,
+            'cached_query': entry.query,
+            'age_seconds': time.time() - entry.created_at
+        }
+        return replace(
+            cached,
+            query=query,
+            processing_time=time.time() - start_time,
+            metadata=metadata
+        )
+    
+    def _store_semantic_answer(self, prepared: PreparedRequest, options: 'RequestOptions',
+                               result: QAEngineResult, corpus_version: int):
+        """Add a generated result to the semantic cache unless it is a failure."""
+        if self.semantic_cache is None or prepared.query_embedding is None or self._is_degraded(options):
+            return
+        if result.metadata.get('answer_type') in ('fallback', 'partial'):
+            return
+        self.semantic_cache.add(
+            prepared.query,
+            prepared.query_embedding,
+            prepared.chunk_key,
+            options,
+            corpus_version,
+            result
+        )
+    
+    @property
+    def corpus_version(self) -> int:
+        """Counter identifying the current document corpus."""
+        if self.answer_cache is not None:
+            return self.answer_cache.get_corpus_version()
+        return self._corpus_version
+    
+    def bump_corpus_version(self) -> int:
+        """
+        Mark the corpus as changed; call after every ingest or delete.
+        
+        Invalidates cached answers computed against older versions.
+        
+        Returns:
+            New corpus version
+        """
+        if self.answer_cache is not None:
+            version = self.answer_cache.bump_corpus_version()
+        else:
+            with self._stats_lock:
+                self._corpus_version += 1
+                version = self._corpus_version
+        if self.semantic_cache is not None:
+            self.semantic_cache.invalidate_before(version)
+        return version
+    
+    def _prepare_request(self, query: str, start_time: float,
+                         options: 'RequestOptions') -> PreparedRequest:
+        """
+        Run query processing, retrieval and context building.
+        
+        Args:
+            query: User's question
+            start_time: Request start time
+            options: Per-request options
+            
+        Returns:
+            Prepared request; ``early_result`` is set when generation is skipped
+        """
+        trace = self.tracer.start_trace('qa.ask_question')
+        self.logger.info(f"Processing query: {query}")
+        with trace.span('query_processing') as span:
             processed_query = self.query_processor.process_query(query)
-            self.logger.info(f"Query processed - Keywords: {processed_query['keywords']}")
+            span.set('keywords', len(processed_query.keywords))
+            span.set('variations', len(processed_query.query_variations))
+        self.logger.info(f"Query processed - Keywords: {list(processed_query.keywords)}")
+        queries, top_k = self._retrieval_limits(processed_query, options)
+        with trace.span('retrieval', top_k=top_k) as span:
             retrieval_results = self.retrieval_engine.search_multiple_queries(
-                processed_query['query_variations']
+                queries, top_k, sources=processed_query.variation_sources[:len(queries)]
+            )
+            span.set('candidates', len(retrieval_results))
+        self.logger.info(f"Retrieved {len(retrieval_results)} relevant documents")
+        return self._prepare_from_retrieval(
+            query, start_time, options, trace, processed_query, retrieval_results
+        )
+    
+    def _prepare_from_retrieval(self, query: str, start_time: float, options: 'RequestOptions',
+                                trace: Trace, processed_query: ProcessedQuery,
+                                retrieval_results: List[RetrievalResult]) -> PreparedRequest:
+        """
+        Run the stages after retrieval: confidence gate, semantic cache,
+        rerank and context building.
+        
+        Args:
+            query: User's question
+            start_time: Request start time
+            options: Per-request options
+            trace: Request trace
+            processed_query: Output of the query processor
+            retrieval_results: Retrieved document chunks
+            
+        Returns:
+            Prepared request; ``early_result`` is set when generation is skipped
+        """
+        if not options.force_generation and self._is_low_confidence(retrieval_results):
+            gated_result = self._create_gated_result(query, retrieval_results, start_time)
+            gated_result.metadata['load_shedding'] = LoadShedder.describe(options.tier)
+            gated_result.metadata['trace'] = trace.finish()
+            return PreparedRequest(
+                query=query,
+                start_time=start_time,
+                retrieval_results=retrieval_results,
+                context="",
+                early_result=gated_result,
+                trace=trace
+            )
+        
+        query_embedding = None
+        chunk_key = None
+        if self.semantic_cache is not None:
+            with trace.span('semantic_cache') as span:
+                query_embedding, chunk_key = self._semantic_cache_keys(
+                    processed_query.normalized_query, retrieval_results
+                )
+                cached = self._lookup_semantic_answer(
+                    query, query_embedding, chunk_key, options, start_time
+                )
+                span.set('hit', cached is not None)
+            if cached is not None:
+                cached.metadata['load_shedding'] = LoadShedder.describe(options.tier)
+                cached.metadata['trace'] = trace.finish()
+                return PreparedRequest(
+                    query=query,
+                    start_time=start_time,
+                    retrieval_results=retrieval_results,
+                    context=cached.context_used,
+                    early_result=cached,
+                    trace=trace
+                )
+        
+        stage_metadata = {'load_shedding': LoadShedder.describe(options.tier)}
+        if options.deadline is not None:
+            options.deadline.check('rerank and context building')
+        rerank_requested = self.reranker is not None and (options.rerank is None or options.rerank)
+        skip_reason = None
+        if rerank_requested and options.tier >= LoadTier.REDUCED:
+            skip_reason = 'load_shedding'
+        elif rerank_requested and self.deadline_policy.skip_rerank(options.deadline):
+            options.deadline.degrade('rerank')
+            skip_reason = 'deadline'
+        if skip_reason is not None:
+            stage_metadata['rerank'] = {
+                'applied': False,
+                'latency_ms': 0.0,
+                'candidates_scored': 0,
+                'fallback_reason': skip_reason
+            }
+        elif rerank_requested:
+            with trace.span('rerank') as span:
+                rerank_result = self.reranker.rerank(query, retrieval_results)
+                span.set('candidates_scored', rerank_result.candidates_scored)
+                span.set('applied', rerank_result.applied)
+            retrieval_results = rerank_result.results
+            stage_metadata['rerank'] = {
+                'applied': rerank_result.applied,
+                'latency_ms': rerank_result.latency_ms,
+                'candidates_scored': rerank_result.candidates_scored,
+                'fallback_reason': rerank_result.fallback_reason
+            }
+        trigger = self._extractive_trigger(options, processed_query, retrieval_results)
+        if trigger is not None:
+            prepared = self._prepare_extractive(
+                query, start_time, options, trace, processed_query, retrieval_results,
+                query_embedding, stage_metadata, trigger
             )
-            self.logger.info(f"Retrieved {len(retrieval_results)} relevant documents")
-            # Limit to top 2 chunks for context
+            if prepared is not None:
+                return prepared
+        
+        # MMR picks the chunks itself; otherwise limit to top 2 chunks for context
+        if self.context_builder.can_diversify(retrieval_results):
+            limited_results = retrieval_results
+        else:
             limited_results = retrieval_results[:2]
-            context = self.context_builder.build_context(query, limited_results)
-            # Truncate context to 2000 characters
-            context = context[:2000]
-            self.logger.info(f"Context sent to model: {context}")
-            answer_generator = AnswerGenerator(
-                ollama_url=self.config.ollama_url,
-                model_name=model_name or self.config.model_name
+        route = self.model_router.route(
+            self.answer_generator.determine_answer_type(processed_query), options.model_name
+        )
+        stage_metadata['routing'] = ModelRouter.describe(route)
+        active_model = route.model_name
+        token_budget = resolve_token_budget(
+            active_model,
+            self.config.model_context_windows,
+            self.config.default_context_window,
+            self.config.answer_token_reserve
+        )
+        prompt_tokens = self.answer_generator.estimate_prompt_tokens(query)
+        compress_context = options.compress_context
+        if compress_context is None:
+            compress_context = self.config.enable_context_compression
+        context_budget = token_budget.available_for_context(prompt_tokens)
+        if options.tier >= LoadTier.MINIMAL:
+            context_budget = int(context_budget * self.config.load_shed_context_ratio)
+        with trace.span('context_building') as span:
+            built_context = self.context_builder.build_context_with_stats(
+                query, limited_results,
+                token_budget=context_budget,
+                compress=compress_context
             )
-            generated_answer = answer_generator.generate_answer(query, context)
-            processing_time = time.time() - start_time
-            formatted_response = self.response_formatter.format_response(
-                generated_answer, query, processing_time
+            span.set('chunks', len(limited_results))
+            span.set('sections_included', built_context.sections_included)
+            span.set('context_tokens', built_context.tokens_used)
+        context = built_context.text
+        self.logger.info(f"Context sent to model ({built_context.tokens_used} tokens): {context}")
+        stage_metadata['context_tokens'] = {
+            'used': built_context.tokens_used,
+            'budget': built_context.token_budget,
+            'prompt_tokens': prompt_tokens,
+            'context_window': token_budget.context_window,
+            'sections_dropped': built_context.sections_dropped
+        }
+        if built_context.compression is not None:
+            stage_metadata['compression'] = built_context.compression
+        
+        return PreparedRequest(
+            query=query,
+            start_time=start_time,
+            retrieval_results=retrieval_results,
+            context=context,
+            model_name=active_model,
+            num_ctx=token_budget.context_window,
+            metadata=stage_metadata,
+            query_embedding=query_embedding,
+            chunk_key=chunk_key,
+            trace=trace,
+            processed_query=processed_query,
+            route=route
+        )
+    
+    def _extractive_trigger(self, options: 'RequestOptions', processed_query: ProcessedQuery,
+                            retrieval_results: List[RetrievalResult]) -> Optional[str]:
+        """
+        Why a request should get an extractive answer, or None to generate.
+        
+        Args:
+            options: Per-request options
+            processed_query: Processed query
+            retrieval_results: Retrieved chunks
+            
+        Returns:
+            'load_shedding', 'requested', 'intent' or None
+        """
+        if options.tier >= LoadTier.CACHE_ONLY:
+            return 'load_shedding'
+        if options.extractive is not None:
+            return 'requested' if options.extractive else None
+        if self.config.enable_extractive_answers and \
+                self.answer_generator.should_answer_extractively(processed_query, retrieval_results):
+            return 'intent'
+        return None
+    
+    def _prepare_extractive(self, query: str, start_time: float, options: 'RequestOptions',
+                            trace: Trace, processed_query: ProcessedQuery,
+                            retrieval_results: List[RetrievalResult],
+                            query_embedding: Optional[np.ndarray], stage_metadata: Dict,
+                            trigger: str) -> Optional[PreparedRequest]:
+        """
+        Answer from the best retrieved sentences without the LLM.
+        
+        Args:
+            query: User's question
+            start_time: Request start time
+            options: Per-request options
+            trace: Request trace
+            processed_query: Processed query
+            retrieval_results: Retrieved chunks
+            query_embedding: Normalized query embedding, if already computed
+            stage_metadata: Metadata collected so far
+            trigger: Why the extractive path was chosen
+            
+        Returns:
+            Prepared request with ``early_result`` set, or None when an
+            automatic extractive answer is not good enough
+        """
+        # Best chunk first (unless reranked), each chunk once; variations return overlapping hits
+        if not stage_metadata.get('rerank', {}).get('applied'):
+            retrieval_results = sorted(retrieval_results, key=lambda r: r.similarity_score, reverse=True)
+        ranked = []
+        seen = set()
+        for result in retrieval_results:
+            key = (result.source_path or result.file_name, result.chunk_index)
+            if key not in seen:
+                seen.add(key)
+                ranked.append(result)
+        with trace.span('extractive_answer', trigger=trigger) as span:
+            extractive_answer = self.answer_generator.generate_extractive_answer(
+                query, ranked, processed_query=processed_query, query_embedding=query_embedding
             )
-            result = QAEngineResult(
-                query=query,
-                answer=generated_answer.answer,
-                sources=generated_answer.sources_used,
-                processing_time=processing_time,
-                context_used=context,
-                metadata=formatted_response.metadata,
-                formatted_response=formatted_response
+            span.set('score', extractive_answer.confidence)
+            span.set('sentences', len(extractive_answer.source_spans or []))
+        if trigger == 'intent' and extractive_answer.confidence < self.config.extractive_min_sentence_score:
+            self.logger.info(
+                f"Extractive answer score {extractive_answer.confidence:.3f} below "
+                f"{self.config.extractive_min_sentence_score}; generating instead"
             )
-            return result
-        except Exception as e:
-            self.logger.error(f"Error in ask_question: {e}")
-            raise
+            return None
+        
+        self._record_stat('shed_requests' if trigger == 'load_shedding' else 'extractive_answers')
+        used_chunks = ranked[:self.answer_generator.extractive_max_chunks]
+        prepared = PreparedRequest(
+            query=query,
+            start_time=start_time,
+            retrieval_results=retrieval_results,
+            context="\n\n".join(chunk.content for chunk in used_chunks),
+            metadata=dict(stage_metadata, extractive={
+                'trigger': trigger,
+                'score': extractive_answer.confidence,
+                'spans': extractive_answer.source_spans or []
+            }),
+            trace=trace,
+            processed_query=processed_query
+        )
+        prepared.early_result = self._build_result(prepared, extractive_answer)
+        return prepared
+    
+    def _build_result(self, prepared: PreparedRequest,
+                      generated_answer: GeneratedAnswer) -> QAEngineResult:
+        """
+        Format a generated answer into a QA engine result.
+        
+        Args:
+            prepared: Prepared request
+            generated_answer: Answer from the generator
+            
+        Returns:
+            Complete QA engine result
+        """
+        processing_time = time.time() - prepared.start_time
+        with prepared.trace.span('formatting'):
+            formatted_response = self.response_formatter.format_response(
+                generated_answer, prepared.query, processing_time
+            )
+        formatted_response.metadata.update(prepared.metadata)
+        formatted_response.metadata['trace'] = prepared.trace.finish()
+        return QAEngineResult(
+            query=prepared.query,
+            answer=generated_answer.answer,
+            sources=generated_answer.sources_used,
+            processing_time=processing_time,
+            context_used=prepared.context,
+            metadata=formatted_response.metadata,
+            formatted_response=formatted_response
+        )
+    
+    def _record_generation_stats(self, prepared: PreparedRequest,
+                                 generated_answer: GeneratedAnswer):
+        """
+        Add Ollama's own token counts and durations to the trace and metadata.
+        
+        Args:
+            prepared: Prepared request
+            generated_answer: Answer from the generator
+        """
+        stats = generated_answer.generation_stats
+        if not stats:
+            return
+        prepared.metadata['generation'] = stats
+        model = prepared.model_name or self.config.model_name
+        OLLAMA_TOKENS.inc(stats.get('prompt_eval_count', 0), model=model, kind='prompt')
+        OLLAMA_TOKENS.inc(stats.get('eval_count', 0), model=model, kind='eval')
+        if stats.get('tokens_per_second'):
+            OLLAMA_TOKENS_PER_SECOND.observe(stats['tokens_per_second'], model=model)
+        if stats.get('prompt_eval_duration') is not None:
+            prepared.trace.record('ollama.prompt_eval', stats['prompt_eval_duration'] / 1e9,
+                                  tokens=stats.get('prompt_eval_count', 0))
+        if stats.get('eval_duration') is not None:
+            prepared.trace.record('ollama.eval', stats['eval_duration'] / 1e9,
+                                  tokens=stats.get('eval_count', 0),
+                                  tokens_per_second=stats.get('tokens_per_second', 0.0))
+    
+    def _result_payload(self, result: QAEngineResult) -> Dict:
+        """Serializable summary of a result, used for final stream events."""
+        return {
+            'answer': result.answer,
+            'sources': result.sources,
+            'processing_time': result.processing_time,
+            'metadata': result.metadata
+        }
+    
+    def _is_low_confidence(self, retrieval_results: List[RetrievalResult]) -> bool:
+        """
+        Check whether retrieval is too weak to justify an LLM call.
+        
+        Args:
+            retrieval_results: Retrieved document chunks
+            
+        Returns:
+            True if the best similarity is below the configured threshold;
+            keyword fallback results carry placeholder scores and never count
+        """
+        scores = [r.similarity_score for r in retrieval_results
+                  if not (r.metadata or {}).get('fallback')]
+        if not scores:
+            return True
+        best_similarity = max(scores)
+        return best_similarity < self.config.retrieval_confidence_threshold
+    
+    def _create_gated_result(self, query: str, retrieval_results: List[RetrievalResult],
+                             start_time: float) -> QAEngineResult:
+        """
+        Create a "no relevant information" result without calling the LLM.
+        
+        Args:
+            query: Original query
+            retrieval_results: Retrieved document chunks (may be empty)
+            start_time: Request start time
+            
+        Returns:
+            QA engine result listing the nearest sources
+        """
+        self._record_stat('gated_requests')
+        nearest = sorted(retrieval_results, key=lambda r: r.similarity_score, reverse=True)
+        nearest = nearest[:self.config.gated_source_count]
+        best_similarity = nearest[0].similarity_score if nearest else 0.0
+        self.logger.info(
+            f"Retrieval confidence {best_similarity:.3f} below threshold "
+            f"{self.config.retrieval_confidence_threshold}, skipping generation"
+        )
+        
+        sources = list(dict.fromkeys(r.file_name for r in nearest if r.file_name))
+        gated_answer = GeneratedAnswer(
+            answer="I couldn't find relevant information in the documents to answer this question.",
+            sources_used=sources,
+            reasoning=f"Best retrieval similarity {best_similarity:.3f} is below the confidence threshold",
+            answer_type="no_answer"
+        )
+        processing_time = time.time() - start_time
+        formatted_response = self.response_formatter.format_response(
+            gated_answer, query, processing_time
+        )
+        formatted_response.metadata['confidence_gate'] = {
+            'gated': True,
+            'best_similarity': best_similarity,
+            'threshold': self.config.retrieval_confidence_threshold,
+            'nearest_sources': [
+                {
+                    'file_name': r.file_name,
+                    'chunk_index': r.chunk_index,
+                    'similarity_score': r.similarity_score
+                }
+                for r in nearest
+            ]
+        }
+        return QAEngineResult(
+            query=query,
+            answer=gated_answer.answer,
+            sources=sources,
+            processing_time=processing_time,
+            context_used="",
+            metadata=formatted_response.metadata,
+            formatted_response=formatted_response
+        )
+    
+    def _record_stat(self, name: str, value: int = 1):
+        """Increment a request counter."""
+        with self._stats_lock:
+            self._stats[name] += value
+    
+    def get_request_stats(self) -> Dict[str, int]:
+        """
+        Get request counters.
+        
+        Returns:
+            Dictionary of counter name to value
+        """
+        with self._stats_lock:
+            return dict(self._stats)
     
     def ask_question_simple(self, query: str) -> str:
         """
@@ -181,16 +1603,181 @@ class QAEngine:
             queries: List of questions
             
         Returns:
-            List of QA engine results
+            List of QA engine results, in input order
         """
-        results = []
+        results: List[Optional[QAEngineResult]] = [None] * len(queries)
+        for index, result in self.iter_batch_answers(queries):
+            results[index] = result
+        return results
+    
+    def iter_batch_answers(self, queries: List[str], model_name: str = None,
+                           rerank: bool = None,
+                           compress_context: bool = None,
+                           force_generation: bool = False) -> Iterator[Tuple[int, QAEngineResult]]:
+        """
+        Answer many questions, yielding each result as soon as it is ready.
         
-        for i, query in enumerate(queries, 1):
-            self.logger.info(f"Processing question {i}/{len(queries)}: {query}")
-            result = self.ask_question(query)
-            results.append(result)
+        Questions are processed in chunks of ``batch_retrieval_size``: cached
+        answers are yielded straight away, the rest are retrieved with one
+        vector store call per chunk, and generation runs on up to
+        ``batch_generation_concurrency`` workers at batch priority while the
+        next chunk is retrieved. The load shedding tier is chosen per chunk,
+        so a long batch follows load as it changes. A failing question yields
+        an error result instead of stopping the batch.
         
-        return results
+        Args:
+            queries: List of questions
+            model_name: Name of the Ollama model to use (optional; routed by answer type when omitted)
+            rerank: Enable or disable the rerank stage (optional)
+            compress_context: Enable or disable context compression (optional)
+            force_generation: Call the LLM even when retrieval confidence is low
+            
+        Yields:
+            Tuples of (index in ``queries``, result), in completion order
+        """
+        options = RequestOptions(
+            model_name=model_name,
+            rerank=rerank,
+            compress_context=compress_context,
+            force_generation=force_generation,
+            priority=Priority.BATCH
+        )
+        chunk_size = max(1, self.config.batch_retrieval_size)
+        workers = max(1, min(self.config.batch_generation_concurrency,
+                             self.config.generation_max_queue))
+        self.logger.info(f"Batch of {len(queries)} questions ({workers} generation workers)")
+        
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="qa-batch")
+        pending = {}
+        
+        def drain(limit: int) -> Iterator[Tuple[int, QAEngineResult]]:
+            # Yield finished items; block while more than ``limit`` are pending
+            while pending:
+                done, _ = wait(pending, timeout=None if len(pending) > limit else 0,
+                               return_when=FIRST_COMPLETED)
+                if not done:
+                    return
+                for future in done:
+                    index, query, start_time = pending.pop(future)
+                    try:
+                        yield index, future.result()
+                    except Exception as e:
+                        self.logger.error(f"Batch question {index} failed: {e}")
+                        yield index, self._create_error_result(query, str(e), time.time() - start_time)
+        
+        try:
+            for offset in range(0, len(queries), chunk_size):
+                chunk = list(enumerate(queries[offset:offset + chunk_size], offset))
+                chunk_options = replace(options, tier=self.load_shedder.select(len(chunk)))
+                for item in self._retrieve_batch(chunk, chunk_options):
+                    if isinstance(item[1], QAEngineResult):
+                        yield item
+                        continue
+                    index, query, start_time, trace, processed_query, retrieval_results = item
+                    future = pool.submit(
+                        self._answer_batch_item,
+                        query, start_time, chunk_options, trace, processed_query, retrieval_results
+                    )
+                    pending[future] = (index, query, start_time)
+                # Keep retrieving ahead, but not more than two chunks
+                yield from drain(2 * chunk_size)
+            yield from drain(0)
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+    
+    def _retrieve_batch(self, chunk: List[Tuple[int, str]], options: 'RequestOptions') -> Iterator[Tuple]:
+        """
+        Look up cached answers and retrieve the rest of a chunk in one call.
+        
+        Each question's variations and ``top_k`` go through ``_retrieval_limits``,
+        so load shedding tiers reduce batch retrieval as they do single requests.
+        
+        Args:
+            chunk: (index, question) pairs
+            options: Per-request options
+            
+        Yields:
+            ``(index, result)`` for cached answers and failures, then
+            ``(index, query, start_time, trace, processed_query, retrieval_results)``
+            for questions that still need an answer
+        """
+        to_retrieve = []
+        for index, query in chunk:
+            start_time = time.time()
+            self._record_stat('requests_total')
+            self._record_stat('batch_requests')
+            try:
+                cached = self._lookup_cached_answer(query, options, start_time)
+                if cached is not None:
+                    yield index, cached
+                    continue
+                trace = self.tracer.start_trace('qa.batch_question')
+                with trace.span('query_processing') as span:
+                    processed_query = self.query_processor.process_query(query)
+                    span.set('keywords', len(processed_query.keywords))
+                    span.set('variations', len(processed_query.query_variations))
+                to_retrieve.append((index, query, start_time, trace, processed_query))
+            except Exception as e:
+                self.logger.error(f"Batch question {index} failed: {e}")
+                yield index, self._create_error_result(query, str(e), time.time() - start_time)
+        if not to_retrieve:
+            return
+        
+        # One vector store call per distinct top_k (normally one per chunk)
+        by_top_k = {}
+        for position, item in enumerate(to_retrieve):
+            queries, top_k = self._retrieval_limits(item[4], options)
+            by_top_k.setdefault(top_k, []).append((position, queries))
+        retrieval_start = time.perf_counter()
+        grouped = [None] * len(to_retrieve)
+        for top_k, members in by_top_k.items():
+            results = self.retrieval_engine.search_batch(
+                [queries for _, queries in members], top_k=top_k,
+                source_groups=[to_retrieve[position][4].variation_sources[:len(queries)]
+                               for position, queries in members]
+            )
+            for (position, _), retrieval_results in zip(members, results):
+                grouped[position] = retrieval_results
+        retrieval_time = time.perf_counter() - retrieval_start
+        for (index, query, start_time, trace, processed_query), retrieval_results in zip(to_retrieve, grouped):
+            trace.record('retrieval', retrieval_time,
+                         candidates=len(retrieval_results), batch_size=len(to_retrieve))
+            yield index, query, start_time, trace, processed_query, retrieval_results
+    
+    def _answer_batch_item(self, query: str, start_time: float, options: 'RequestOptions',
+                           trace: Trace, processed_query: ProcessedQuery,
+                           retrieval_results: List[RetrievalResult]) -> QAEngineResult:
+        """
+        Finish one batch question after retrieval.
+        
+        Args:
+            query: User's question
+            start_time: Request start time
+            options: Per-request options
+            trace: Request trace
+            processed_query: Processed query
+            retrieval_results: Retrieved candidates
+            
+        Returns:
+            Complete QA engine result
+        """
+        def answer() -> QAEngineResult:
+            corpus_version = self.corpus_version
+            prepared = self._prepare_from_retrieval(
+                query, start_time, options, trace, processed_query, retrieval_results
+            )
+            if prepared.early_result is not None:
+                self._store_cached_answer(query, options, prepared.early_result, corpus_version)
+                return prepared.early_result
+            return self._generate_result(prepared, options, corpus_version)
+        
+        if not self.config.enable_request_coalescing:
+            return answer()
+        result, shared = self._coalesce(query, options, answer)
+        if not shared:
+            return result
+        self._record_stat('coalesced_requests')
+        return replace(result, metadata=dict(result.metadata, coalesced=True))
     
     def get_system_status(self) -> Dict:
         """
@@ -206,14 +1793,26 @@ class QAEngine:
                 'retrieval_engine': True,
                 'context_builder': True,
                 'answer_generator': True,
-                'response_formatter': True
+                'response_formatter': True,
+                'reranker': self.reranker is not None
             },
             'configuration': {
                 'vector_store_path': self.config.vector_store_path,
                 'collection_name': self.config.collection_name,
                 'ollama_url': self.config.ollama_url,
+                'ollama_urls': self.config.ollama_urls,
                 'model_name': self.config.model_name
             },
+            'request_stats': self.get_request_stats(),
+            'coalescing': self.singleflight.get_stats(),
+            'answer_cache': self.answer_cache.get_stats() if self.answer_cache else None,
+            'semantic_cache': self.semantic_cache.get_stats() if self.semantic_cache else None,
+            'query_cache': self.query_processor.get_cache_stats(),
+            'scheduler': self.scheduler.get_stats(),
+            'load_shedding': self.load_shedder.get_stats(),
+            'model_routing': self.model_router.get_stats(),
+            'ollama_pool': self.ollama_pool.get_stats() if self.ollama_pool else None,
+            'corpus_version': self.corpus_version,
             'timestamp': datetime.now().isoformat()
         }
         
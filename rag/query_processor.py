@@ -3,21 +3,76 @@ Query Processor for Module 3: Question-Answering Engine
 
 This module handles the preprocessing and understanding of user queries.
 It normalizes questions, extracts key terms, and prepares them for retrieval.
+Each query is analysed once into an immutable ProcessedQuery that is shared
+by retrieval, context building and generation; recent analyses are memoized.
 """
 
 import re
-import string
-from typing import Dict, List, Tuple
-from collections import Counter
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from .synonym_engine import SynonymEngine
 
 # --- Static English stopwords set ---
 ENGLISH_STOPWORDS = set('''
 a about above after again against all am an and any are aren't as at be because been before being below between both but by can't cannot could couldn't did didn't do does doesn't doing don't down during each few for from further had hadn't has hasn't have haven't having he he'd he'll he's her here here's hers herself him himself his how how's i i'd i'll i'm i've if in into is isn't it it's its itself let's me more most mustn't my myself no nor not of off on once only or other ought our ours ourselves out over own same shan't she she'd she'll she's should shouldn't so some such than that that's the their theirs them themselves then there there's these they they'd they'll they're they've this those through to too under until up very was wasn't we we'd we'll we're we've were weren't what what's when when's where where's which while who who's whom why why's with won't would wouldn't you you'd you'll you're you've your yours yourself yourselves
 '''.split())
 
+TOKEN_PATTERN = re.compile(r"\b\w+\b")
+WHITESPACE_PATTERN = re.compile(r'\s+')
+PUNCTUATION_PATTERN = re.compile(r'[^\w\s\?]')
+
+QUESTION_PATTERNS = {
+    'definition': re.compile(r'\b(what is|what are|define|definition of)\b'),
+    'comparison': re.compile(r'\b(compare|difference between|similarities|versus|vs)\b'),
+    'process': re.compile(r'\b(how to|how does|steps to|process of)\b'),
+    'cause_effect': re.compile(r'\b(why|because|reason|cause|effect)\b'),
+    'example': re.compile(r'\b(example|instance|case|illustration)\b')
+}
+
 # --- Simple regex-based tokenizer ---
 def simple_tokenize(text: str) -> List[str]:
-    return re.findall(r"\b\w+\b", text.lower())
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+@dataclass(frozen=True)
+class QueryIntent:
+    """Recognized intent of a query."""
+    question_type: str = 'general'
+    question_word: Optional[str] = None
+    intent_category: str = 'information'
+    confidence: float = 0.5
+
+
+@dataclass(frozen=True)
+class ProcessedQuery:
+    """Analysis of one query; immutable so it can be memoized and shared."""
+    original_query: str
+    normalized_query: str
+    keywords: Tuple[str, ...]
+    intent: QueryIntent
+    query_variations: Tuple[str, ...]
+    # (phrase, synonym) behind each variation; None for the query and its keyword form
+    variation_sources: Tuple[Optional[Tuple[str, str]], ...] = ()
+
+    def to_dict(self) -> Dict[str, any]:
+        """Plain dictionary view, e.g. for logging or JSON output."""
+        return {
+            'original_query': self.original_query,
+            'normalized_query': self.normalized_query,
+            'keywords': list(self.keywords),
+            'intent': {
+                'question_type': self.intent.question_type,
+                'question_word': self.intent.question_word,
+                'intent_category': self.intent.intent_category,
+                'confidence': self.intent.confidence
+            },
+            'query_variations': list(self.query_variations),
+            'variation_sources': [list(source) if source else None for source in self.variation_sources]
+        }
+
 
 class QueryProcessor:
     """
@@ -27,24 +82,36 @@ class QueryProcessor:
     - Keyword extraction
     - Intent recognition
     - Query expansion
+    - Memoization of recent analyses
     """
-    def __init__(self):
+    def __init__(self, cache_size: int = 1024, synonym_engine: SynonymEngine = None,
+                 max_variations: int = 4):
+        """
+        Initialize the query processor.
+
+        Args:
+            cache_size: Number of recent analyses to memoize (0 disables)
+            synonym_engine: Synonym expansion engine (default: built-in dictionary,
+                or the file named by RAG_SYNONYMS_PATH)
+            max_variations: Maximum number of query variations, including the query
+        """
         self.stop_words = ENGLISH_STOPWORDS
         self.question_words = {
             'what', 'when', 'where', 'who', 'why', 'how', 'which', 'whose'
         }
-        self.question_patterns = {
-            'definition': r'\b(what is|what are|define|definition of)\b',
-            'comparison': r'\b(compare|difference between|similarities|versus|vs)\b',
-            'process': r'\b(how to|how does|steps to|process of)\b',
-            'cause_effect': r'\b(why|because|reason|cause|effect)\b',
-            'example': r'\b(example|instance|case|illustration)\b'
-        }
+        self.question_patterns = QUESTION_PATTERNS
+        self.synonym_engine = synonym_engine or SynonymEngine.from_config()
+        self.max_variations = max(1, max_variations)
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, ProcessedQuery]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._cache_hits = 0
+        self._cache_misses = 0
 
     def normalize_query(self, query: str) -> str:
         query = query.lower().strip()
-        query = re.sub(r'\s+', ' ', query)
-        query = re.sub(r'[^\w\s\?]', '', query)
+        query = WHITESPACE_PATTERN.sub(' ', query)
+        query = PUNCTUATION_PATTERN.sub('', query)
         return query
 
     def extract_keywords(self, query: str) -> List[str]:
@@ -52,83 +119,115 @@ class QueryProcessor:
         keywords = [token for token in tokens if token not in self.stop_words and len(token) > 2]
         return keywords
 
-    def recognize_intent(self, query: str) -> Dict[str, any]:
-        intent_info = {
-            'question_type': 'general',
-            'question_word': None,
-            'intent_category': 'information',
-            'confidence': 0.5
-        }
-        words = query.lower().split()
-        for word in words:
+    def recognize_intent(self, query: str) -> QueryIntent:
+        question_type = 'general'
+        question_word = None
+        intent_category = 'information'
+        confidence = 0.5
+        lowered = query.lower()
+        for word in lowered.split():
             if word in self.question_words:
-                intent_info['question_word'] = word
+                question_word = word
                 break
         for pattern_name, pattern in self.question_patterns.items():
-            if re.search(pattern, query.lower()):
-                intent_info['intent_category'] = pattern_name
-                intent_info['confidence'] = 0.8
+            if pattern.search(lowered):
+                intent_category = pattern_name
+                confidence = 0.8
                 break
-        if intent_info['question_word']:
-            if intent_info['question_word'] in ['what', 'which']:
-                intent_info['question_type'] = 'definition'
-            elif intent_info['question_word'] in ['how']:
-                intent_info['question_type'] = 'process'
-            elif intent_info['question_word'] in ['why']:
-                intent_info['question_type'] = 'cause_effect'
-            elif intent_info['question_word'] in ['when', 'where']:
-                intent_info['question_type'] = 'factual'
-            elif intent_info['question_word'] in ['who']:
-                intent_info['question_type'] = 'person'
-        return intent_info
+        if question_word:
+            if question_word in ['what', 'which']:
+                question_type = 'definition'
+            elif question_word in ['how']:
+                question_type = 'process'
+            elif question_word in ['why']:
+                question_type = 'cause_effect'
+            elif question_word in ['when', 'where']:
+                question_type = 'factual'
+            elif question_word in ['who']:
+                question_type = 'person'
+        return QueryIntent(
+            question_type=question_type,
+            question_word=question_word,
+            intent_category=intent_category,
+            confidence=confidence
+        )
 
     def expand_query(self, query: str, keywords: List[str]) -> List[str]:
+        return self._expand_with_sources(query, keywords)[0]
+
+    def _expand_with_sources(self, query: str, keywords: List[str]) -> Tuple[List[str], List]:
+        """Variations of a query and the (phrase, synonym) behind each."""
         variations = [query]
-        if keywords:
+        sources = [None]
+        if keywords and self.max_variations > 1:
             keyword_query = ' '.join(keywords[:3])
             if keyword_query != query:
                 variations.append(keyword_query)
-        synonym_map = {
-            'ai': ['artificial intelligence', 'machine learning'],
-            'ml': ['machine learning', 'artificial intelligence'],
-            'nlp': ['natural language processing', 'text processing'],
-            'deep learning': ['neural networks', 'ai'],
-            'algorithm': ['method', 'technique', 'approach'],
-            'research centres': ['research organizations', 'AI labs', 'institutes', 'research labs'],
-            'research centers': ['research organizations', 'AI labs', 'institutes', 'research labs'],
-            'research organizations': ['research centres', 'AI labs', 'institutes', 'research labs'],
-            'labs': ['research centres', 'research organizations', 'institutes', 'AI labs']
-        }
-        for keyword in keywords:
-            if keyword in synonym_map:
-                for synonym in synonym_map[keyword]:
-                    variation = query.replace(keyword, synonym)
-                    if variation not in variations:
-                        variations.append(variation)
-        return variations
-
-    def process_query(self, query: str) -> Dict[str, any]:
+                sources.append(None)
+        for variation in self.synonym_engine.expand_variations(query, self.max_variations - 1):
+            if len(variations) >= self.max_variations:
+                break
+            if variation.text not in variations:
+                variations.append(variation.text)
+                sources.append((variation.phrase, variation.synonym))
+        return variations, sources
+
+    def process_query(self, query: str) -> ProcessedQuery:
+        """
+        Analyse a query, reusing a memoized analysis when available.
+
+        Args:
+            query: User's question
+
+        Returns:
+            Immutable processed query
+        """
+        if self.cache_size > 0:
+            with self._cache_lock:
+                cached = self._cache.get(query)
+                if cached is not None:
+                    self._cache.move_to_end(query)
+                    self._cache_hits += 1
+                    return cached
+                self._cache_misses += 1
+
         normalized_query = self.normalize_query(query)
         keywords = self.extract_keywords(normalized_query)
-        intent_info = self.recognize_intent(normalized_query)
-        query_variations = self.expand_query(normalized_query, keywords)
-        return {
-            'original_query': query,
-            'normalized_query': normalized_query,
-            'keywords': keywords,
-            'intent': intent_info,
-            'query_variations': query_variations,
-            'processed_at': '2024-01-01T00:00:00Z'
-        }
+        variations, sources = self._expand_with_sources(normalized_query, keywords)
+        processed = ProcessedQuery(
+            original_query=query,
+            normalized_query=normalized_query,
+            keywords=tuple(keywords),
+            intent=self.recognize_intent(normalized_query),
+            query_variations=tuple(variations),
+            variation_sources=tuple(sources)
+        )
+
+        if self.cache_size > 0:
+            with self._cache_lock:
+                self._cache[query] = processed
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return processed
+
+    def get_cache_stats(self) -> Dict[str, int]:
+        """Memo size, hits and misses."""
+        with self._cache_lock:
+            return {
+                'size': len(self._cache),
+                'max_size': self.cache_size,
+                'hits': self._cache_hits,
+                'misses': self._cache_misses
+            }
 
     def get_query_statistics(self, query: str) -> Dict[str, any]:
         processed = self.process_query(query)
         return {
             'query_length': len(query),
             'word_count': len(query.split()),
-            'keyword_count': len(processed['keywords']),
-            'intent_confidence': processed['intent']['confidence'],
-            'variations_count': len(processed['query_variations'])
+            'keyword_count': len(processed.keywords),
+            'intent_confidence': processed.intent.confidence,
+            'variations_count': len(processed.query_variations)
         }
 
 
@@ -147,5 +246,5 @@ if __name__ == "__main__":
     
     for q in test_queries:
         print(f"Query: {q}")
-        print(processor.process_query(q))
+        print(processor.process_query(q).to_dict())
         print() 
\ No newline at end of file
@@ -0,0 +1,170 @@
+"""
+Reranker for Module 3: Question-Answering Engine
+
+This module re-orders retrieved document chunks with a local cross-encoder.
+The cross-encoder scores (query, chunk) pairs jointly, which is more accurate
+than the bi-encoder similarity used for retrieval, at the cost of one extra
+forward pass over a bounded candidate set.
+"""
+
+import time
+import logging
+import threading
+from typing import List, Optional
+from dataclasses import dataclass, replace
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+# Use relative import for RetrievalResult
+from .retrieval_engine import RetrievalResult
+
+
+@dataclass
+class RerankResult:
+    """Data class for rerank results."""
+    results: List[RetrievalResult]
+    latency_ms: float
+    candidates_scored: int
+    applied: bool  # False when the original order was kept
+    fallback_reason: Optional[str] = None
+
+
+class Reranker:
+    """
+    Reranks retrieval results with a cross-encoder.
+
+    Features:
+    - Single batched forward pass over the top-N candidates
+    - Time budget with fallback to the original order
+    - Bounded scoring pool; requests are not queued behind overrunning passes
+    - Per-request latency reporting
+    """
+
+    def __init__(self, model_name: str = 'cross-encoder/ms-marco-MiniLM-L-6-v2',
+                 top_n: int = 20, time_budget_ms: float = 250.0, max_workers: int = 2):
+        """
+        Initialize the reranker.
+
+        Args:
+            model_name: Name of the cross-encoder model to load
+            top_n: Maximum number of candidates scored per request
+            time_budget_ms: Time budget for scoring before falling back
+            max_workers: Maximum forward passes running at once
+        """
+        self.model_name = model_name
+        self.top_n = top_n
+        self.time_budget_ms = time_budget_ms
+        self.logger = logging.getLogger(__name__)
+        self.model = None
+
+        # A request that exceeds its budget returns while its pass finishes in
+        # the background. A worker is claimed before submitting, and freed only
+        # when the pass ends, so requests never wait behind an overrun pass:
+        # when every worker is busy they keep the original order instead.
+        self.max_workers = max(1, max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="reranker")
+        self._workers = threading.BoundedSemaphore(self.max_workers)
+        self._load_model()
+
+    def _load_model(self):
+        """Load the cross-encoder model."""
+        try:
+            from sentence_transformers import CrossEncoder
+            self.logger.info(f"Loading cross-encoder model: {self.model_name}")
+            self.model = CrossEncoder(self.model_name)
+            self.logger.info("Cross-encoder model loaded successfully")
+        except Exception as e:
+            self.logger.error(f"Failed to load cross-encoder model: {e}")
+            raise
+
+    def rerank(self, query: str, results: List[RetrievalResult],
+               time_budget_ms: float = None) -> RerankResult:
+        """
+        Rerank retrieval results against the query.
+
+        Only the first ``top_n`` candidates are scored; any remaining results
+        keep their original order after the reranked block.
+
+        Args:
+            query: Original user query
+            results: Retrieval results in retrieval order
+            time_budget_ms: Optional per-request override of the time budget
+
+        Returns:
+            Rerank result with the new order and latency
+        """
+        start_time = time.perf_counter()
+        budget_ms = self.time_budget_ms if time_budget_ms is None else time_budget_ms
+
+        if len(results) < 2:
+            return RerankResult(
+                results=list(results),
+                latency_ms=0.0,
+                candidates_scored=0,
+                applied=False,
+                fallback_reason="not_enough_candidates"
+            )
+
+        candidates = results[:self.top_n]
+        remainder = results[self.top_n:]
+        pairs = [(query, result.content) for result in candidates]
+
+        if not self._workers.acquire(blocking=False):
+            self.logger.warning("All rerank workers busy, keeping original order")
+            return RerankResult(
+                results=list(results),
+                latency_ms=(time.perf_counter() - start_time) * 1000,
+                candidates_scored=0,
+                applied=False,
+                fallback_reason="busy"
+            )
+        future = None
+        try:
+            future = self._executor.submit(self._score_pairs, pairs)
+            future.add_done_callback(lambda _: self._workers.release())
+            scores = future.result(timeout=budget_ms / 1000.0)
+        except FutureTimeoutError:
+            latency_ms = (time.perf_counter() - start_time) * 1000
+            self.logger.warning(f"Rerank exceeded budget ({latency_ms:.1f}ms > {budget_ms:.1f}ms), keeping original order")
+            return RerankResult(
+                results=list(results),
+                latency_ms=latency_ms,
+                candidates_scored=0,
+                applied=False,
+                fallback_reason="time_budget_exceeded"
+            )
+        except Exception as e:
+            if future is None:
+                self._workers.release()
+            self.logger.error(f"Error during reranking: {e}")
+            return RerankResult(
+                results=list(results),
+                latency_ms=(time.perf_counter() - start_time) * 1000,
+                candidates_scored=0,
+                applied=False,
+                fallback_reason="error"
+            )
+
+        order = sorted(range(len(candidates)), key=lambda i: scores[i], reverse=True)
+        reranked = [replace(candidates[i], rerank_score=scores[i]) for i in order] + list(remainder)
+        latency_ms = (time.perf_counter() - start_time) * 1000
+
+        self.logger.info(f"Reranked {len(candidates)} candidates in {latency_ms:.1f}ms")
+        return RerankResult(
+            results=reranked,
+            latency_ms=latency_ms,
+            candidates_scored=len(candidates),
+            applied=True
+        )
+
+    def _score_pairs(self, pairs: List[tuple]) -> List[float]:
+        """
+        Score all (query, passage) pairs in one batched forward pass.
+
+        Args:
+            pairs: List of (query, passage) tuples
+
+        Returns:
+            List of relevance scores
+        """
+        scores = self.model.predict(pairs, batch_size=len(pairs), show_progress_bar=False)
+        return [float(score) for score in scores]
@@ -5,7 +5,9 @@ This module handles the retrieval of relevant documents using vector similarity
 It leverages the vector store from Module 2 to find the most relevant document chunks.
 """
 
+import asyncio
 import numpy as np
+from concurrent.futures import Executor
 from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
 import logging
@@ -13,6 +15,8 @@ import logging
 # Use relative imports for core modules
 from .embedding_service import EmbeddingService
 from .vector_store import VectorStore
+from .context_packer import estimate_tokens
+from .metrics import QUERY_VARIATION_GAIN
 
 
 @dataclass
@@ -24,6 +28,9 @@ class RetrievalResult:
     similarity_score: float
     metadata: Dict
     source_path: str
+    embedding: Optional[np.ndarray] = None
+    token_count: Optional[int] = None
+    rerank_score: Optional[float] = None  # cross-encoder score, set by the reranker
 
 
 class RetrievalEngine:
@@ -38,23 +45,32 @@ class RetrievalEngine:
     """
     
     def __init__(self, vector_store_path: str = "ragbot_fastapi/vector_db", 
-                 collection_name: str = "documents"):
+                 collection_name: str = "documents",
+                 embedding_backend: str = None, embedding_dimension: int = None):
         """
         Initialize the retrieval engine.
         
         Args:
             vector_store_path: Path to the vector database
             collection_name: Name of the collection to search
+            embedding_backend: 'sentence-transformers' or 'hash' (optional; defaults
+                to the RAG_EMBEDDING_BACKEND environment variable)
+            embedding_dimension: Embedding dimension for the hash backend (optional)
         """
+        self.embedding_service = EmbeddingService(backend=embedding_backend,
+                                                  dimension=embedding_dimension)
         self.vector_store = VectorStore(db_path=vector_store_path, 
-                                      collection_name=collection_name)
-        self.embedding_service = EmbeddingService()
+                                      collection_name=collection_name,
+                                      embedding_function=self.embedding_service.embedding_function())
         self.logger = logging.getLogger(__name__)
         
         # Retrieval parameters
         self.default_top_k = 5
         self.min_similarity_threshold = 0.1
         self.max_context_length = 2000  # characters
+        self.include_embeddings = True  # used by ContextBuilder diversification
+        # Query variations at least this similar to a kept one are not searched
+        self.variation_similarity_threshold = 0.95
         
     def search_single_query(self, query: str, top_k: int = None) -> List[RetrievalResult]:
         """
@@ -72,31 +88,15 @@ class RetrievalEngine:
             
         try:
             # Search in vector store
-            search_results = self.vector_store.search_by_text(query, top_k=top_k)
+            search_results = self.vector_store.search_by_text(
+                query, top_k=top_k, include_embeddings=self.include_embeddings
+            )
             
             if not search_results:
                 self.logger.warning(f"No results found for query: {query}")
                 return []
             
-            # Convert to RetrievalResult objects
-            results = []
-            for result in search_results:
-                retrieval_result = RetrievalResult(
-                    content=result.get('content', ''),
-                    file_name=result.get('file_name', ''),
-                    chunk_index=result.get('chunk_index', 0),
-                    similarity_score=result.get('similarity_score', 0.0),
-                    metadata=result.get('metadata', {}),
-                    source_path=result.get('file_path', '')
-                )
-                results.append(retrieval_result)
-            
-            # Filter by similarity threshold
-            filtered_results = [
-                result for result in results 
-                if result.similarity_score >= self.min_similarity_threshold
-            ]
-            
+            filtered_results = self._to_retrieval_results(search_results)
             self.logger.info(f"Retrieved {len(filtered_results)} relevant results for query: {query}")
             return filtered_results
             
@@ -104,59 +104,326 @@ class RetrievalEngine:
             self.logger.error(f"Error in search_single_query: {e}")
             return []
     
-    def search_multiple_queries(self, queries: List[str], top_k: int = None) -> List[RetrievalResult]:
+    def search_batch(self, query_groups: List[List[str]], top_k: int = None,
+                     source_groups: List[List] = None) -> List[List[RetrievalResult]]:
+        """
+        Retrieve for many questions with one vector store call.
+        
+        All query variations of all questions are searched together, so
+        they are embedded in one batch; questions without vector results
+        fall back to keyword search as in search_multiple_queries.
+        
+        Args:
+            query_groups: Query variations per question
+            top_k: Number of results per variation
+            source_groups: (phrase, synonym) behind each variation, per question (optional)
+            
+        Returns:
+            Retrieval results per question, in input order
+        """
+        if top_k is None:
+            top_k = self.default_top_k
+        
+        selected = self._select_variation_groups(query_groups, source_groups)
+        flat_queries = [query for queries, _, _ in selected for query in queries]
+        embeddings = [group_embeddings for _, _, group_embeddings in selected]
+        flat_embeddings = None
+        if flat_queries and all(group_embeddings is not None for group_embeddings in embeddings):
+            flat_embeddings = np.concatenate(embeddings)
+        search_results = self._search_variations(flat_queries, flat_embeddings, top_k)
+        
+        grouped = []
+        position = 0
+        for queries, sources, _ in selected:
+            per_query = [self._to_retrieval_results(hits)
+                         for hits in search_results[position:position + len(queries)]]
+            position += len(queries)
+            self._log_variation_gain(queries, per_query, sources)
+            results = [result for hits in per_query for result in hits]
+            if not results:
+                self.logger.info("No vector results found, using keyword fallback.")
+                results = self.keyword_search(queries, top_k)
+            grouped.append(results)
+        
+        self.logger.info(f"Batch retrieval for {len(query_groups)} questions ({len(flat_queries)} queries)")
+        return grouped
+    
+    def _to_retrieval_results(self, search_results: List[Dict]) -> List[RetrievalResult]:
+        """
+        Convert vector store hits to retrieval results above the similarity threshold.
+        
+        Args:
+            search_results: Hits from the vector store
+            
+        Returns:
+            Filtered retrieval results
+        """
+        results = []
+        for result in search_results:
+            metadata = result.get('metadata') or {}
+            embedding = result.get('embedding')
+            retrieval_result = RetrievalResult(
+                content=result.get('content', ''),
+                file_name=metadata.get('source', ''),
+                chunk_index=metadata.get('chunk_id', 0),
+                similarity_score=result.get('similarity', 0.0),
+                metadata=metadata,
+                source_path=metadata.get('file_path', ''),
+                embedding=np.asarray(embedding, dtype=np.float32) if embedding is not None else None,
+                token_count=estimate_tokens(result.get('content', ''))
+            )
+            results.append(retrieval_result)
+        
+        # Filter by similarity threshold
+        return [
+            result for result in results 
+            if result.similarity_score >= self.min_similarity_threshold
+        ]
+    
+    def search_multiple_queries(self, queries: List[str], top_k: int = None,
+                                sources: List = None) -> List[RetrievalResult]:
         """
         Search for relevant documents using multiple query variations.
         If vector search returns no results, use keyword fallback.
         """
-        all_results = []
-        for query in queries:
-            results = self.search_single_query(query, top_k)
-            if results:
-                all_results.extend(results)
+        all_results = self.dense_search(queries, top_k, sources)
         if not all_results:
             self.logger.info("No vector results found, using keyword fallback.")
-            all_chunks = self.vector_store.get_all_chunks()
-            best_chunks = []
-            queries_lower = [q.lower() for q in queries]
-            for chunk in all_chunks:
-                content_lower = chunk['content'].lower()
-                if any(q in content_lower for q in queries_lower):
-                    best_chunks.append(RetrievalResult(
-                        content=chunk['content'],
-                        file_name=chunk['file_name'],
-                        chunk_index=chunk['chunk_index'],
-                        similarity_score=1.0,
-                        metadata=chunk['metadata'],
-                        source_path=chunk['file_path']
-                    ))
-            if best_chunks:
-                return best_chunks[:top_k or 3]
-            # Special fallback: if query is about research organizations/labs/institutes, include that section
-            keywords = ["research organization", "research organizations", "lab", "labs", "institute", "institutes"]
-            for chunk in all_chunks:
-                if any(kw in chunk['content'].lower() or kw in chunk['file_name'].lower() for kw in keywords):
-                    return [RetrievalResult(
-                        content=chunk['content'],
-                        file_name=chunk['file_name'],
-                        chunk_index=chunk['chunk_index'],
-                        similarity_score=0.9,
-                        metadata=chunk['metadata'],
-                        source_path=chunk['file_path']
-                    )]
-            # Final fallback: concatenate all section headings and content (up to 2000 chars)
-            context = "\n\n".join(chunk['content'] for chunk in all_chunks)
-            context = context[:2000]
-            return [RetrievalResult(
-                content=context,
-                file_name="all_sections",
-                chunk_index=0,
-                similarity_score=0.5,
-                metadata={},
-                source_path=""
-            )]
+            return self.keyword_search(queries, top_k)
         return all_results
     
+    async def search_multiple_queries_async(self, queries: List[str], top_k: int = None,
+                                            executor: Executor = None,
+                                            sources: List = None) -> List[RetrievalResult]:
+        """
+        Async variant of search_multiple_queries.
+        
+        Dense retrieval runs on the executor; the keyword fallback, which
+        reads every chunk, runs only when dense retrieval finds nothing.
+        
+        Args:
+            queries: Query variations
+            top_k: Number of results per query
+            executor: Executor for the blocking Chroma calls (optional)
+            sources: (phrase, synonym) behind each variation (optional)
+            
+        Returns:
+            List of retrieval results
+        """
+        loop = asyncio.get_running_loop()
+        dense = await loop.run_in_executor(executor, self.dense_search, queries, top_k, sources)
+        if not dense:
+            self.logger.info("No vector results found, using keyword fallback.")
+            return await loop.run_in_executor(executor, self.keyword_search, queries, top_k)
+        return dense
+    
+    def dense_search(self, queries: List[str], top_k: int = None,
+                     sources: List = None) -> List[RetrievalResult]:
+        """
+        Vector search for every query variation.
+        
+        The variations are embedded once: the embeddings drop near-duplicate
+        variations and, when the vector store embeds with the same model,
+        are searched directly instead of being embedded again by Chroma.
+        The remaining variations are searched with one vector store call.
+        
+        Args:
+            queries: Query variations
+            top_k: Number of results per query
+            sources: (phrase, synonym) behind each variation (optional)
+            
+        Returns:
+            Concatenated retrieval results
+        """
+        if top_k is None:
+            top_k = self.default_top_k
+        queries, sources, embeddings = self._select_variations(queries, sources)
+        search_results = self._search_variations(queries, embeddings, top_k)
+        per_query = [self._to_retrieval_results(hits) for hits in search_results]
+        self._log_variation_gain(queries, per_query, sources)
+        return [result for hits in per_query for result in hits]
+    
+    def _search_variations(self, queries: List[str], embeddings: Optional[np.ndarray],
+                           top_k: int) -> List[List[Dict]]:
+        """Search by our embeddings when Chroma would compute the same ones, else by text."""
+        if embeddings is not None and self.embedding_service.matches_store_embeddings():
+            return self.vector_store.search_by_embeddings(
+                embeddings, top_k=top_k, include_embeddings=self.include_embeddings
+            )
+        return self.vector_store.search_by_texts(
+            queries, top_k=top_k, include_embeddings=self.include_embeddings
+        )
+    
+    def prune_variations(self, queries: List[str],
+                         embeddings: Optional[np.ndarray] = None) -> List[str]:
+        """
+        Drop query variations whose embedding nearly matches an earlier one.
+        
+        The first query (the original) is always kept.
+        
+        Args:
+            queries: Query variations, original first
+            embeddings: Unit-normalized embeddings of the queries (optional)
+            
+        Returns:
+            Variations worth searching
+        """
+        return self._select_variations(queries, embeddings=embeddings)[0]
+    
+    def _pruning_enabled(self, query_count: int) -> bool:
+        threshold = self.variation_similarity_threshold
+        return query_count > 1 and threshold is not None and threshold < 1.0
+    
+    def _select_variations(self, queries: List[str], sources: List = None,
+                           embeddings: Optional[np.ndarray] = None) -> Tuple[List[str], List, Optional[np.ndarray]]:
+        """
+        Embed the variations if needed and drop near-duplicates.
+        
+        Args:
+            queries: Query variations, original first
+            sources: (phrase, synonym) behind each variation (optional)
+            embeddings: Unit-normalized embeddings of the queries (optional)
+            
+        Returns:
+            Tuple of (kept queries, their sources, their embeddings or None)
+        """
+        queries = list(queries)
+        sources = self._pad_sources(sources, len(queries))
+        prune = self._pruning_enabled(len(queries))
+        if embeddings is None and queries and \
+                (prune or self.embedding_service.matches_store_embeddings()):
+            try:
+                embeddings = self.embedding_service.encode_normalized(queries)
+            except Exception as e:
+                self.logger.warning(f"Could not embed query variations: {e}")
+                embeddings = None
+        if not prune or embeddings is None:
+            return queries, sources, embeddings
+        kept = [0]
+        for i in range(1, len(queries)):
+            if float(np.max(embeddings[kept] @ embeddings[i])) < self.variation_similarity_threshold:
+                kept.append(i)
+        if len(kept) < len(queries):
+            dropped = [queries[i] for i in range(len(queries)) if i not in kept]
+            self.logger.info(f"Dropped {len(dropped)} near-duplicate query variations: {dropped}")
+        return [queries[i] for i in kept], [sources[i] for i in kept], embeddings[kept]
+    
+    @staticmethod
+    def _pad_sources(sources: Optional[List], count: int) -> List:
+        """Sources aligned with ``count`` queries; missing entries are None."""
+        return (list(sources or []) + [None] * count)[:count]
+    
+    def _select_variation_groups(self, query_groups: List[List[str]],
+                                 source_groups: List[List] = None) -> List[Tuple]:
+        """Select the variations of many questions with one embedding call."""
+        source_groups = list(source_groups or [])
+        source_groups += [None] * (len(query_groups) - len(source_groups))
+        flat_queries = [query for group in query_groups for query in group]
+        embeddings = None
+        if flat_queries and (self.embedding_service.matches_store_embeddings()
+                             or any(self._pruning_enabled(len(group)) for group in query_groups)):
+            try:
+                embeddings = self.embedding_service.encode_normalized(flat_queries)
+            except Exception as e:
+                self.logger.warning(f"Could not embed query variations: {e}")
+        selected = []
+        position = 0
+        for group, sources in zip(query_groups, source_groups):
+            group_embeddings = None
+            if embeddings is not None:
+                group_embeddings = embeddings[position:position + len(group)]
+            position += len(group)
+            if embeddings is None:
+                # Not needed, or already failed once; do not embed group by group
+                selected.append((list(group), self._pad_sources(sources, len(group)), None))
+            else:
+                selected.append(self._select_variations(group, sources, group_embeddings))
+        return selected
+    
+    def _log_variation_gain(self, queries: List[str], per_query: List[List[RetrievalResult]],
+                            sources: List = None):
+        """
+        Record how many chunks each variation found that earlier ones did not.
+        
+        Gains are labelled with the dictionary phrase and synonym behind the
+        variation; entries that never add chunks are candidates for removal
+        from the synonym dictionary.
+        
+        Args:
+            queries: Searched queries, original first
+            per_query: Results per query
+            sources: (phrase, synonym) behind each query (optional)
+        """
+        sources = list(sources or [])
+        seen = set()
+        for index, (query, results) in enumerate(zip(queries, per_query)):
+            keys = {(result.source_path or result.file_name, result.chunk_index) for result in results}
+            new_chunks = len(keys - seen)
+            seen |= keys
+            if index == 0:
+                continue
+            source = sources[index] if index < len(sources) else None
+            phrase, synonym = source if source else ('', '')
+            QUERY_VARIATION_GAIN.observe(new_chunks, phrase=phrase, synonym=synonym)
+            origin = f"'{phrase}' -> '{synonym}'" if source else "keyword query"
+            self.logger.info(
+                f"Query variation gain: {new_chunks} new of {len(results)} results "
+                f"for {origin} ('{query}')"
+            )
+    
+    def keyword_search(self, queries: List[str], top_k: int = None) -> List[RetrievalResult]:
+        """
+        Substring search over all chunks, used when vector search finds nothing.
+        
+        Args:
+            queries: Query variations
+            top_k: Maximum number of matching chunks (default 3)
+            
+        Returns:
+            Matching chunks, a research-section match, or all content
+            concatenated as a last resort; each is marked with
+            ``metadata['fallback']`` because its score is not a similarity
+        """
+        all_chunks = self.vector_store.get_all_chunks()
+        best_chunks = []
+        queries_lower = [q.lower() for q in queries]
+        for chunk in all_chunks:
+            content_lower = chunk['content'].lower()
+            if any(q in content_lower for q in queries_lower):
+                best_chunks.append(RetrievalResult(
+                    content=chunk['content'],
+                    file_name=chunk['file_name'],
+                    chunk_index=chunk['chunk_index'],
+                    similarity_score=1.0,
+                    metadata={**(chunk['metadata'] or {}), 'fallback': 'keyword'},
+                    source_path=chunk['file_path']
+                ))
+        if best_chunks:
+            return best_chunks[:top_k or 3]
+        # Special fallback: if query is about research organizations/labs/institutes, include that section
+        keywords = ["research organization", "research organizations", "lab", "labs", "institute", "institutes"]
+        for chunk in all_chunks:
+            if any(kw in chunk['content'].lower() or kw in chunk['file_name'].lower() for kw in keywords):
+                return [RetrievalResult(
+                    content=chunk['content'],
+                    file_name=chunk['file_name'],
+                    chunk_index=chunk['chunk_index'],
+                    similarity_score=0.9,
+                    metadata={**(chunk['metadata'] or {}), 'fallback': 'research_section'},
+                    source_path=chunk['file_path']
+                )]
+        # Final fallback: concatenate all section headings and content (up to 2000 chars)
+        context = "\n\n".join(chunk['content'] for chunk in all_chunks)
+        context = context[:2000]
+        return [RetrievalResult(
+            content=context,
+            file_name="all_sections",
+            chunk_index=0,
+            similarity_score=0.5,
+            metadata={'fallback': 'all_sections'},
+            source_path=""
+        )]
+    
     def _deduplicate_results(self, results: List[RetrievalResult]) -> List[RetrievalResult]:
         """
         Remove duplicate or very similar results.
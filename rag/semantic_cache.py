@@ -0,0 +1,182 @@
+"""
+Semantic Cache for Module 3: Question-Answering Engine
+
+This module caches answers by query meaning rather than exact text. Past
+query embeddings are kept in a small in-memory matrix; a new query whose
+nearest cached neighbor is above a cosine threshold, and whose retrieved
+chunk set matches the one the cached answer was built from, reuses that
+answer without calling the LLM.
+"""
+
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Hashable, Optional, Tuple
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class SemanticCacheEntry:
+    """Data class for one cached answer."""
+    query: str
+    chunk_key: FrozenSet
+    options_key: Hashable
+    corpus_version: int
+    value: Any
+    created_at: float
+
+
+class SemanticCache:
+    """
+    In-memory nearest-neighbor answer cache.
+
+    Features:
+    - One matrix-vector product per lookup
+    - Chunk-set and request-option matching on top of similarity
+    - Entries valid only for the corpus version they were built against
+    - TTL and LRU eviction with a fixed capacity
+    """
+
+    def __init__(self, similarity_threshold: float = 0.92, max_entries: int = 1000,
+                 ttl_seconds: float = 3600.0):
+        """
+        Initialize the semantic cache.
+
+        Args:
+            similarity_threshold: Minimum cosine similarity for a hit
+            max_entries: Maximum number of cached queries
+            ttl_seconds: Time-to-live for entries (0 disables expiry)
+        """
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._embeddings: Optional[np.ndarray] = None  # allocated on first add
+        self._valid = np.zeros(max_entries, dtype=bool)
+        self._entries: Dict[int, SemanticCacheEntry] = {}
+        self._lru: "OrderedDict[int, None]" = OrderedDict()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidated': 0}
+
+    def lookup(self, query_embedding: np.ndarray, chunk_key: FrozenSet,
+               options_key: Hashable, corpus_version: int) -> Optional[Tuple[SemanticCacheEntry, float]]:
+        """
+        Find a cached answer for a semantically equivalent query.
+
+        Args:
+            query_embedding: Unit-normalized query embedding
+            chunk_key: Identifiers of the chunks retrieved for the query
+            options_key: Request options that must match (e.g. model)
+            corpus_version: Current corpus version
+
+        Returns:
+            Tuple of (entry, similarity) on a hit, otherwise None
+        """
+        now = time.time()
+        with self._lock:
+            if self._embeddings is None or not self._valid.any():
+                self._stats['misses'] += 1
+                return None
+
+            similarities = self._embeddings @ query_embedding
+            similarities[~self._valid] = -np.inf
+            candidates = np.flatnonzero(similarities >= self.similarity_threshold)
+
+            for slot in candidates[np.argsort(-similarities[candidates])]:
+                slot = int(slot)
+                entry = self._entries[slot]
+                if entry.corpus_version != corpus_version or (
+                        self.ttl_seconds and now - entry.created_at > self.ttl_seconds):
+                    self._remove(slot)
+                    self._stats['invalidated'] += 1
+                    continue
+                if entry.chunk_key == chunk_key and entry.options_key == options_key:
+                    self._lru.move_to_end(slot)
+                    self._stats['hits'] += 1
+                    return entry, float(similarities[slot])
+
+            self._stats['misses'] += 1
+            return None
+
+    def add(self, query: str, query_embedding: np.ndarray, chunk_key: FrozenSet,
+            options_key: Hashable, corpus_version: int, value: Any):
+        """
+        Add an answer to the cache.
+
+        Args:
+            query: Query text (kept for reporting)
+            query_embedding: Unit-normalized query embedding
+            chunk_key: Identifiers of the chunks the answer was built from
+            options_key: Request options the answer was built with
+            corpus_version: Corpus version the answer was built against
+            value: Cached value
+        """
+        with self._lock:
+            if self._embeddings is None:
+                self._embeddings = np.zeros((self.max_entries, len(query_embedding)), dtype=np.float32)
+
+            free_slots = np.flatnonzero(~self._valid)
+            if len(free_slots):
+                slot = int(free_slots[0])
+            else:
+                slot, _ = self._lru.popitem(last=False)
+                self._stats['evictions'] += 1
+
+            self._embeddings[slot] = query_embedding
+            self._valid[slot] = True
+            self._entries[slot] = SemanticCacheEntry(
+                query=query,
+                chunk_key=chunk_key,
+                options_key=options_key,
+                corpus_version=corpus_version,
+                value=value,
+                created_at=time.time()
+            )
+            self._lru[slot] = None
+            self._lru.move_to_end(slot)
+
+    def invalidate_before(self, corpus_version: int) -> int:
+        """
+        Drop entries built against older corpus versions.
+
+        Args:
+            corpus_version: Current corpus version
+
+        Returns:
+            Number of entries dropped
+        """
+        with self._lock:
+            stale = [slot for slot, entry in self._entries.items()
+                     if entry.corpus_version < corpus_version]
+            for slot in stale:
+                self._remove(slot)
+            self._stats['invalidated'] += len(stale)
+        return len(stale)
+
+    def get_stats(self) -> Dict:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with counters, size and hit ratio
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = int(self._valid.sum())
+        lookups = stats['hits'] + stats['misses']
+        stats.update({
+            'max_entries': self.max_entries,
+            'similarity_threshold': self.similarity_threshold,
+            'hit_ratio': stats['hits'] / lookups if lookups else 0.0
+        })
+        return stats
+
+    def _remove(self, slot: int):
+        """Remove an entry; caller holds the lock."""
+        self._valid[slot] = False
+        self._entries.pop(slot, None)
+        self._lru.pop(slot, None)
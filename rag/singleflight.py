@@ -0,0 +1,279 @@
+"""
+Singleflight for Module 3: Question-Answering Engine
+
+This module coalesces identical in-flight requests. The first caller for a
+key runs the computation; concurrent callers with the same key wait for it
+and share its result (or replay its event stream) instead of repeating
+retrieval and generation.
+"""
+
+import time
+import asyncio
+import threading
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterator, List, Optional, Tuple, Type
+
+
+class FollowerTimeoutError(TimeoutError):
+    """Raised when a follower's own wait limit passes before the shared call finishes."""
+
+
+class _Call:
+    """An in-flight computation shared by one leader and its followers."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+
+
+class _StreamCall:
+    """An in-flight event stream buffered for replay to every subscriber."""
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.events: List[Any] = []
+        self.finished = False
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+        # Subscribers still reading; the producer stops when all have left
+        self.subscribers = 1
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key.
+
+    Features:
+    - Blocking calls share one result (``do``, ``do_async``)
+    - Streams are produced once and replayed to all subscribers (``do_stream``)
+    - Counters for leaders and coalesced followers
+    """
+
+    def __init__(self):
+        """Initialize the singleflight group."""
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._streams: Dict[Hashable, _StreamCall] = {}
+        self._async_calls: Dict[Hashable, "asyncio.Future"] = {}
+        self._stats = {'leaders': 0, 'coalesced': 0}
+
+    def do(self, key: Hashable, fn: Callable[[], Any], timeout: Optional[float] = None,
+           retry_on: Tuple[Type[BaseException], ...] = ()) -> Tuple[Any, bool]:
+        """
+        Run ``fn`` once for all concurrent callers with the same key.
+
+        Args:
+            key: Coalescing key
+            fn: Computation to run
+            timeout: Longest a follower waits for the shared result (optional)
+            retry_on: Leader errors after which a follower runs the call again
+                instead of re-raising (e.g. the leader's own deadline passing)
+
+        Returns:
+            Tuple of (result, shared); ``shared`` is True for followers
+
+        Raises:
+            FollowerTimeoutError: A follower's ``timeout`` passed
+        """
+        expires_at = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                if call is not None:
+                    call.followers += 1
+                    self._stats['coalesced'] += 1
+                    leader = False
+                else:
+                    call = _Call()
+                    self._calls[key] = call
+                    self._stats['leaders'] += 1
+                    leader = True
+
+            if leader:
+                break
+            wait = max(expires_at - time.monotonic(), 0.0) if expires_at is not None else None
+            if not call.done.wait(wait):
+                raise FollowerTimeoutError("Timed out waiting for a coalesced call")
+            if call.error is None:
+                return call.result, True
+            if not isinstance(call.error, retry_on):
+                raise call.error
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result, False
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]],
+                       timeout: Optional[float] = None,
+                       retry_on: Tuple[Type[BaseException], ...] = ()) -> Tuple[Any, bool]:
+        """
+        Async variant of ``do`` for callers on one event loop.
+
+        Args:
+            key: Coalescing key
+            fn: Coroutine function to run
+            timeout: Longest a follower waits for the shared result (optional)
+            retry_on: Leader errors after which a follower runs the call again
+
+        Returns:
+            Tuple of (result, shared); ``shared`` is True for followers
+
+        Raises:
+            FollowerTimeoutError: A follower's ``timeout`` passed
+        """
+        expires_at = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            with self._lock:
+                future = self._async_calls.get(key)
+                if future is not None:
+                    self._stats['coalesced'] += 1
+                    leader = False
+                else:
+                    future = asyncio.get_running_loop().create_future()
+                    self._async_calls[key] = future
+                    self._stats['leaders'] += 1
+                    leader = True
+
+            if leader:
+                break
+            wait = max(expires_at - time.monotonic(), 0.0) if expires_at is not None else None
+            try:
+                # Shield so a cancelled or timed-out follower does not cancel the shared result
+                return await asyncio.wait_for(asyncio.shield(future), wait), True
+            except asyncio.CancelledError:
+                # The leader was cancelled (e.g. its client disconnected); retry
+                # unless this caller is itself being cancelled
+                if future.cancelled() and not asyncio.current_task().cancelling():
+                    continue
+                raise
+            except asyncio.TimeoutError:
+                if not future.done():
+                    raise FollowerTimeoutError("Timed out waiting for a coalesced call") from None
+                raise
+            except retry_on:
+                continue
+
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            if not future.done():
+                future.set_exception(e)
+                # Mark retrieved so an unobserved failure is not logged as a warning
+                future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                self._async_calls.pop(key, None)
+
+    def do_stream(self, key: Hashable, fn: Callable[[], Iterator[Any]]) -> Iterator[Tuple[Any, bool]]:
+        """
+        Produce the stream from ``fn`` once and replay it to every subscriber.
+
+        The producer runs in a background thread, so a subscriber that stops
+        reading (for example a disconnected client) does not stall the
+        others. When every subscriber has gone, the producer closes the
+        source iterator, which stops the work behind it.
+
+        Args:
+            key: Coalescing key
+            fn: Function returning the event iterator
+
+        Yields:
+            Tuples of (event, shared); ``shared`` is True for followers
+        """
+        with self._lock:
+            call = self._streams.get(key)
+            # A stream whose subscribers all left is being stopped; start afresh
+            if call is not None and call.subscribers > 0:
+                call.followers += 1
+                self._stats['coalesced'] += 1
+                with call.condition:
+                    call.subscribers += 1
+                shared = True
+            else:
+                call = _StreamCall()
+                self._streams[key] = call
+                self._stats['leaders'] += 1
+                shared = False
+
+        if not shared:
+            threading.Thread(
+                target=self._produce, args=(key, call, fn),
+                name="singleflight-stream", daemon=True
+            ).start()
+
+        index = 0
+        try:
+            while True:
+                with call.condition:
+                    while index >= len(call.events) and not call.finished:
+                        call.condition.wait()
+                    pending = call.events[index:]
+                    finished = call.finished
+                for event in pending:
+                    yield event, shared
+                index += len(pending)
+                if finished and index >= len(call.events):
+                    break
+        finally:
+            with call.condition:
+                call.subscribers -= 1
+
+        if call.error is not None:
+            raise call.error
+
+    def _produce(self, key: Hashable, call: _StreamCall, fn: Callable[[], Iterator[Any]]):
+        """Drain the source iterator into the shared buffer."""
+        source = fn()
+        try:
+            for event in source:
+                with call.condition:
+                    call.events.append(event)
+                    call.condition.notify_all()
+                    abandoned = call.subscribers == 0
+                if abandoned:
+                    self.logger.info("All stream subscribers left; stopping the stream")
+                    if hasattr(source, 'close'):
+                        source.close()
+                    break
+        except BaseException as e:
+            self.logger.error(f"Error in coalesced stream: {e}")
+            call.error = e
+        finally:
+            # Unregister before finishing so late arrivals start a fresh stream
+            with self._lock:
+                if self._streams.get(key) is call:
+                    del self._streams[key]
+            with call.condition:
+                call.finished = True
+                call.condition.notify_all()
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get coalescing counters.
+
+        Returns:
+            Dictionary with leader, coalesced and in-flight counts
+        """
+        with self._lock:
+            return {
+                'leaders': self._stats['leaders'],
+                'coalesced': self._stats['coalesced'],
+                'in_flight': len(self._calls) + len(self._streams) + len(self._async_calls)
+            }
@@ -1,9 +1,11 @@
 import streamlit as st
 import requests
 import os
+import json
 from io import StringIO
 
 API_URL = "http://localhost:8000/ask"
+STREAM_URL = "http://localhost:8000/ask/stream"
 UPLOAD_URL = "http://localhost:8000/upload"
 
 # --- Custom CSS for modern look ---
@@ -51,11 +53,54 @@ model_name = st.selectbox("Choose Ollama Model", model_options, index=0)
 st.markdown('<div class="question-section">', unsafe_allow_html=True)
 st.subheader("💬 Ask a Question")
 question = st.text_input("Enter your question:", "What is artificial intelligence?")
+stream_answer = st.checkbox("Stream answer", value=True)
 ask = st.button("Ask")
 st.markdown('</div>', unsafe_allow_html=True)
 
+def iter_sse_events(response):
+    """Parse a server-sent event stream into (event, data) pairs."""
+    event_name, data_lines = "message", []
+    for line in response.iter_lines(decode_unicode=True):
+        if line is None:
+            continue
+        if line == "":
+            if data_lines:
+                yield event_name, json.loads("\n".join(data_lines))
+            event_name, data_lines = "message", []
+        elif line.startswith("event:"):
+            event_name = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            data_lines.append(line[len("data:"):].strip())
+
 # --- Answer Section & Chat History ---
-if ask and question.strip():
+if ask and question.strip() and stream_answer:
+    payload = {"question": question, "model_name": model_name}
+    placeholder = st.empty()
+    placeholder.markdown("_Thinking..._")
+    tokens = []
+    final = None
+    with requests.post(STREAM_URL, json=payload, stream=True) as response:
+        if response.status_code == 200:
+            for event_name, data in iter_sse_events(response):
+                if event_name == "token":
+                    tokens.append(data["token"])
+                    placeholder.markdown(f"**A:** {''.join(tokens)}▌")
+                elif event_name == "done":
+                    final = data
+                elif event_name == "error":
+                    st.error(f"Error: {data['message']}")
+        else:
+            st.error(f"Error: {response.status_code} - {response.text}")
+    if final is not None:
+        st.session_state.chat_history.clear()
+        st.session_state.chat_history.append({
+            "question": question,
+            "answer": final["answer"],
+            "sources": final["sources"],
+            "processing_time": final["processing_time"]
+        })
+        st.rerun()
+elif ask and question.strip():
     with st.spinner("Thinking..."):
         payload = {"question": question, "model_name": model_name}
         response = requests.post(API_URL, json=payload)
@@ -0,0 +1,279 @@
+"""
+Synonym Engine for Module 3: Question-Answering Engine
+
+This module expands queries with synonyms. The synonym dictionary (phrase to
+alternatives) is loaded from a JSON file or given directly, and its phrases
+are compiled into an Aho-Corasick automaton, so every single- or multi-word
+phrase in a query is found in one pass over the text. Matches must fall on
+word boundaries, and overlapping matches resolve to the leftmost, longest
+phrase. Each variation records the phrase and synonym that produced it, so
+retrieval can report which dictionary entries find new chunks.
+"""
+
+import os
+import json
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+# Path of a JSON synonym file used when none is configured
+SYNONYMS_PATH_ENV = 'RAG_SYNONYMS_PATH'
+
+DEFAULT_SYNONYMS = {
+    'ai': ['artificial intelligence', 'machine learning'],
+    'ml': ['machine learning', 'artificial intelligence'],
+    'nlp': ['natural language processing', 'text processing'],
+    'deep learning': ['neural networks', 'ai'],
+    'algorithm': ['method', 'technique', 'approach'],
+    'research centres': ['research organizations', 'AI labs', 'institutes', 'research labs'],
+    'research centers': ['research organizations', 'AI labs', 'institutes', 'research labs'],
+    'research organizations': ['research centres', 'AI labs', 'institutes', 'research labs'],
+    'labs': ['research centres', 'research organizations', 'institutes', 'AI labs']
+}
+
+
+def load_synonyms(path: str) -> Dict[str, List[str]]:
+    """
+    Load a synonym dictionary from a JSON file.
+
+    The file holds one object mapping each phrase to a list of
+    alternatives, e.g. ``{"ml": ["machine learning"]}``.
+
+    Args:
+        path: Path to the JSON file
+
+    Returns:
+        Dictionary of phrase to alternatives
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError(f"Synonym file {path} must contain a JSON object")
+    return {str(phrase): [str(alt) for alt in alternatives] for phrase, alternatives in data.items()}
+
+
+@dataclass(frozen=True)
+class PhraseMatch:
+    """Data class for a dictionary phrase found in a text."""
+    start: int
+    end: int
+    phrase: str
+
+
+@dataclass(frozen=True)
+class Variation:
+    """Data class for a query variation and the substitution that produced it."""
+    text: str
+    phrase: str
+    synonym: str
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton over a fixed set of phrases.
+
+    States are kept in parallel lists: outgoing transitions per state, the
+    failure link, and the lengths of phrases ending at the state.
+    """
+
+    def __init__(self, phrases: Iterable[str]):
+        """
+        Build the automaton.
+
+        Args:
+            phrases: Phrases to match (matched case-sensitively; lowercase them first)
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[str]] = [[]]
+        for phrase in phrases:
+            if phrase:
+                self._add(phrase)
+        self._build_failure_links()
+
+    def _add(self, phrase: str):
+        state = 0
+        for char in phrase:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(phrase)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state].extend(self._output[self._fail[next_state]])
+
+    def iter_matches(self, text: str) -> Iterable[PhraseMatch]:
+        """
+        Yield every occurrence of every phrase, including overlapping ones.
+
+        Args:
+            text: Text to scan
+
+        Yields:
+            Matches in order of their end position
+        """
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for phrase in self._output[state]:
+                yield PhraseMatch(start=index + 1 - len(phrase), end=index + 1, phrase=phrase)
+
+    @property
+    def state_count(self) -> int:
+        return len(self._goto)
+
+
+class SynonymEngine:
+    """
+    Finds dictionary phrases in queries and builds synonym variations.
+
+    Features:
+    - Dictionary loaded from a JSON file or given directly
+    - Single-pass matching of single- and multi-word phrases
+    - Word-boundary and leftmost-longest match resolution
+    - Variation cap
+    """
+
+    def __init__(self, synonyms: Dict[str, List[str]] = None):
+        """
+        Initialize the synonym engine.
+
+        Args:
+            synonyms: Dictionary of phrase to alternatives (default: built-in dictionary)
+        """
+        self.logger = logging.getLogger(__name__)
+        if synonyms is None:
+            synonyms = DEFAULT_SYNONYMS
+        self.synonyms: Dict[str, List[str]] = {}
+        for phrase, alternatives in synonyms.items():
+            key = ' '.join(phrase.lower().split())
+            if key:
+                merged = self.synonyms.setdefault(key, [])
+                merged.extend(alt for alt in alternatives if alt not in merged)
+        self.automaton = AhoCorasick(self.synonyms)
+
+    @classmethod
+    def from_file(cls, path: str) -> 'SynonymEngine':
+        """
+        Build an engine from a JSON synonym file.
+
+        Args:
+            path: Path to the JSON file
+
+        Returns:
+            Synonym engine
+        """
+        return cls(load_synonyms(path))
+
+    @classmethod
+    def from_config(cls, path: Optional[str] = None) -> 'SynonymEngine':
+        """
+        Build an engine from a path, the RAG_SYNONYMS_PATH environment
+        variable, or the built-in dictionary, in that order.
+
+        Args:
+            path: Path to a JSON synonym file (optional)
+
+        Returns:
+            Synonym engine
+        """
+        path = path or os.environ.get(SYNONYMS_PATH_ENV)
+        if not path:
+            return cls()
+        try:
+            engine = cls.from_file(path)
+            engine.logger.info(f"Loaded {len(engine.synonyms)} synonym entries from {path}")
+            return engine
+        except (OSError, ValueError) as e:
+            logging.getLogger(__name__).error(f"Error loading synonyms from {path}: {e}")
+            return cls()
+
+    def find_phrases(self, text: str) -> List[PhraseMatch]:
+        """
+        Find non-overlapping dictionary phrases on word boundaries.
+
+        Args:
+            text: Lowercased text
+
+        Returns:
+            Matches ordered by position
+        """
+        candidates = [
+            match for match in self.automaton.iter_matches(text)
+            if (match.start == 0 or not text[match.start - 1].isalnum())
+            and (match.end == len(text) or not text[match.end].isalnum())
+        ]
+        candidates.sort(key=lambda m: (m.start, -(m.end - m.start)))
+        selected = []
+        last_end = -1
+        for match in candidates:
+            if match.start >= last_end:
+                selected.append(match)
+                last_end = match.end
+        return selected
+
+    def expand(self, text: str, max_variations: int) -> List[str]:
+        """
+        Build variations by replacing one matched phrase with a synonym.
+
+        Args:
+            text: Lowercased text
+            max_variations: Maximum number of variations to return
+
+        Returns:
+            Variations, excluding the text itself
+        """
+        return [variation.text for variation in self.expand_variations(text, max_variations)]
+
+    def expand_variations(self, text: str, max_variations: int) -> List[Variation]:
+        """
+        Build variations with the phrase and synonym behind each.
+
+        Synonyms are taken round-robin across matched phrases, so a cap does
+        not spend every slot on the first phrase.
+
+        Args:
+            text: Lowercased text
+            max_variations: Maximum number of variations to return
+
+        Returns:
+            Variations, excluding the text itself
+        """
+        if max_variations <= 0:
+            return []
+        matches = self.find_phrases(text)
+        variations: List[Variation] = []
+        seen = {text}
+        rank = 0
+        while matches and len(variations) < max_variations:
+            remaining = [m for m in matches if rank < len(self.synonyms[m.phrase])]
+            if not remaining:
+                break
+            for match in remaining:
+                synonym = self.synonyms[match.phrase][rank]
+                variation = text[:match.start] + synonym + text[match.end:]
+                if variation not in seen:
+                    seen.add(variation)
+                    variations.append(Variation(text=variation, phrase=match.phrase, synonym=synonym))
+                    if len(variations) >= max_variations:
+                        break
+            rank += 1
+        return variations
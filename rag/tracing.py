@@ -0,0 +1,191 @@
+"""
+Tracing for Module 3: Question-Answering Engine
+
+This module records per-stage timings for a request. A trace holds a list of
+spans (query processing, retrieval, context building, generation,
+formatting, ...) with their durations and counts, and can be attached to the
+result metadata. When OpenTelemetry is installed and enabled, every span is
+also exported as an OpenTelemetry span under one root span per request.
+"""
+
+import time
+import logging
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from dataclasses import dataclass, field
+
+
+@dataclass
+class Span:
+    """Data class for one timed stage."""
+    name: str
+    start: float
+    end: Optional[float] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end if self.end is not None else time.perf_counter()
+        return (end - self.start) * 1000.0
+
+    def set(self, key: str, value: Any):
+        """Attach a count or other attribute to the span."""
+        self.attributes[key] = value
+
+
+class Trace:
+    """
+    Spans recorded for one request.
+
+    Spans are recorded in order; a trace is used by one thread at a time,
+    so no locking is needed.
+    """
+
+    def __init__(self, name: str, otel_tracer=None, on_finish: Callable[[Dict], None] = None):
+        """
+        Start a trace.
+
+        Args:
+            name: Trace (root span) name
+            otel_tracer: OpenTelemetry tracer to export spans to (optional)
+            on_finish: Called with the summary when the trace finishes (optional)
+        """
+        self.name = name
+        self._on_finish = on_finish
+        self.start = time.perf_counter()
+        self.spans: List[Span] = []
+        self.end: Optional[float] = None
+        self._otel_tracer = otel_tracer
+        self._otel_root = otel_tracer.start_span(name) if otel_tracer is not None else None
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Span]:
+        """
+        Time a stage.
+
+        Args:
+            name: Stage name
+            attributes: Initial attributes
+
+        Yields:
+            The span, so counts can be attached while the stage runs
+        """
+        span = Span(name=name, start=time.perf_counter(), attributes=dict(attributes))
+        self.spans.append(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set('error', str(e) or type(e).__name__)
+            raise
+        finally:
+            span.end = time.perf_counter()
+            self._export(span)
+
+    def record(self, name: str, duration: float, **attributes) -> Span:
+        """
+        Add a span measured elsewhere, e.g. by Ollama.
+
+        Args:
+            name: Stage name
+            duration: Duration in seconds
+            attributes: Span attributes
+
+        Returns:
+            The recorded span
+        """
+        end = time.perf_counter()
+        span = Span(name=name, start=end - duration, end=end, attributes=dict(attributes))
+        self.spans.append(span)
+        self._export(span)
+        return span
+
+    def finish(self) -> Dict:
+        """
+        End the trace and return its summary.
+
+        Returns:
+            Dictionary with total and per-stage durations
+        """
+        if self.end is not None:
+            return self.to_dict()
+        self.end = time.perf_counter()
+        if self._otel_root is not None:
+            self._otel_root.end()
+        summary = self.to_dict()
+        if self._on_finish is not None:
+            try:
+                self._on_finish(summary)
+            except Exception as e:
+                logging.getLogger(__name__).debug(f"Trace finish hook failed: {e}")
+        return summary
+
+    def to_dict(self) -> Dict:
+        """Summary suitable for result metadata."""
+        end = self.end if self.end is not None else time.perf_counter()
+        return {
+            'total_ms': (end - self.start) * 1000.0,
+            'stages': [
+                dict(name=span.name, duration_ms=span.duration_ms, **span.attributes)
+                for span in self.spans
+            ]
+        }
+
+    def _export(self, span: Span):
+        """Export a finished span to OpenTelemetry."""
+        if self._otel_tracer is None:
+            return
+        try:
+            from opentelemetry import trace as otel_trace
+            context = otel_trace.set_span_in_context(self._otel_root)
+            # Convert perf_counter offsets to wall-clock nanoseconds
+            offset = time.time_ns() - int(time.perf_counter() * 1e9)
+            otel_span = self._otel_tracer.start_span(
+                span.name, context=context, start_time=int(span.start * 1e9) + offset
+            )
+            for key, value in span.attributes.items():
+                if isinstance(value, (str, bool, int, float)):
+                    otel_span.set_attribute(key, value)
+            otel_span.end(end_time=int(span.end * 1e9) + offset)
+        except Exception as e:
+            logging.getLogger(__name__).debug(f"OpenTelemetry export failed: {e}")
+
+
+class Tracer:
+    """
+    Creates request traces.
+
+    OpenTelemetry is imported lazily and only used when enabled; without it
+    traces are still recorded into result metadata.
+    """
+
+    def __init__(self, enable_opentelemetry: bool = False, service_name: str = "ragbot",
+                 on_finish: Callable[[Dict], None] = None):
+        """
+        Initialize the tracer.
+
+        Args:
+            enable_opentelemetry: Export spans through OpenTelemetry if installed
+            service_name: Instrumentation name for the OpenTelemetry tracer
+            on_finish: Called with each trace summary when it finishes (optional)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.on_finish = on_finish
+        self._otel_tracer = None
+        if enable_opentelemetry:
+            try:
+                from opentelemetry import trace as otel_trace
+                self._otel_tracer = otel_trace.get_tracer(service_name)
+            except ImportError:
+                self.logger.warning("OpenTelemetry not installed; spans are kept in metadata only")
+
+    def start_trace(self, name: str) -> Trace:
+        """
+        Start a trace for one request.
+
+        Args:
+            name: Trace name
+
+        Returns:
+            New trace
+        """
+        return Trace(name, self._otel_tracer, self.on_finish)
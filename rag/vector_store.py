@@ -4,12 +4,17 @@ from typing import List, Dict, Any, Optional
 import logging
 import uuid
 
+from .embedding_service import default_embedding_function
+
 class VectorStore:
     """Manages vector database operations using ChromaDB"""
     
-    def __init__(self, db_path: str = 'D:/rag_system/vector_db', collection_name: str = 'rag_documents'):
+    def __init__(self, db_path: str = 'D:/rag_system/vector_db', collection_name: str = 'rag_documents',
+                 embedding_function=None):
         self.db_path = db_path
         self.collection_name = collection_name
+        # None falls back to the backend selected by RAG_EMBEDDING_BACKEND, then Chroma's default
+        self.embedding_function = embedding_function or default_embedding_function()
         self.logger = logging.getLogger(__name__)
         self.client = None
         self.collection = None
@@ -29,16 +34,24 @@ class VectorStore:
             
             # Get or create collection
             try:
-                self.collection = self.client.get_collection(name=self.collection_name)
+                self.collection = self.client.get_collection(name=self.collection_name,
+                                                             **self._collection_kwargs())
                 self.logger.info(f"Connected to existing collection: {self.collection_name}")
             except:
-                self.collection = self.client.create_collection(name=self.collection_name)
+                self.collection = self.client.create_collection(name=self.collection_name,
+                                                                **self._collection_kwargs())
                 self.logger.info(f"Created new collection: {self.collection_name}")
             
         except Exception as e:
             self.logger.error(f"Failed to initialize vector database: {e}")
             raise
     
+    def _collection_kwargs(self) -> Dict[str, Any]:
+        """Collection arguments; only pass an embedding function when one is configured"""
+        if self.embedding_function is None:
+            return {}
+        return {'embedding_function': self.embedding_function}
+    
     def store_documents(self, chunks: List[Dict[str, Any]], embeddings: List, batch_size: int = 5000) -> int:
         if not chunks or not embeddings:
             self.logger.warning("No chunks or embeddings to store")
@@ -115,14 +128,19 @@ class VectorStore:
             self.logger.error(f"Error searching vector database: {e}")
             return []
     
-    def search_by_text(self, query_text: str, top_k: int = 5) -> List[Dict[str, Any]]:
+    def search_by_text(self, query_text: str, top_k: int = 5,
+                       include_embeddings: bool = False) -> List[Dict[str, Any]]:
         """Search using text query (will generate embedding internally)"""
         try:
+            include = ['documents', 'metadatas', 'distances']
+            if include_embeddings:
+                include.append('embeddings')
+            
             # Search using text query
             results = self.collection.query(
                 query_texts=[query_text],
                 n_results=top_k,
-                include=['documents', 'metadatas', 'distances']
+                include=include
             )
             
             # Format results
@@ -135,6 +153,8 @@ class VectorStore:
                         'distance': results['distances'][0][i],
                         'similarity': 1 - results['distances'][0][i]
                     }
+                    if include_embeddings and results.get('embeddings') is not None:
+                        result['embedding'] = results['embeddings'][0][i]
                     formatted_results.append(result)
             
             return formatted_results
@@ -143,6 +163,58 @@ class VectorStore:
             self.logger.error(f"Error searching by text: {e}")
             return []
     
+    def search_by_texts(self, query_texts: List[str], top_k: int = 5,
+                        include_embeddings: bool = False) -> List[List[Dict[str, Any]]]:
+        """Search many text queries in one call (embedded together); one result list per query"""
+        if not query_texts:
+            return []
+        try:
+            return self._query_many(len(query_texts), top_k, include_embeddings,
+                                    query_texts=query_texts)
+        except Exception as e:
+            self.logger.error(f"Error searching by texts: {e}")
+            return [[] for _ in query_texts]
+    
+    def search_by_embeddings(self, query_embeddings, top_k: int = 5,
+                             include_embeddings: bool = False) -> List[List[Dict[str, Any]]]:
+        """Search many precomputed query embeddings in one call; one result list per query"""
+        if len(query_embeddings) == 0:
+            return []
+        try:
+            query_embeddings = [e.tolist() if hasattr(e, 'tolist') else list(e) for e in query_embeddings]
+            return self._query_many(len(query_embeddings), top_k, include_embeddings,
+                                    query_embeddings=query_embeddings)
+        except Exception as e:
+            self.logger.error(f"Error searching by embeddings: {e}")
+            return [[] for _ in query_embeddings]
+    
+    def _query_many(self, query_count: int, top_k: int, include_embeddings: bool,
+                    **query) -> List[List[Dict[str, Any]]]:
+        """Run one collection query and format the hits of each query"""
+        include = ['documents', 'metadatas', 'distances']
+        if include_embeddings:
+            include.append('embeddings')
+        
+        results = self.collection.query(n_results=top_k, include=include, **query)
+        
+        all_results = []
+        for q in range(query_count):
+            formatted_results = []
+            documents = results['documents'][q] if results['documents'] else []
+            for i in range(len(documents)):
+                result = {
+                    'content': documents[i],
+                    'metadata': results['metadatas'][q][i],
+                    'distance': results['distances'][q][i],
+                    'similarity': 1 - results['distances'][q][i]
+                }
+                if include_embeddings and results.get('embeddings') is not None:
+                    result['embedding'] = results['embeddings'][q][i]
+                formatted_results.append(result)
+            all_results.append(formatted_results)
+        
+        return all_results
+    
     def get_collection_info(self) -> Dict[str, Any]:
         """Get information about the collection"""
         try:
@@ -160,7 +232,8 @@ class VectorStore:
         """Clear all documents from the collection"""
         try:
             self.client.delete_collection(name=self.collection_name)
-            self.collection = self.client.create_collection(name=self.collection_name)
+            self.collection = self.client.create_collection(name=self.collection_name,
+                                                            **self._collection_kwargs())
             self.logger.info(f"Cleared collection: {self.collection_name}")
         except Exception as e:
             self.logger.error(f"Error clearing collection: {e}")
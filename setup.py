@@ -10,5 +10,7 @@ setup(
         "streamlit",
         "langchain",
         "chromadb",
+        "httpx",
+        "numpy",
     ],
 ) 
\ No newline at end of file
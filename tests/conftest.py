@@ -0,0 +1,17 @@
+import pytest
+
+from rag.fake_ollama import FakeOllamaConfig, FakeOllamaServer
+
+
+@pytest.fixture
+def fake_ollama():
+    """Fast, deterministic fake Ollama server on a free port."""
+    server = FakeOllamaServer(port=0, config=FakeOllamaConfig(
+        time_to_first_token=0.0,
+        tokens_per_second=0.0,
+        jitter=0.0,
+        canned_answers={'Question:': 'Machine learning is a subset of AI.'},
+        seed=0
+    )).start()
+    yield server
+    server.stop()
@@ -0,0 +1,91 @@
+import socket
+import time
+
+from rag.answer_generator import AnswerGenerator
+from rag.fake_ollama import FakeOllamaConfig, FakeOllamaServer
+from rag.retrieval_engine import RetrievalResult
+
+CONTEXT = "Machine learning is a subset of AI."
+LONG_ANSWER = " ".join(f"word{i}" for i in range(40))
+
+
+def test_stream_ends_at_the_deadline():
+    server = FakeOllamaServer(port=0, config=FakeOllamaConfig(
+        time_to_first_token=0.0, tokens_per_second=20.0, jitter=0.0,
+        canned_answers={'Question:': LONG_ANSWER}
+    )).start()
+    try:
+        generator = AnswerGenerator(ollama_url=server.url, model_name='mistral:7b')
+        start = time.monotonic()
+        stream = generator.stream_answer("What is machine learning?", CONTEXT,
+                                         expires_at=start + 0.3)
+        tokens = list(stream)
+
+        assert time.monotonic() - start < 1.0
+        assert stream.finish_reason == 'deadline'
+        assert 0 < len(tokens) < 40
+        assert stream.answer.answer.startswith('word0')
+        assert stream.answer.generation_stats == {'done_reason': 'deadline'}
+    finally:
+        server.stop()
+
+
+def test_stream_without_deadline_runs_to_completion(fake_ollama):
+    generator = AnswerGenerator(ollama_url=fake_ollama.url, model_name='mistral:7b')
+    stream = generator.stream_answer("What is machine learning?", CONTEXT)
+
+    assert ''.join(stream).strip() == 'Machine learning is a subset of AI.'
+    assert stream.finish_reason == 'done'
+
+
+def test_stream_yields_the_fallback_when_ollama_is_down():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    generator = AnswerGenerator(ollama_url=f"http://127.0.0.1:{port}", model_name='mistral:7b')
+    stream = generator.stream_answer("What is machine learning?", CONTEXT)
+    tokens = list(stream)
+
+    assert tokens == [stream.answer.answer]
+    assert stream.answer.answer.startswith("I apologize")
+    assert stream.finish_reason == 'error'
+    assert stream.time_to_first_token is not None
+
+
+def make_chunk(content, similarity=0.9):
+    return RetrievalResult(content=content, file_name="ml.txt", chunk_index=0,
+                           similarity_score=similarity, metadata={}, source_path="ml.txt")
+
+
+CHUNK = make_chunk("# Overview\nMachine learning is a subset of artificial intelligence. "
+                   "It finds patterns in data.\nThe weather today is sunny and warm.")
+
+
+def test_extractive_answer_quotes_the_best_sentence_with_its_span():
+    generator = AnswerGenerator(model_name='mistral:7b')
+    answer = generator.generate_extractive_answer("What is machine learning?", [CHUNK])
+
+    assert answer.answer == "Machine learning is a subset of artificial intelligence."
+    assert answer.answer_type == 'extractive'
+    assert answer.sources_used == ['ml.txt']
+    span = answer.source_spans[0]
+    assert CHUNK.content[span['start']:span['end']] == answer.answer
+    assert answer.confidence == 1.0
+
+
+def test_extractive_answer_without_sentences_has_zero_confidence():
+    generator = AnswerGenerator(model_name='mistral:7b')
+    answer = generator.generate_extractive_answer("What is machine learning?",
+                                                  [make_chunk("# Heading only")])
+    assert answer.confidence == 0.0
+    assert answer.source_spans is None
+
+
+def test_extractive_path_needs_a_definition_question_and_a_strong_match():
+    generator = AnswerGenerator(model_name='mistral:7b')
+    definition = generator.query_processor.process_query("What is machine learning?")
+    comparison = generator.query_processor.process_query("Compare supervised and unsupervised learning")
+
+    assert generator.should_answer_extractively(definition, [CHUNK])
+    assert not generator.should_answer_extractively(definition, [make_chunk(CHUNK.content, 0.5)])
+    assert not generator.should_answer_extractively(comparison, [CHUNK])
@@ -0,0 +1,93 @@
+import numpy as np
+
+from rag.answer_cache import AnswerCache
+from rag.fake_embedder import HashEmbedder
+from rag.semantic_cache import SemanticCache
+
+
+def make_answer_cache(tmp_path, **kwargs):
+    return AnswerCache(db_path=str(tmp_path / 'answers.sqlite3'), **kwargs)
+
+
+def test_answer_cache_round_trip(tmp_path):
+    cache = make_answer_cache(tmp_path)
+    key = AnswerCache.make_key('what is ai', 'mistral:7b')
+    assert cache.get(key, 0) is None
+
+    cache.put(key, 0, {'answer': 'AI is ...'})
+    entry = cache.get(key, 0)
+    assert entry['payload'] == {'answer': 'AI is ...'}
+    assert entry['hits'] == 1
+    assert cache.get_stats()['hit_ratio'] == 0.5
+
+
+def test_answer_cache_bump_invalidates_older_entries(tmp_path):
+    cache = make_answer_cache(tmp_path)
+    key = AnswerCache.make_key('what is ai')
+    cache.put(key, 0, {'answer': 'old'})
+
+    assert cache.bump_corpus_version() == 1
+    assert cache.get(key, 1) is None
+    assert cache.get_stats()['entries'] == 0
+    # The version is persisted and shared through the database file
+    assert make_answer_cache(tmp_path).get_corpus_version() == 1
+
+
+def test_answer_cache_ttl_and_lru_eviction(tmp_path):
+    cache = make_answer_cache(tmp_path, max_entries=2)
+    for name in ('a', 'b'):
+        cache.put(name, 0, {'answer': name})
+    cache.get('a', 0)
+    cache.put('c', 0, {'answer': 'c'})
+    assert cache.get('b', 0) is None
+    assert cache.get('a', 0) is not None
+    assert cache.get_stats()['evictions'] == 1
+
+    expiring = make_answer_cache(tmp_path / 'ttl', ttl_seconds=1e-9)
+    expiring.put('a', 0, {'answer': 'a'})
+    assert expiring.get('a', 0) is None
+    assert expiring.get_stats()['expired'] == 1
+
+
+def test_semantic_cache_hits_on_similar_query_with_same_chunks():
+    embedder = HashEmbedder()
+    cache = SemanticCache(similarity_threshold=0.8)
+    chunks = frozenset({('doc.txt', 0)})
+    cache.add('what is machine learning', embedder.embed('what is machine learning'),
+              chunks, 'mistral:7b', 0, 'answer')
+
+    hit = cache.lookup(embedder.embed('what is machine learning?'), chunks, 'mistral:7b', 0)
+    assert hit is not None
+    assert hit[0].value == 'answer'
+    assert cache.lookup(embedder.embed('what is machine learning'),
+                        frozenset({('doc.txt', 1)}), 'mistral:7b', 0) is None
+    assert cache.lookup(embedder.embed('what is machine learning'), chunks, 'llama3', 0) is None
+    assert cache.lookup(embedder.embed('history of the roman empire'), chunks, 'mistral:7b', 0) is None
+
+
+def test_semantic_cache_invalidation_by_corpus_version():
+    cache = SemanticCache(similarity_threshold=0.5)
+    embedding = HashEmbedder().embed('what is ai')
+    chunks = frozenset({('doc.txt', 0)})
+    cache.add('what is ai', embedding, chunks, None, 0, 'old')
+    cache.add('what is ai', embedding, chunks, None, 1, 'new')
+
+    assert cache.invalidate_before(1) == 1
+    assert cache.lookup(embedding, chunks, None, 1)[0].value == 'new'
+    # Entries from another version are dropped on lookup as well
+    assert cache.lookup(embedding, chunks, None, 2) is None
+    assert cache.get_stats()['entries'] == 0
+
+
+def test_semantic_cache_evicts_least_recently_used():
+    cache = SemanticCache(similarity_threshold=0.99, max_entries=2)
+    vectors = np.eye(3, dtype=np.float32)
+    chunks = frozenset()
+    for index in range(2):
+        cache.add(str(index), vectors[index], chunks, None, 0, index)
+    cache.lookup(vectors[0], chunks, None, 0)
+    cache.add('2', vectors[2], chunks, None, 0, 2)
+
+    assert cache.lookup(vectors[1], chunks, None, 0) is None
+    assert cache.lookup(vectors[0], chunks, None, 0)[0].value == 0
+    assert cache.get_stats()['evictions'] == 1
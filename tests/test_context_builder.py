@@ -0,0 +1,61 @@
+import numpy as np
+
+from rag.context_builder import ContextBuilder
+from rag.retrieval_engine import RetrievalResult
+
+
+def make_result(index, similarity, embedding, rerank_score=None, content=None):
+    return RetrievalResult(
+        content=content or f"Chunk {index} talks about topic {index} in enough words to keep.",
+        file_name=f"doc{index}.txt",
+        chunk_index=index,
+        similarity_score=similarity,
+        metadata={},
+        source_path=f"doc{index}.txt",
+        embedding=np.asarray(embedding, dtype=np.float32),
+        rerank_score=rerank_score
+    )
+
+
+def test_mmr_orders_by_similarity_and_prefers_diverse_chunks():
+    builder = ContextBuilder(mmr_lambda=0.5)
+    results = [
+        make_result(0, 0.9, [1.0, 0.0, 0.0]),
+        make_result(1, 0.85, [0.8, 0.6, 0.0]),
+        make_result(2, 0.6, [0.0, 1.0, 0.0])
+    ]
+    selected = builder.diversify(results)
+    assert [r.chunk_index for r in selected] == [0, 2, 1]
+
+
+def test_mmr_drops_near_duplicates():
+    builder = ContextBuilder()
+    results = [
+        make_result(0, 0.9, [1.0, 0.0]),
+        make_result(1, 0.8, [1.0, 0.001]),
+        make_result(2, 0.5, [0.0, 1.0])
+    ]
+    assert [r.chunk_index for r in builder.diversify(results)] == [0, 2]
+
+
+def test_reranked_top_hit_stays_first():
+    builder = ContextBuilder()
+    # The cross-encoder put chunk 2 first although its bi-encoder score is lowest
+    results = [
+        make_result(2, 0.3, [0.0, 1.0, 0.0], rerank_score=8.0),
+        make_result(0, 0.9, [1.0, 0.0, 0.0], rerank_score=2.0),
+        make_result(1, 0.8, [0.0, 0.0, 1.0], rerank_score=-1.0)
+    ]
+    assert builder.diversify(results)[0].chunk_index == 2
+
+    context = builder.build_context_with_stats("question", results).text
+    assert context.index("Chunk 2") < context.index("Chunk 0")
+
+
+def test_reranked_order_is_kept_without_embeddings():
+    builder = ContextBuilder()
+    results = [make_result(2, 0.3, [], rerank_score=8.0), make_result(0, 0.9, [], rerank_score=2.0)]
+    for result in results:
+        result.embedding = None
+    context = builder.build_context_with_stats("question", results).text
+    assert context.index("Chunk 2") < context.index("Chunk 0")
@@ -0,0 +1,65 @@
+import numpy as np
+
+from rag.context_compressor import ContextCompressor
+from rag.context_packer import estimate_tokens
+from rag.retrieval_engine import RetrievalResult
+
+TOPICS = ('learning', 'weather', 'cooking')
+
+
+class KeywordEncoder:
+    """Embeds each text as a unit vector over a few topic words."""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+
+    def encode_normalized(self, texts):
+        if self.fail:
+            raise RuntimeError("encoder unavailable")
+        vectors = np.array([[float(topic in text.lower()) for topic in TOPICS] + [0.1]
+                            for text in texts], dtype=np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def make_result(index, content):
+    return RetrievalResult(content=content, file_name=f"doc{index}.txt", chunk_index=index,
+                           similarity_score=0.9, metadata={}, source_path=f"doc{index}.txt",
+                           embedding=np.ones(len(TOPICS) + 1, dtype=np.float32))
+
+
+LEARNING = ["Machine learning finds patterns in data.", "Deep learning stacks many layers."]
+RESULTS = [
+    make_result(0, "Machine learning finds patterns in data. The weather was mild that year. "
+                   "Deep learning stacks many layers."),
+    make_result(1, "Cooking pasta takes ten minutes. Rain is forecast for the weekend.")
+]
+
+
+def test_keeps_relevant_sentences_in_document_order():
+    budget = sum(estimate_tokens(sentence) for sentence in LEARNING)
+    compression = ContextCompressor(KeywordEncoder()).compress(
+        "What is machine learning?", RESULTS, token_budget=budget
+    )
+
+    assert [r.content for r in compression.results] == [" ".join(LEARNING)]
+    assert compression.sentences_kept == 2
+    assert compression.sentences_total == 5
+    assert compression.compressed_tokens < compression.original_tokens
+
+
+def test_compressed_results_get_an_embedding_of_the_kept_text():
+    compression = ContextCompressor(KeywordEncoder(), target_ratio=0.6).compress(
+        "What is machine learning?", RESULTS
+    )
+    embedding = compression.results[0].embedding
+
+    assert np.isclose(np.linalg.norm(embedding), 1.0)
+    assert np.argmax(embedding) == TOPICS.index('learning')
+
+
+def test_encoder_failure_returns_results_unchanged_with_sentence_counts():
+    compression = ContextCompressor(KeywordEncoder(fail=True)).compress("question", RESULTS)
+
+    assert compression.results == RESULTS
+    assert compression.compression_ratio == 1.0
+    assert compression.sentences_kept == compression.sentences_total == 5
@@ -0,0 +1,40 @@
+from rag.context_packer import (
+    ContextPacker, ContextPiece, TokenBudget, estimate_tokens, resolve_token_budget, split_sentences
+)
+
+SECTION = ("[Source: guide.txt]\nInstall the package first.\n"
+           "- Run the setup script. Then restart the service.\n\nCheck the logs afterwards.")
+
+
+def test_pieces_are_packed_in_rank_order_within_the_budget():
+    packer = ContextPacker()
+    pieces = [ContextPiece("First piece of context."), ContextPiece("Second piece of context.")]
+    budget = estimate_tokens(pieces[0].text) + packer.separator_tokens + estimate_tokens(pieces[1].text)
+
+    packed = packer.pack(pieces, budget)
+    assert packed.text == "First piece of context.\n\nSecond piece of context."
+    assert packed.tokens_used == budget
+    assert packed.pieces_dropped == 0
+
+    packed = packer.pack(pieces + [ContextPiece("Third.")], budget)
+    assert packed.pieces_included == 2
+    assert packed.pieces_dropped == 1
+
+
+def test_trimmed_piece_keeps_its_separators():
+    packer = ContextPacker()
+    packer.min_trimmed_tokens = 1
+    kept = SECTION[:SECTION.index(" Then")]
+    budget = sum(estimate_tokens(sentence) for sentence in split_sentences(kept))
+
+    packed = packer.pack([ContextPiece(SECTION)], budget)
+    assert packed.text == kept
+    assert packed.pieces_trimmed == 1
+    assert packed.tokens_used == estimate_tokens(kept) <= budget
+
+
+def test_token_budget_falls_back_to_the_model_family():
+    budget = resolve_token_budget('llama3:8b', {'llama3': 8192}, 2048, 512)
+    assert budget == TokenBudget(context_window=8192, answer_reserve=512)
+    assert budget.available_for_context(1000) == 8192 - 1000 - 512
+    assert resolve_token_budget('other:1b', {}, 2048, 512).available_for_context(4000) == 0
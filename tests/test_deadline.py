@@ -0,0 +1,67 @@
+import time
+
+import pytest
+
+from rag.deadline import Deadline, DeadlinePolicy, RequestTimeoutError
+
+
+def test_unbounded_deadline():
+    deadline = Deadline()
+    assert deadline.remaining() is None
+    assert deadline.expires_at is None
+    assert deadline.budget_bucket() is None
+    assert not deadline.expired
+    deadline.check('generation')
+
+
+def test_expired_deadline_fails_fast():
+    deadline = Deadline(timeout=0.01, started=time.monotonic() - 1.0)
+    assert deadline.expired
+    assert deadline.remaining() == 0.0
+    with pytest.raises(RequestTimeoutError):
+        deadline.check('generation')
+
+
+def test_budget_bucket_groups_budgets_within_a_factor_of_two():
+    now = time.monotonic()
+    assert Deadline(timeout=5.0, started=now).budget_bucket() == \
+        Deadline(timeout=7.0, started=now).budget_bucket()
+    assert Deadline(timeout=5.0, started=now).budget_bucket() != \
+        Deadline(timeout=20.0, started=now).budget_bucket()
+
+
+def test_retrieval_limits_shrink_with_the_budget():
+    policy = DeadlinePolicy(full_retrieval_seconds=10.0, min_top_k=2)
+    assert policy.retrieval_limits(None, 10, 4) == (10, 4)
+    assert policy.retrieval_limits(Deadline(timeout=30.0), 10, 4) == (10, 4)
+    top_k, variations = policy.retrieval_limits(Deadline(timeout=5.0), 10, 4)
+    assert top_k == 5
+    assert variations == 2
+    assert policy.retrieval_limits(Deadline(timeout=0.1), 10, 4) == (2, 1)
+
+
+def test_skip_rerank_only_under_a_tight_budget():
+    policy = DeadlinePolicy(skip_rerank_seconds=5.0)
+    assert not policy.skip_rerank(None)
+    assert not policy.skip_rerank(Deadline(timeout=30.0))
+    assert policy.skip_rerank(Deadline(timeout=1.0))
+
+
+def test_num_predict_fits_the_remaining_budget():
+    policy = DeadlinePolicy(generation_tokens_per_second=10.0, prompt_tokens_per_second=100.0,
+                            min_answer_tokens=32, max_answer_tokens=500)
+    assert policy.num_predict(None) is None
+    assert policy.num_predict(Deadline(timeout=1000.0)) == 500
+    assert policy.num_predict(Deadline(timeout=1000.0), max_tokens=200) == 200
+    # 10s minus 5s of prompt evaluation leaves about 50 tokens
+    assert 45 <= policy.num_predict(Deadline(timeout=10.0), prompt_tokens=500) <= 50
+    assert policy.num_predict(Deadline(timeout=0.1)) == 32
+
+
+def test_describe_reports_degraded_stages():
+    policy = DeadlinePolicy()
+    deadline = Deadline(timeout=5.0)
+    deadline.degrade('rerank')
+    deadline.degrade('rerank')
+    assert policy.describe(Deadline()) is None
+    assert policy.describe(deadline)['degraded'] == ['rerank']
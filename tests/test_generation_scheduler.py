@@ -0,0 +1,175 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from rag.generation_scheduler import (
+    DeadlineExceededError, GenerationScheduler, Priority, QueueFullError
+)
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.005)
+
+
+def test_interactive_requests_are_served_before_batch():
+    scheduler = GenerationScheduler(max_concurrency=1, max_queue=4, queue_timeouts={})
+    order = []
+
+    def request(priority):
+        with scheduler.slot(priority):
+            order.append(priority)
+
+    with scheduler.slot():
+        batch = threading.Thread(target=request, args=(Priority.BATCH,))
+        batch.start()
+        wait_until(lambda: scheduler.get_stats()['queue_depth'] == 1)
+        interactive = threading.Thread(target=request, args=(Priority.INTERACTIVE,))
+        interactive.start()
+        wait_until(lambda: scheduler.get_stats()['queue_depth'] == 2)
+    batch.join()
+    interactive.join()
+
+    assert order == [Priority.INTERACTIVE, Priority.BATCH]
+
+
+def test_full_queue_is_rejected_with_retry_hint():
+    scheduler = GenerationScheduler(max_concurrency=1, max_queue=0)
+    with scheduler.slot():
+        with pytest.raises(QueueFullError) as excinfo:
+            with scheduler.slot():
+                pass
+    assert excinfo.value.retry_after > 0
+    assert scheduler.get_stats()['rejected_queue_full'] == 1
+
+
+def test_queued_request_that_would_miss_its_deadline_is_dropped():
+    scheduler = GenerationScheduler(max_concurrency=1, max_queue=4)
+    # Observed service time (5s by default) exceeds the remaining budget
+    with scheduler.slot():
+        with pytest.raises(DeadlineExceededError):
+            with scheduler.slot(deadline=time.monotonic() + 0.5):
+                pass
+    stats = scheduler.get_stats()
+    assert stats['dropped_deadline'] == 1
+    assert stats['queue_depth'] == 0
+
+
+def test_check_admission_reserves_nothing():
+    scheduler = GenerationScheduler(max_concurrency=1, max_queue=0)
+    scheduler.check_admission()
+    assert scheduler.get_stats()['active'] == 0
+    with scheduler.slot():
+        with pytest.raises(QueueFullError):
+            scheduler.check_admission()
+
+
+def test_async_waiters_queue_in_priority_order_without_threads():
+    scheduler = GenerationScheduler(max_concurrency=1, max_queue=32, queue_timeouts={})
+    order = []
+
+    async def request(priority):
+        async with scheduler.slot_async(priority):
+            order.append(priority)
+
+    async def main():
+        threads = threading.active_count()
+        async with scheduler.slot_async():
+            tasks = [asyncio.ensure_future(request(Priority.BATCH)) for _ in range(29)]
+            tasks += [asyncio.ensure_future(request(Priority.INTERACTIVE)) for _ in range(3)]
+            tasks += [asyncio.ensure_future(request(Priority.BATCH)) for _ in range(11)]
+            await asyncio.sleep(0.01)
+            assert scheduler.get_stats()['queue_depth'] == 32
+            assert threading.active_count() == threads
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    outcomes = asyncio.run(main())
+    assert sum(isinstance(o, QueueFullError) for o in outcomes) == 11
+    assert order[:3] == [Priority.INTERACTIVE] * 3
+    assert len(order) == 32
+    assert scheduler.get_stats()['active'] == 0
+
+
+def test_async_waiter_that_would_miss_its_deadline_is_dropped():
+    scheduler = GenerationScheduler(max_concurrency=1, max_queue=4)
+
+    async def main():
+        async with scheduler.slot_async():
+            with pytest.raises(DeadlineExceededError):
+                async with scheduler.slot_async(deadline=time.monotonic() + 0.5):
+                    pass
+        return scheduler.get_stats()
+
+    stats = asyncio.run(main())
+    assert stats['dropped_deadline'] == 1
+    assert stats['queue_depth'] == 0
+
+
+def test_cancelled_async_waiter_gives_up_its_place():
+    scheduler = GenerationScheduler(max_concurrency=1, max_queue=4, queue_timeouts={})
+
+    async def wait_for_slot():
+        async with scheduler.slot_async():
+            pass
+
+    async def main():
+        async with scheduler.slot_async():
+            waiter = asyncio.ensure_future(wait_for_slot())
+            await asyncio.sleep(0.01)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+            assert scheduler.get_stats()['queue_depth'] == 0
+        async with scheduler.slot_async() as wait_time:
+            assert wait_time == 0.0
+
+    asyncio.run(main())
+    assert scheduler.get_stats()['active'] == 0
+
+
+def test_threads_and_coroutines_share_one_queue():
+    scheduler = GenerationScheduler(max_concurrency=1, max_queue=4, queue_timeouts={})
+    order = []
+
+    def threaded():
+        with scheduler.slot(Priority.BATCH):
+            order.append('thread')
+
+    async def main():
+        with scheduler.slot():
+            thread = threading.Thread(target=threaded)
+            thread.start()
+            wait_until(lambda: scheduler.get_stats()['queue_depth'] == 1)
+
+            async def coroutine():
+                async with scheduler.slot_async(Priority.INTERACTIVE):
+                    order.append('coroutine')
+
+            task = asyncio.ensure_future(coroutine())
+            await asyncio.sleep(0.01)
+            assert scheduler.get_stats()['queue_depth'] == 2
+        await task
+        thread.join()
+
+    asyncio.run(main())
+    assert order == ['coroutine', 'thread']
+
+
+def test_concurrency_limit_is_per_healthy_backend():
+    healthy = [2]
+    scheduler = GenerationScheduler(max_concurrency=2, max_queue=0,
+                                    backends=lambda: healthy[0])
+    assert scheduler.get_stats()['concurrency_limit'] == 4
+
+    healthy[0] = 1
+    with scheduler.slot(), scheduler.slot():
+        with pytest.raises(QueueFullError):
+            scheduler.check_admission()
+
+    healthy[0] = 0
+    assert scheduler.get_stats()['concurrency_limit'] == 2
@@ -0,0 +1,53 @@
+import time
+
+from rag.load_shedding import LoadShedder, LoadTier
+
+
+def make_shedder(signals, recovery_seconds=0.05):
+    return LoadShedder(lambda: dict(signals), queue_depths=(2, 4, 6),
+                       queue_waits=(1.0, 2.0, 3.0), recovery_seconds=recovery_seconds)
+
+
+def test_escalates_immediately_on_the_strongest_signal():
+    signals = {'queue_depth': 0, 'queue_wait': 0.0}
+    shedder = make_shedder(signals)
+    assert shedder.select() == LoadTier.NORMAL
+
+    signals.update(queue_depth=4)
+    assert shedder.select() == LoadTier.MINIMAL
+
+    signals.update(queue_wait=5.0)
+    assert shedder.select() == LoadTier.CACHE_ONLY
+
+
+def test_recovers_one_tier_per_recovery_period():
+    signals = {'queue_depth': 6, 'queue_wait': 0.0}
+    shedder = make_shedder(signals)
+    assert shedder.evaluate() == LoadTier.CACHE_ONLY
+
+    signals.update(queue_depth=0)
+    assert shedder.evaluate() == LoadTier.CACHE_ONLY
+    time.sleep(0.06)
+    assert shedder.evaluate() == LoadTier.MINIMAL
+    time.sleep(0.06)
+    assert shedder.evaluate() == LoadTier.REDUCED
+    time.sleep(0.06)
+    assert shedder.evaluate() == LoadTier.NORMAL
+
+
+def test_stats_do_not_advance_recovery():
+    signals = {'queue_depth': 6, 'queue_wait': 0.0}
+    shedder = make_shedder(signals, recovery_seconds=0.0)
+    shedder.evaluate()
+    signals.update(queue_depth=0)
+    for _ in range(3):
+        assert shedder.get_stats()['tier'] == int(LoadTier.CACHE_ONLY)
+
+
+def test_disabled_or_unreadable_signals():
+    assert LoadShedder(lambda: {'queue_depth': 100}, enabled=False).select() == LoadTier.NORMAL
+
+    def broken():
+        raise RuntimeError("no signals")
+
+    assert LoadShedder(broken).evaluate() == LoadTier.NORMAL
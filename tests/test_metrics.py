@@ -0,0 +1,54 @@
+import threading
+
+from rag.metrics import Counter, Gauge, Histogram, MetricsRegistry
+
+
+def test_counter_sums_increments_from_every_thread():
+    counter = Counter('rag_test_total', 'Test counter', ('kind',))
+    threads = [threading.Thread(target=lambda: [counter.inc(kind='a') for _ in range(100)])
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    counter.inc(2, kind='b')
+
+    assert counter.value(kind='a') == 400
+    assert counter.render()[2:] == ['rag_test_total{kind="a"} 400', 'rag_test_total{kind="b"} 2']
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram('rag_test_seconds', 'Test latency', buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value)
+
+    assert histogram.render()[2:] == [
+        'rag_test_seconds_bucket{le="0.1"} 1',
+        'rag_test_seconds_bucket{le="1.0"} 3',
+        'rag_test_seconds_bucket{le="+Inf"} 4',
+        'rag_test_seconds_sum 6.05',
+        'rag_test_seconds_count 4'
+    ]
+
+
+def test_gauge_function_is_read_at_scrape_time_and_failures_are_skipped():
+    gauge = Gauge('rag_test_in_flight', 'Test gauge', ('component',))
+    state = {'generation': 2}
+    gauge.set_function(lambda: {(name,): value for name, value in state.items()})
+    state['generation'] = 3
+    assert gauge.render()[2:] == ['rag_test_in_flight{component="generation"} 3']
+
+    gauge.set_function(lambda: 1 / 0)
+    assert gauge.render()[2:] == []
+
+
+def test_registry_renders_each_metric_once_with_escaped_labels():
+    registry = MetricsRegistry()
+    counter = registry.counter('rag_test_errors_total', 'Test errors', ('endpoint',))
+    assert registry.counter('rag_test_errors_total', 'Again', ('endpoint',)) is counter
+    counter.inc(endpoint='/ask "quoted"')
+
+    text = registry.render()
+    assert text.count('# TYPE rag_test_errors_total counter') == 1
+    assert 'rag_test_errors_total{endpoint="/ask \\"quoted\\""} 1' in text
+    assert text.endswith('\n')
@@ -0,0 +1,127 @@
+import asyncio
+import threading
+
+import pytest
+
+from rag.model_manager import ModelManager, ModelNotAvailableError
+
+
+class StubClient:
+    """Records model loads; fails for models listed in ``broken``."""
+
+    def __init__(self, broken=()):
+        self.broken = set(broken)
+        self.loads = []
+
+    def load_model(self, model_name, keep_alive, read_timeout=None):
+        self.loads.append((model_name, keep_alive, read_timeout))
+        if model_name in self.broken:
+            raise ConnectionError("unreachable")
+        return {'done': True}
+
+    def get(self, path):
+        return {'models': [{'name': name} for name, _, _ in self.loads if name not in self.broken]}
+
+
+def test_queue_policy_serializes_cold_models_across_threads_and_coroutines():
+    manager = ModelManager(StubClient(), cold_model_policy='queue')
+    order = []
+
+    async def coroutine(name):
+        async with manager.admit_async('cold:1b'):
+            order.append(name)
+            await asyncio.sleep(0.01)
+            order.append(name)
+
+    async def main():
+        threads = threading.active_count()
+        with manager.admit('cold:1b'):
+            tasks = [asyncio.ensure_future(coroutine(name)) for name in ('a', 'b')]
+            await asyncio.sleep(0.01)
+            assert order == []
+            assert threading.active_count() == threads
+        await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+    assert order == ['a', 'a', 'b', 'b']
+
+
+def test_cancelled_cold_model_waiter_does_not_keep_the_lock():
+    manager = ModelManager(StubClient(), cold_model_policy='queue')
+
+    async def waiter():
+        async with manager.admit_async('cold:1b'):
+            pass
+
+    async def main():
+        async with manager.admit_async('cold:1b'):
+            task = asyncio.ensure_future(waiter())
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        await asyncio.wait_for(waiter(), timeout=1.0)
+
+    asyncio.run(main())
+    # A threaded caller can still take the lock
+    with manager.admit('cold:1b'):
+        pass
+
+
+def test_lock_handed_to_a_cancelled_waiter_is_passed_on():
+    manager = ModelManager(StubClient(), cold_model_policy='queue')
+
+    async def waiter():
+        async with manager.admit_async('cold:1b'):
+            pass
+
+    async def main():
+        async with manager.admit_async('cold:1b'):
+            task = asyncio.ensure_future(waiter())
+            await asyncio.sleep(0.01)
+        # Ownership has been handed to the task, which is cancelled before it runs
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.wait_for(waiter(), timeout=1.0)
+
+    asyncio.run(main())
+
+
+def test_check_admission_refuses_only_cold_models_under_refuse_policy():
+    manager = ModelManager(StubClient(), preload_models=['warm:1b'], cold_model_policy='refuse')
+    manager.preload()
+    manager.check_admission('warm:1b')
+    with pytest.raises(ModelNotAvailableError):
+        manager.check_admission('cold:1b')
+
+    ModelManager(StubClient(), cold_model_policy='queue').check_admission('cold:1b')
+
+
+def test_preload_uses_keep_alive_and_the_preload_timeout():
+    client = StubClient(broken=['broken:1b'])
+    manager = ModelManager(client, preload_models=['warm:1b', 'broken:1b'],
+                           keep_alive={'warm:1b': '-1'}, default_keep_alive='10m',
+                           preload_timeout=120.0)
+
+    assert manager.preload() == {'warm:1b': True, 'broken:1b': False}
+    assert client.loads == [('warm:1b', '-1', 120.0), ('broken:1b', '10m', 120.0)]
+
+    models = {m['name']: m for m in manager.get_status()['models']}
+    assert models['warm:1b']['preloaded'] and models['warm:1b']['resident']
+    assert not models['broken:1b']['preloaded']
+    assert models['broken:1b']['error'] == 'unreachable'
+
+
+def test_refresh_resident_tracks_models_loaded_outside_the_manager():
+    client = StubClient()
+    manager = ModelManager(client, preload_models=['warm:1b'])
+    manager.preload()
+    client.loads = [('other:1b', '5m', None)]
+
+    assert manager.refresh_resident() == ['other:1b']
+    models = {m['name']: m for m in manager.get_status()['models']}
+    assert not models['warm:1b']['resident']
+    assert models['other:1b']['resident'] and not models['other:1b']['preloaded']
+    # Residency alone does not admit a model under the 'refuse' policy
+    assert not manager.is_preloaded('other:1b')
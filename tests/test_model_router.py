@@ -0,0 +1,52 @@
+from rag.model_router import ModelRoute, ModelRouter
+
+
+def make_router(**kwargs):
+    return ModelRouter('mistral:7b', small_model='phi3:mini', large_model='llama3:70b', **kwargs)
+
+
+def test_routes_by_answer_type_with_limits():
+    router = make_router()
+
+    assert router.route('definition') == ModelRoute(
+        answer_type='definition', model_name='phi3:mini', num_predict=200
+    )
+    analytical = router.route('analytical')
+    assert analytical.model_name == 'llama3:70b'
+    assert analytical.read_timeout == 60.0
+    assert router.route('process').model_name == 'mistral:7b'
+    # Unknown answer types use the general route
+    assert router.route('poem').model_name == 'phi3:mini'
+
+
+def test_explicit_model_is_never_rerouted():
+    decision = make_router().route('analytical', model_name='tiny:1b')
+    assert decision.model_name == 'tiny:1b'
+    assert decision.reason == 'explicit'
+    assert decision.num_predict is None
+
+
+def test_unconfigured_or_disabled_router_keeps_the_default_model():
+    unconfigured = ModelRouter('mistral:7b').route('analytical')
+    assert (unconfigured.model_name, unconfigured.reason) == ('mistral:7b', 'unconfigured')
+    assert unconfigured.num_predict is None
+
+    disabled = make_router(enabled=False).route('definition')
+    assert (disabled.model_name, disabled.reason) == ('mistral:7b', 'disabled')
+
+
+def test_route_overrides_and_missing_aliases_fall_back_to_the_default():
+    router = ModelRouter('mistral:7b', routes={'definition': {'model': 'large', 'num_predict': 50}})
+
+    decision = router.route('definition')
+    assert decision.model_name == 'mistral:7b'
+    assert decision.num_predict == 50
+
+
+def test_resolve_does_not_count_requests():
+    router = make_router()
+    router.resolve('definition')
+    router.route('definition')
+    router.route('analytical')
+
+    assert router.get_stats()['requests_by_model'] == {'phi3:mini': 1, 'llama3:70b': 1}
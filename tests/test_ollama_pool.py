@@ -0,0 +1,118 @@
+import socket
+
+import pytest
+
+from rag.fake_ollama import FakeOllamaConfig, FakeOllamaServer
+from rag.ollama_client import OllamaClientConfig, OllamaError
+from rag.ollama_pool import OllamaPool
+
+PAYLOAD = {'model': 'mistral:7b', 'prompt': 'Question: what is ai?'}
+
+
+@pytest.fixture
+def dead_url():
+    """URL of a port with nothing listening."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+
+def make_pool(urls):
+    return OllamaPool(urls, OllamaClientConfig(connect_timeout=0.5, read_timeout=5.0),
+                      max_failures=1, eject_seconds=60.0)
+
+
+def test_fails_over_and_ejects_a_dead_endpoint(fake_ollama, dead_url):
+    pool = make_pool([fake_ollama.url, dead_url])
+    # Prefer the dead endpoint so the first request has to fail over
+    pool.endpoints[1].loaded_models.add('mistral:7b')
+
+    assert pool.generate(PAYLOAD)['response'] == 'Machine learning is a subset of AI.'
+    assert pool.generate(PAYLOAD)['done']
+
+    stats = pool.get_stats()
+    assert stats['failovers'] == 1
+    assert stats['ejections'] == 1
+    assert [e['healthy'] for e in stats['endpoints']] == [True, False]
+    pool.close()
+
+
+def test_client_errors_do_not_fail_over(fake_ollama, dead_url):
+    pool = make_pool([fake_ollama.url, dead_url])
+    pool.endpoints[1].ejected_until = float('inf')
+
+    with pytest.raises(OllamaError) as excinfo:
+        pool.generate(dict(PAYLOAD, model='unknown:1b'))
+    assert excinfo.value.status_code == 404
+    assert pool.get_stats()['failovers'] == 0
+    assert pool.get_stats()['endpoints'][0]['healthy']
+    pool.close()
+
+
+def test_health_check_readmits_recovered_endpoint(fake_ollama):
+    pool = make_pool([fake_ollama.url])
+    pool.endpoints[0].ejected_until = float('inf')
+
+    assert pool.check_health() == {fake_ollama.url: True}
+    assert pool.get_stats()['readmissions'] == 1
+    pool.close()
+
+
+def test_load_model_fails_only_when_no_endpoint_loads(fake_ollama, dead_url):
+    pool = make_pool([fake_ollama.url, dead_url])
+    assert pool.load_model('mistral:7b', '5m', read_timeout=5.0)['done']
+    assert pool.get_stats()['endpoints'][0]['loaded_models'] == ['mistral:7b']
+
+    with pytest.raises(OllamaError):
+        make_pool([dead_url]).load_model('mistral:7b', '5m')
+    pool.close()
+
+
+@pytest.fixture
+def slow_ollama():
+    """Fake Ollama server that takes half a second to answer."""
+    server = FakeOllamaServer(port=0, config=FakeOllamaConfig(
+        time_to_first_token=0.5, tokens_per_second=0.0, jitter=0.0
+    )).start()
+    yield server
+    server.stop()
+
+
+def make_hedging_pool(urls, **kwargs):
+    pool = OllamaPool(urls, OllamaClientConfig(read_timeout=5.0), hedge_percentile=50.0,
+                      hedge_min_samples=1, **kwargs)
+    pool._latencies.append(0.05)
+    return pool
+
+
+def test_hedge_goes_to_a_different_endpoint(slow_ollama, fake_ollama):
+    pool = make_hedging_pool([slow_ollama.url, fake_ollama.url])
+    # The slow host has the model loaded, so the primary lands there
+    pool.endpoints[0].loaded_models.add('mistral:7b')
+
+    assert pool.generate(PAYLOAD)['done']
+    stats = pool.get_stats()
+    assert stats['hedges'] == 1
+    assert stats['hedges_won'] == 1
+    assert fake_ollama.get_stats()['requests'] == 1
+    pool.close()
+
+
+def test_no_hedge_without_spare_capacity(slow_ollama, fake_ollama):
+    pool = make_hedging_pool([slow_ollama.url, fake_ollama.url], endpoint_concurrency=1)
+    pool.endpoints[0].loaded_models.add('mistral:7b')
+    pool.endpoints[1].outstanding = 1
+
+    assert pool.generate(PAYLOAD)['done']
+    assert pool.get_stats()['hedges'] == 0
+    assert fake_ollama.get_stats()['requests'] == 0
+    pool.close()
+
+
+def test_healthy_count_excludes_ejected_endpoints(fake_ollama, dead_url):
+    pool = make_pool([fake_ollama.url, dead_url])
+    assert pool.healthy_count() == 2
+    pool.check_health()
+    assert pool.healthy_count() == 1
+    pool.close()
@@ -0,0 +1,132 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("chromadb")
+
+from rag.model_manager import ModelNotAvailableError
+from rag.qa_engine import QAEngine, QAEngineConfig
+from rag.text_chunker import TextChunker
+
+SAMPLE_DOCUMENT = Path(__file__).parent / 'sample_document.txt'
+QUESTION = "What is machine learning?"
+
+
+@pytest.fixture
+def engine(tmp_path, fake_ollama):
+    """Engine on the fake Ollama server and hash embeddings, with the sample document ingested."""
+    engine = QAEngine(QAEngineConfig(
+        vector_store_path=str(tmp_path / 'vector_db'),
+        embedding_backend='hash',
+        ollama_url=fake_ollama.url,
+        preload_models=[],
+        enable_logging=False,
+        enable_answer_cache=True,
+        answer_cache_path=str(tmp_path / 'answers.sqlite3'),
+        enable_extractive_answers=False
+    ))
+    document = {
+        'content': SAMPLE_DOCUMENT.read_text(encoding='utf-8'),
+        'file_name': SAMPLE_DOCUMENT.name,
+        'file_path': str(SAMPLE_DOCUMENT),
+        'file_extension': 'txt'
+    }
+    chunks = TextChunker().chunk_by_section(document)
+    embeddings = engine.retrieval_engine.embedding_service.generate_embeddings(
+        [chunk['content'] for chunk in chunks]
+    )
+    engine.retrieval_engine.vector_store.store_documents(chunks, embeddings)
+    engine.bump_corpus_version()
+    return engine
+
+
+def test_answers_from_the_model_with_sources(engine, fake_ollama):
+    result = engine.ask_question(QUESTION, force_generation=True)
+
+    assert 'subset of AI' in result.answer
+    assert any(SAMPLE_DOCUMENT.name in source for source in result.sources)
+    assert fake_ollama.get_stats()['requests'] == 1
+
+
+def test_repeated_question_is_served_from_the_answer_cache(engine, fake_ollama):
+    engine.ask_question(QUESTION, force_generation=True)
+    cached = engine.ask_question(QUESTION, force_generation=True)
+    assert cached.metadata['cache']['hit']
+    assert fake_ollama.get_stats()['requests'] == 1
+
+    engine.bump_corpus_version()
+    fresh = engine.ask_question(QUESTION, force_generation=True)
+    assert 'cache' not in fresh.metadata or not fresh.metadata['cache'].get('hit')
+    assert fake_ollama.get_stats()['requests'] == 2
+
+
+def test_low_confidence_retrieval_skips_the_model(engine, fake_ollama):
+    engine.config.retrieval_confidence_threshold = 1.01
+    result = engine.ask_question(QUESTION)
+
+    assert 'confidence_gate' in result.metadata
+    assert fake_ollama.get_stats()['requests'] == 0
+
+
+def test_stream_yields_tokens_then_done(engine):
+    events = list(engine.ask_question_stream(QUESTION, force_generation=True))
+
+    assert events[-1]['event'] == 'done'
+    tokens = ''.join(e['data']['token'] for e in events if e['event'] == 'token')
+    assert tokens.strip() == 'Machine learning is a subset of AI.'
+    assert events[-1]['data']['sources']
+
+
+def test_streamed_answer_is_replayed_from_the_cache(engine, fake_ollama):
+    list(engine.ask_question_stream(QUESTION, force_generation=True))
+    events = list(engine.ask_question_stream(QUESTION, force_generation=True))
+
+    assert [e['event'] for e in events] == ['token', 'done']
+    assert events[0]['data']['token'] == events[1]['data']['answer']
+    assert fake_ollama.get_stats()['requests'] == 1
+
+
+def test_batch_returns_results_in_input_order_with_one_retrieval_per_chunk(engine, monkeypatch):
+    engine.batch_ask_questions([QUESTION])
+    calls = []
+    search_batch = engine.retrieval_engine.search_batch
+
+    def counting_search_batch(query_groups, **kwargs):
+        calls.append(len(query_groups))
+        return search_batch(query_groups, **kwargs)
+
+    monkeypatch.setattr(engine.retrieval_engine, 'search_batch', counting_search_batch)
+    questions = [QUESTION, "What is deep learning?", "How are neural networks trained?"]
+    results = engine.batch_ask_questions(questions)
+
+    assert [r.query for r in results] == questions
+    assert results[0].metadata['cache']['hit']
+    assert calls == [2]
+
+
+def test_failing_batch_question_yields_an_error_result(engine, monkeypatch):
+    process_query = engine.query_processor.process_query
+
+    def failing_process_query(query):
+        if query == 'broken':
+            raise RuntimeError("bad query")
+        return process_query(query)
+
+    monkeypatch.setattr(engine.query_processor, 'process_query', failing_process_query)
+    answers = dict(engine.iter_batch_answers(['broken', QUESTION], force_generation=True))
+
+    assert answers[0].metadata['error_message'] == 'bad query'
+    assert 'subset of AI' in answers[1].answer
+
+
+def test_async_question(engine):
+    result = asyncio.run(engine.ask_question_async(QUESTION, force_generation=True))
+    assert 'subset of AI' in result.answer
+
+
+def test_stream_for_a_refused_model_raises_before_any_event(engine, fake_ollama):
+    engine.model_manager.cold_model_policy = 'refuse'
+    with pytest.raises(ModelNotAvailableError):
+        engine.ask_question_stream(QUESTION, force_generation=True)
+    assert fake_ollama.get_stats()['requests'] == 0
@@ -0,0 +1,88 @@
+import threading
+import time
+
+from rag.reranker import Reranker
+from rag.retrieval_engine import RetrievalResult
+
+
+class StubCrossEncoder:
+    """Scores a pair by how often the passage mentions 'learning'; can be slowed or blocked."""
+
+    def __init__(self, delay=0.0, gate=None):
+        self.delay = delay
+        self.gate = gate
+        self.batches = []
+
+    def predict(self, pairs, batch_size=None, show_progress_bar=False):
+        self.batches.append(len(pairs))
+        if self.gate is not None:
+            self.gate.wait()
+        time.sleep(self.delay)
+        return [passage.lower().count('learning') for _, passage in pairs]
+
+
+class StubReranker(Reranker):
+    def __init__(self, model, **kwargs):
+        self.stub = model
+        super().__init__(**kwargs)
+
+    def _load_model(self):
+        self.model = self.stub
+
+
+def make_results(contents):
+    return [RetrievalResult(content=content, file_name=f"doc{i}.txt", chunk_index=i,
+                            similarity_score=1.0 - i / 10, metadata={}, source_path=f"doc{i}.txt")
+            for i, content in enumerate(contents)]
+
+
+RESULTS = make_results(["Weather report.", "Learning rates.", "Deep learning and machine learning."])
+
+
+def test_orders_by_cross_encoder_score_in_one_batch():
+    model = StubCrossEncoder()
+    rerank = StubReranker(model).rerank("what is learning?", RESULTS)
+
+    assert rerank.applied
+    assert [r.chunk_index for r in rerank.results] == [2, 1, 0]
+    assert [r.rerank_score for r in rerank.results] == [2.0, 1.0, 0.0]
+    assert model.batches == [3]
+
+
+def test_only_top_n_candidates_are_scored():
+    model = StubCrossEncoder()
+    rerank = StubReranker(model, top_n=2).rerank("what is learning?", RESULTS)
+
+    assert rerank.candidates_scored == 2
+    assert [r.chunk_index for r in rerank.results] == [1, 0, 2]
+    assert rerank.results[2].rerank_score is None
+
+
+def test_keeps_the_original_order_when_over_budget():
+    rerank = StubReranker(StubCrossEncoder(delay=0.5), time_budget_ms=50.0).rerank("learning", RESULTS)
+
+    assert not rerank.applied
+    assert rerank.fallback_reason == 'time_budget_exceeded'
+    assert rerank.results == RESULTS
+    assert rerank.latency_ms < 400
+
+
+def test_busy_workers_fall_back_without_queueing():
+    gate = threading.Event()
+    reranker = StubReranker(StubCrossEncoder(gate=gate), time_budget_ms=20.0, max_workers=1)
+    try:
+        assert reranker.rerank("learning", RESULTS).fallback_reason == 'time_budget_exceeded'
+        # The overrunning pass still holds the only worker
+        busy = reranker.rerank("learning", RESULTS)
+        assert busy.fallback_reason == 'busy'
+        assert busy.results == RESULTS
+    finally:
+        gate.set()
+
+
+def test_single_result_is_not_scored():
+    model = StubCrossEncoder()
+    rerank = StubReranker(model).rerank("learning", RESULTS[:1])
+
+    assert rerank.fallback_reason == 'not_enough_candidates'
+    assert model.batches == []
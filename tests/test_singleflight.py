@@ -0,0 +1,227 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from rag.singleflight import FollowerTimeoutError, SingleFlight
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.005)
+
+
+def run_in_thread(target):
+    outcome = {}
+
+    def run():
+        try:
+            outcome['result'] = target()
+        except BaseException as e:
+            outcome['error'] = e
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread, outcome
+
+
+def test_do_shares_leader_result_with_follower():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        release.wait(2)
+        return 'answer'
+
+    leader, leader_outcome = run_in_thread(lambda: flight.do('key', compute))
+    wait_until(lambda: flight.get_stats()['in_flight'] == 1)
+    follower, follower_outcome = run_in_thread(lambda: flight.do('key', compute))
+    wait_until(lambda: flight.get_stats()['coalesced'] == 1)
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert leader_outcome['result'] == ('answer', False)
+    assert follower_outcome['result'] == ('answer', True)
+    assert len(calls) == 1
+    assert flight.get_stats()['in_flight'] == 0
+
+
+def test_do_follower_reraises_leader_error():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def fail():
+        release.wait(2)
+        raise ValueError("boom")
+
+    leader, leader_outcome = run_in_thread(lambda: flight.do('key', fail))
+    wait_until(lambda: flight.get_stats()['in_flight'] == 1)
+    follower, follower_outcome = run_in_thread(lambda: flight.do('key', lambda: 'unused'))
+    wait_until(lambda: flight.get_stats()['coalesced'] == 1)
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert isinstance(leader_outcome['error'], ValueError)
+    assert isinstance(follower_outcome['error'], ValueError)
+
+
+def test_do_follower_retries_on_listed_leader_error():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def leader_times_out():
+        release.wait(2)
+        raise TimeoutError("leader deadline")
+
+    leader, leader_outcome = run_in_thread(lambda: flight.do('key', leader_times_out))
+    wait_until(lambda: flight.get_stats()['in_flight'] == 1)
+    follower, follower_outcome = run_in_thread(
+        lambda: flight.do('key', lambda: 'retried', retry_on=(TimeoutError,))
+    )
+    wait_until(lambda: flight.get_stats()['coalesced'] == 1)
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert isinstance(leader_outcome['error'], TimeoutError)
+    assert follower_outcome['result'] == ('retried', False)
+
+
+def test_do_follower_gives_up_after_its_timeout():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    leader, _ = run_in_thread(lambda: flight.do('key', lambda: release.wait(2)))
+    wait_until(lambda: flight.get_stats()['in_flight'] == 1)
+    with pytest.raises(FollowerTimeoutError):
+        flight.do('key', lambda: 'unused', timeout=0.05)
+    release.set()
+    leader.join()
+
+
+def test_do_async_shares_result():
+    flight = SingleFlight()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 'answer'
+
+    async def main():
+        return await asyncio.gather(flight.do_async('key', compute), flight.do_async('key', compute))
+
+    leader, follower = asyncio.run(main())
+    assert leader == ('answer', False)
+    assert follower == ('answer', True)
+    assert len(calls) == 1
+
+
+def test_do_async_follower_takes_over_when_leader_is_cancelled():
+    flight = SingleFlight()
+
+    async def main():
+        started = asyncio.Event()
+
+        async def slow():
+            started.set()
+            await asyncio.sleep(10)
+
+        async def fast():
+            return 'answer'
+
+        leader = asyncio.ensure_future(flight.do_async('key', slow))
+        await started.wait()
+        follower = asyncio.ensure_future(flight.do_async('key', fast))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(main()) == ('answer', False)
+
+
+def test_do_async_cancelled_follower_leaves_leader_running():
+    flight = SingleFlight()
+
+    async def main():
+        async def compute():
+            await asyncio.sleep(0.05)
+            return 'answer'
+
+        leader = asyncio.ensure_future(flight.do_async('key', compute))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do_async('key', compute))
+        await asyncio.sleep(0)
+        follower.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await follower
+        return await leader
+
+    assert asyncio.run(main()) == ('answer', False)
+
+
+def test_do_async_follower_timeout():
+    flight = SingleFlight()
+
+    async def main():
+        async def slow():
+            await asyncio.sleep(0.5)
+            return 'answer'
+
+        leader = asyncio.ensure_future(flight.do_async('key', slow))
+        await asyncio.sleep(0)
+        with pytest.raises(FollowerTimeoutError):
+            await flight.do_async('key', slow, timeout=0.01)
+        return await leader
+
+    assert asyncio.run(main()) == ('answer', False)
+
+
+def test_do_stream_replays_events_to_followers():
+    flight = SingleFlight()
+    gate = threading.Event()
+
+    def source():
+        gate.wait(2)
+        yield from ['a', 'b', 'c']
+
+    leader, leader_outcome = run_in_thread(lambda: list(flight.do_stream('key', source)))
+    wait_until(lambda: flight.get_stats()['leaders'] == 1)
+    follower, follower_outcome = run_in_thread(lambda: list(flight.do_stream('key', source)))
+    wait_until(lambda: flight.get_stats()['coalesced'] == 1)
+    gate.set()
+    leader.join()
+    follower.join()
+
+    assert leader_outcome['result'] == [('a', False), ('b', False), ('c', False)]
+    assert follower_outcome['result'] == [('a', True), ('b', True), ('c', True)]
+
+
+def test_do_stream_stops_source_when_all_subscribers_leave():
+    flight = SingleFlight()
+    closed = threading.Event()
+
+    def source():
+        try:
+            while True:
+                time.sleep(0.001)
+                yield 'token'
+        finally:
+            closed.set()
+
+    stream = flight.do_stream('key', source)
+    assert next(stream) == ('token', False)
+    stream.close()
+
+    assert closed.wait(2)
+    wait_until(lambda: flight.get_stats()['in_flight'] == 0)
@@ -0,0 +1,45 @@
+import json
+
+from rag.synonym_engine import AhoCorasick, SynonymEngine, Variation
+
+
+def test_aho_corasick_finds_overlapping_phrases():
+    automaton = AhoCorasick(['he', 'she', 'his', 'hers'])
+    matches = {(m.start, m.end, m.phrase) for m in automaton.iter_matches('ushers')}
+    assert matches == {(1, 4, 'she'), (2, 4, 'he'), (2, 6, 'hers')}
+
+
+def test_matches_respect_word_boundaries():
+    engine = SynonymEngine({'ai': ['artificial intelligence']})
+    assert [m.phrase for m in engine.find_phrases('ai and maintenance')] == ['ai']
+    assert engine.find_phrases('said the trainee') == []
+
+
+def test_leftmost_longest_phrase_wins():
+    engine = SynonymEngine({'deep learning': ['neural networks'], 'learning': ['training']})
+    assert [m.phrase for m in engine.find_phrases('what is deep learning')] == ['deep learning']
+
+
+def test_variations_round_robin_across_phrases():
+    engine = SynonymEngine({'ai': ['artificial intelligence', 'machine intelligence'],
+                            'labs': ['institutes']})
+    variations = engine.expand_variations('ai labs', 2)
+    assert variations == [
+        Variation(text='artificial intelligence labs', phrase='ai', synonym='artificial intelligence'),
+        Variation(text='ai institutes', phrase='labs', synonym='institutes')
+    ]
+    assert engine.expand('ai labs', 0) == []
+
+
+def test_dictionary_keys_are_normalized_and_merged():
+    engine = SynonymEngine({'Deep  Learning': ['neural networks'], 'deep learning': ['dl']})
+    assert engine.synonyms == {'deep learning': ['neural networks', 'dl']}
+
+
+def test_from_config_reads_file_and_falls_back(tmp_path, monkeypatch):
+    path = tmp_path / 'synonyms.json'
+    path.write_text(json.dumps({'gpu': ['graphics card']}), encoding='utf-8')
+    assert SynonymEngine.from_config(str(path)).expand('fast gpu', 3) == ['fast graphics card']
+
+    monkeypatch.setenv('RAG_SYNONYMS_PATH', str(tmp_path / 'missing.json'))
+    assert 'ai' in SynonymEngine.from_config().synonyms
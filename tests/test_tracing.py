@@ -0,0 +1,47 @@
+import pytest
+
+from rag.tracing import Tracer
+
+
+def test_spans_are_recorded_in_order_with_attributes():
+    summaries = []
+    trace = Tracer(on_finish=summaries.append).start_trace('qa.ask_question')
+    with trace.span('retrieval', top_k=5) as span:
+        span.set('candidates', 3)
+    trace.record('ollama.eval', 0.25, tokens=40)
+
+    summary = trace.finish()
+    stages = summary['stages']
+    assert [s['name'] for s in stages] == ['retrieval', 'ollama.eval']
+    assert stages[0]['top_k'] == 5 and stages[0]['candidates'] == 3
+    assert stages[1]['duration_ms'] == pytest.approx(250.0)
+    assert summary['total_ms'] >= stages[0]['duration_ms']
+    assert summaries == [summary]
+
+
+def test_failed_span_records_the_error_and_reraises():
+    trace = Tracer().start_trace('qa.ask_question')
+    with pytest.raises(ValueError):
+        with trace.span('generation'):
+            raise ValueError("model crashed")
+    assert trace.finish()['stages'][0]['error'] == 'model crashed'
+
+
+def test_finish_is_idempotent_and_hook_errors_are_contained():
+    calls = []
+
+    def failing_hook(summary):
+        calls.append(summary)
+        raise RuntimeError("exporter down")
+
+    trace = Tracer(on_finish=failing_hook).start_trace('qa.ask_question')
+    first = trace.finish()
+    assert trace.finish() == first
+    assert len(calls) == 1
+
+
+def test_missing_opentelemetry_keeps_tracing_in_metadata():
+    trace = Tracer(enable_opentelemetry=True).start_trace('qa.ask_question')
+    with trace.span('retrieval'):
+        pass
+    assert [s['name'] for s in trace.finish()['stages']] == ['retrieval']